@@ -0,0 +1,132 @@
+import time
+import asyncio
+from decimal import Decimal
+
+from loguru import logger
+from asgiref.sync import sync_to_async
+from django.utils import timezone
+
+from integrations.models import Quotex
+from customer.models import Customer
+
+from .quotex_management import QuotexManagement
+from .refresh_planner import clear_balance_synced
+
+QUOTEX_FIELDS = [
+    "trader_id", "demo_balance", "real_balance", "currency_symbol", "is_active", "profile_synced_at",
+    "profile_refresh_attempted_at", "profile_refresh_failures", "updated_at",
+]
+ATTEMPT_FIELDS = ["profile_refresh_attempted_at", "profile_refresh_failures"]
+CUSTOMER_FIELDS = ["country", "trader_id", "avatar", "data_callback"]
+
+
+def apply_profile(quotex, profile_data):
+    """Copia o perfil para a conta e o cliente (sem gravar)."""
+    demo_balance = Decimal(str(profile_data["demo_balance"]))
+    real_balance = Decimal(str(profile_data["live_balance"]))
+    profile_id = profile_data.get("profile_id", "")
+
+    quotex.trader_id = profile_id
+    quotex.demo_balance = demo_balance
+    quotex.real_balance = real_balance
+    quotex.currency_symbol = profile_data.get("currency_symbol", "R$")
+
+    # Valida saldo mínimo para operar
+    if quotex.account_type == "REAL" and real_balance < Decimal("5"):
+        quotex.is_active = False  # Desativa se saldo for insuficiente
+    elif quotex.account_type == "PRACTICE" and demo_balance < Decimal("1"):
+        quotex.is_active = False  # Desativa conta prática sem saldo
+    quotex.updated_at = quotex.profile_synced_at = quotex.profile_refresh_attempted_at = timezone.now()
+    quotex.profile_refresh_failures = 0
+
+    customer = quotex.customer
+    customer.country = profile_data.get("country_name", "")
+    customer.trader_id = profile_id
+    customer.avatar = profile_data.get("avatar", "")
+    customer.data_callback = profile_data  # Armazena dados do perfil
+
+
+def save_profiles(refreshed, batch_size=500):
+    """Grava um lote de contas atualizadas com um `bulk_update` por modelo."""
+    Quotex.objects.bulk_update([q for q, _ in refreshed], QUOTEX_FIELDS, batch_size=batch_size)
+    Customer.objects.bulk_update([q.customer for q, _ in refreshed], CUSTOMER_FIELDS, batch_size=batch_size)
+    # O saldo veio da corretora; o marcador do deal não vale mais
+    clear_balance_synced([q.id for q, _ in refreshed])
+
+
+def save_failures(failed, batch_size=500):
+    """
+    Registra a tentativa das contas que falharam.
+
+    O planejador usa a hora da tentativa e as falhas seguidas para dar um
+    intervalo (backoff) antes de tentar a conta de novo.
+    """
+    now = timezone.now()
+    for quotex in failed:
+        quotex.profile_refresh_attempted_at = now
+        quotex.profile_refresh_failures += 1
+    Quotex.objects.bulk_update(failed, ATTEMPT_FIELDS, batch_size=batch_size)
+
+
+async def refresh_accounts(accounts, concurrency=20, chunk_size=100):
+    """
+    Atualiza perfil e saldo de várias contas num único event loop.
+
+    No máximo `concurrency` contas conversam com a Quotex ao mesmo tempo;
+    as que terminam são acumuladas e gravadas a cada `chunk_size` com
+    `bulk_update`. Retorna o resumo com vazão (contas/min) e falhas.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    started = time.monotonic()
+    summary = {"accounts": len(accounts), "updated": 0, "sessions_reused": 0, "failures": {}}
+
+    async def refresh(quotex):
+        async with semaphore:
+            manager = QuotexManagement(
+                email=quotex.email,
+                password=quotex.password,
+                account_type=quotex.account_type,
+                auto_logout=False,  # o token continua válido para a próxima execução
+            )
+            try:
+                return quotex, await manager.get_profile(), None
+            except Exception as e:
+                return quotex, None, f"{type(e).__name__}: {e}"
+
+    refreshed = []
+    failed = []
+    for task in asyncio.as_completed([refresh(quotex) for quotex in accounts]):
+        quotex, profile_data, error = await task
+        if error is None and not profile_data:
+            error = "Falha ao conectar ou obter o perfil"
+        if error is None:
+            summary["sessions_reused"] += profile_data.pop("session_reused", False)
+            try:
+                apply_profile(quotex, profile_data)
+            except (KeyError, TypeError, ArithmeticError) as e:
+                error = f"Perfil inválido: {e}"
+        if error is not None:
+            summary["failures"][quotex.email] = error
+            failed.append(quotex)
+            continue
+        refreshed.append((quotex, profile_data))
+        if len(refreshed) >= chunk_size:
+            await sync_to_async(save_profiles)(refreshed)
+            summary["updated"] += len(refreshed)
+            refreshed = []
+    if refreshed:
+        await sync_to_async(save_profiles)(refreshed)
+        summary["updated"] += len(refreshed)
+    if failed:
+        await sync_to_async(save_failures)(failed)
+
+    elapsed = time.monotonic() - started
+    summary["elapsed_s"] = round(elapsed, 2)
+    summary["accounts_per_min"] = round(len(accounts) / elapsed * 60, 1) if elapsed else 0.0
+    summary["failed"] = len(summary["failures"])
+    logger.info(
+        f"Atualização de contas: {summary['updated']}/{summary['accounts']} em {summary['elapsed_s']}s "
+        f"({summary['accounts_per_min']} contas/min, {summary['failed']} falhas, "
+        f"{summary['sessions_reused']} sessões reaproveitadas)"
+    )
+    return summary
@@ -0,0 +1,297 @@
+import time
+import queue
+import threading
+from decimal import Decimal
+
+from loguru import logger
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.core.cache import cache
+from django.contrib.contenttypes.models import ContentType
+
+from .utils import parse_time_aware
+from .refresh_planner import mark_balance_synced
+from trading.models import TradeOrder
+from integrations.models import Quotex
+
+
+TRADE_OPEN = "open"
+DEAL_RESULT = "deal"
+
+
+def deal_status(profit):
+    """Status do resultado (WIN/LOSS/DOGI) a partir do lucro do deal."""
+    if profit is not None and profit > 0:
+        return "WIN"
+    if profit is not None and profit < 0:
+        return "LOSS"
+    return "DOGI"
+
+
+def settle_orders(results, batch_size=500):
+    """
+    Grava o resultado das ordens e credita o lucro no saldo, numa transação só.
+
+    `results` mapeia `id_trade -> lucro` (None quando o deal não trouxe lucro).
+    As ordens são travadas com `select_for_update` e só as que ainda estão
+    PENDING transicionam e creditam o lucro: o mesmo deal vindo do websocket
+    e da conciliação nunca entra duas vezes no saldo.
+
+    Retorna `(encontradas, liquidadas)`: os id_trade que existem no banco e
+    as ordens atualizadas agora.
+    """
+    if not results:
+        return set(), []
+    profits = {}
+    with transaction.atomic():
+        orders = list(TradeOrder.objects.select_for_update().filter(id_trade__in=list(results)))
+        settled = []
+        for order in orders:
+            if order.order_result_status != "PENDING":
+                continue
+            profit = results[order.id_trade]
+            order.order_result_status = deal_status(profit)
+            if profit is not None:
+                order.result = profit
+                profits[order.object_id] = profits.get(order.object_id, Decimal("0")) + Decimal(str(profit))
+            order.status = "EXECUTED"
+            settled.append(order)
+
+        TradeOrder.objects.bulk_update(
+            settled, ["order_result_status", "result", "status"], batch_size=batch_size
+        )
+        _credit_profits(profits)
+    # O planejador de refresh rebaixa quem já teve o saldo atualizado aqui
+    if profits:
+        mark_balance_synced(profits)
+    return {order.id_trade for order in orders}, settled
+
+
+def _credit_profits(profits):
+    """Atualiza o saldo de cada corretora com uma única query por conta."""
+    if not profits:
+        return
+    account_types = dict(Quotex.objects.filter(id__in=profits).values_list("id", "account_type"))
+    for broker_id, profit in profits.items():
+        field = "demo_balance" if account_types.get(broker_id) == "PRACTICE" else "real_balance"
+        Quotex.objects.filter(id=broker_id).update(**{field: F(field) + profit, "updated_at": timezone.now()})
+
+
+class TradePersistence:
+    """
+    Fila de persistência das ordens vindas do websocket.
+
+    A thread de leitura do websocket só enfileira os eventos (abertura de
+    ordem e resultado de deal). Uma thread separada esvazia a fila a cada
+    `flush_interval` segundos e grava tudo com `bulk_create`/`bulk_update`,
+    sem bloquear a leitura de ticks e acks.
+    """
+
+    def __init__(self, maxsize=10000, flush_interval=1.0, batch_size=500,
+                 dedupe_timeout=600, max_deal_retries=5):
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.dedupe_timeout = dedupe_timeout
+        self.max_deal_retries = max_deal_retries
+        self.brokers = {}  # trader_id -> (id, account_type)
+        self._unmatched_deals = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stats = {
+            "enqueued": 0,
+            "dropped": 0,
+            "duplicates": 0,
+            "orders_created": 0,
+            "deals_applied": 0,
+            "flushes": 0,
+            "last_flush_ms": 0.0,
+            "max_flush_ms": 0.0,
+        }
+
+    # ------------------------------------------------------------------ #
+    # Produtores (thread do websocket)
+    # ------------------------------------------------------------------ #
+    def submit_trade_open(self, info_buy, asset=None):
+        """Enfileira a ordem aberta recebida no evento `id` do websocket."""
+        id_trade = info_buy.get("id")
+        key = f"trade_open_{id_trade}"
+        if not id_trade or not self._claim(key):
+            return False
+        return self._put((TRADE_OPEN, {"asset": asset or info_buy.get("asset"), "info": info_buy}), key)
+
+    def submit_deal_result(self, id_trade, win, profit=None):
+        """Enfileira o resultado de um deal fechado."""
+        key = f"processed_trade_{id_trade}"
+        if not self._claim(key):
+            return False
+        return self._put((DEAL_RESULT, {"id_trade": str(id_trade), "win": win, "profit": profit}), key)
+
+    def _claim(self, key):
+        # `cache.add` vira um SET NX no Redis (CACHES do settings): só o primeiro
+        # processo grava a chave.
+        try:
+            claimed = cache.add(key, True, timeout=self.dedupe_timeout)
+        except Exception as e:
+            # Sem o cache, deixa passar: a gravação confere as ordens já existentes
+            logger.warning(f"Cache indisponível para deduplicar {key}: {e}")
+            return True
+        if claimed:
+            return True
+        with self._lock:
+            self._stats["duplicates"] += 1
+        return False
+
+    def _release(self, key):
+        try:
+            cache.delete(key)
+        except Exception as e:
+            logger.warning(f"Cache indisponível para liberar {key}: {e}")
+
+    def _put(self, event, key=None):
+        self.start()
+        try:
+            self.queue.put_nowait(event)
+        except queue.Full:
+            # Libera a chave: o reenvio do evento não pode ser tratado como duplicado
+            if key is not None:
+                self._release(key)
+            with self._lock:
+                self._stats["dropped"] += 1
+            logger.warning(f"Fila de persistência cheia, evento descartado: {event[0]}")
+            return False
+        with self._lock:
+            self._stats["enqueued"] += 1
+        return True
+
+    # ------------------------------------------------------------------ #
+    # Consumidor
+    # ------------------------------------------------------------------ #
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="trade-persistence")
+                self._thread.daemon = True
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Erro ao gravar lote de ordens: {e}")
+
+    def flush(self):
+        """Grava tudo que estiver na fila. Retorna a quantidade de eventos processados."""
+        events = []
+        while len(events) < self.batch_size:
+            try:
+                events.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        if not events and not self._unmatched_deals:
+            return 0
+
+        started = time.perf_counter()
+        close_old_connections()
+        try:
+            opens = [data for kind, data in events if kind == TRADE_OPEN]
+            deals = [data for kind, data in events if kind == DEAL_RESULT]
+            created = self._create_orders(opens)
+            applied = self._apply_deals(deals)
+        finally:
+            close_old_connections()
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self._stats["orders_created"] += created
+            self._stats["deals_applied"] += applied
+            self._stats["flushes"] += 1
+            self._stats["last_flush_ms"] = elapsed_ms
+            self._stats["max_flush_ms"] = max(self._stats["max_flush_ms"], elapsed_ms)
+        logger.debug(
+            f"Persistência: {created} ordens, {applied} deals em {elapsed_ms:.1f}ms "
+            f"(fila: {self.queue.qsize()})"
+        )
+        return len(events)
+
+    def metrics(self):
+        """Retorna profundidade da fila, latência do último flush e contadores."""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["queue_depth"] = self.queue.qsize()
+        stats["unmatched_deals"] = len(self._unmatched_deals)
+        return stats
+
+    def resolve_brokers(self, trader_ids):
+        """Resolve trader_id -> (id, account_type) usando o mapa em memória."""
+        missing = {str(t) for t in trader_ids if t is not None and str(t) not in self.brokers}
+        if missing:
+            rows = Quotex.objects.filter(trader_id__in=missing).values_list("trader_id", "id", "account_type")
+            for trader_id, broker_id, account_type in rows:
+                self.brokers[trader_id] = (broker_id, account_type)
+        return self.brokers
+
+    def _create_orders(self, opens):
+        if not opens:
+            return 0
+        ids = [str(data["info"]["id"]) for data in opens]
+        existing = set(TradeOrder.objects.filter(id_trade__in=ids).values_list("id_trade", flat=True))
+        brokers = self.resolve_brokers(data["info"].get("uid") for data in opens)
+        content_type = ContentType.objects.get_for_model(Quotex)
+
+        orders = []
+        for data in opens:
+            info_buy = data["info"]
+            id_trade = str(info_buy["id"])
+            broker = brokers.get(str(info_buy.get("uid")))
+            if id_trade in existing:
+                continue
+            if broker is None:
+                logger.warning(f"Corretora não encontrada para o trader {info_buy.get('uid')}")
+                continue
+            existing.add(id_trade)
+            orders.append(TradeOrder(
+                content_type=content_type,
+                object_id=broker[0],
+                id_trade=id_trade,
+                order_type="BUY",
+                amount=info_buy["amount"],
+                asset_order=data["asset"],
+                status="EXECUTED",
+                uid=info_buy.get("uid"),
+                percent_profit=info_buy.get("percentProfit"),
+                open_time=parse_time_aware(info_buy["openTime"]) if info_buy.get("openTime") else None,
+                close_time=parse_time_aware(info_buy["closeTime"]) if info_buy.get("closeTime") else None,
+                request_id=info_buy.get("requestId"),
+                result=0,
+                request_body=info_buy,
+            ))
+        TradeOrder.objects.bulk_create(orders, batch_size=self.batch_size)
+        return len(orders)
+
+    def _apply_deals(self, deals):
+        for data in deals:
+            self._unmatched_deals[data["id_trade"]] = [data, 0]
+        if not self._unmatched_deals:
+            return 0
+
+        results = {id_trade: data["profit"] for id_trade, (data, _) in self._unmatched_deals.items()}
+        found, settled = settle_orders(results, self.batch_size)
+        for id_trade in found:
+            del self._unmatched_deals[id_trade]
+
+        # Deals cuja ordem ainda não foi gravada ficam para o próximo flush.
+        for id_trade, entry in list(self._unmatched_deals.items()):
+            entry[1] += 1
+            if entry[1] > self.max_deal_retries:
+                logger.warning(f"Ordem não encontrada para atualização: {id_trade}")
+                del self._unmatched_deals[id_trade]
+        return len(settled)
+
+
+trade_persistence = TradePersistence()
@@ -1,6 +1,4 @@
 from datetime import datetime, timedelta, timezone
-import json
-import os
 import asyncio
 from decimal import Decimal
 import random
@@ -9,48 +7,37 @@ from asgiref.sync import sync_to_async
 from quotexapi.stable_api import Quotex
 from .constants import CUSTOM_PARITIES, PARITIES
 
-from integrations.models import QuotexManagement as QuotexManager
-from integrations.models import Quotex as Qx
-
-from bots.utils import calculate_entry_amount, normalize_parities, wait_until_second
+from bots.utils import TradeContext, open_tradable_assets, parse_time_aware, wait_until_second
 from bots.services import create_trade_order_sync
 
 
 class QuotexManagement:
     USER_AGENT = "Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:109.0) Gecko/20100101 Firefox/119.0"
 
-    def __init__(self, email: str, password: str, account_type: str = "REAL", proxy: str = None) -> None:
+    def __init__(self, email: str, password: str, account_type: str = "REAL", proxy: str = None,
+                 auto_logout: bool = True) -> None:
         self.email = email
         self.password = password
         self.account_type = account_type
         self.proxy = proxy
-        self.json_file_path = "list_info_data.json"
-        self.listinfodata_dict = {}
         self.loss_streak = 0
         self.accumulated_loss = Decimal("0.00")
         self.client = Quotex(
             email=email,
             email_pass=email,
-            auto_logout=True,
+            auto_logout=auto_logout,
             password=password,
             lang="pt",
             root_path="user_sessions"
         )
-        self.client.set_session(user_agent=self.USER_AGENT)
+        # Mantém cookies e token da sessão salva para não refazer o login à toa
+        saved = self.client.session_data or {}
+        self.client.set_session(
+            user_agent=self.USER_AGENT,
+            cookies=(saved.get("headers") or {}).get("Cookie"),
+            ssid=saved.get("token"),
+        )
         self.client.set_account_mode(balance_mode=account_type)
-        self.load_from_json()
-
-
-    def load_from_json(self):
-        if os.path.exists(self.json_file_path):
-            try:
-                with open(self.json_file_path, "r", encoding="utf-8") as f:
-                    self.listinfodata_dict = json.load(f)
-            except (json.JSONDecodeError, FileNotFoundError) as e:
-                print(f"Erro carregando JSON: {e}")
-                self.listinfodata_dict = {}
-        else:
-            self.listinfodata_dict = {}
 
     async def send_connect(self, retries=3):
         """Conecta ao Quotex com múltiplas tentativas."""
@@ -72,12 +59,83 @@ class QuotexManagement:
         await self.client.close()
         return balance
 
-    async def buy_sell(self, data: dict, retries=3):
+    async def get_profile(self):
+        """
+        Perfil e saldos da conta, reaproveitando a sessão salva.
+
+        Primeiro consulta o digest só com os cookies salvos, sem login nem
+        websocket; se a sessão expirou, conecta (refazendo o login) e tenta
+        de novo. Retorna o dict do perfil (com `session_reused`) ou None.
+        """
+        reused = True
+        profile = await self._fetch_profile()
+        if profile is None:
+            reused = False
+            if not await self.send_connect():
+                return None
+            try:
+                profile = await self._fetch_profile()
+            finally:
+                await self.client.close()
+        if profile is None:
+            return None
+        return {
+            "profile_id": profile.profile_id,
+            "nick_name": profile.nick_name,
+            "demo_balance": profile.demo_balance,
+            "live_balance": profile.live_balance,
+            "currency_symbol": profile.currency_symbol,
+            "currency_code": profile.currency_code,
+            "country": profile.country,
+            "country_name": profile.country_name,
+            "avatar": profile.avatar,
+            "session_reused": reused,
+        }
+
+    async def _fetch_profile(self):
+        try:
+            profile = await self.client.get_profile()
+        except ValueError:  # resposta HTML em vez de JSON: sessão expirada
+            return None
+        return profile if profile.profile_id is not None else None
+
+    async def get_trade_history(self, since=None, wanted=None, max_pages=50):
+        """
+        Pagina o histórico de operações com um único login.
+
+        Para na primeira página vazia, quando todos os tickets de `wanted`
+        já apareceram ou quando a página chega em operações abertas antes de
+        `since` (datetime aware). Retorna `{ticket: operação}` ou None se não
+        conectar.
+        """
+        if not await self.send_connect():
+            return None
+        account_type = "demo" if self.client.account_is_demo else "live"
+        wanted = {str(ticket) for ticket in wanted or ()}
+        history = {}
+        try:
+            for page in range(1, max_pages + 1):
+                items = await self.client.api.get_trader_history(account_type, page)
+                if not items:
+                    break
+                for item in items:
+                    history[str(item.get("ticket"))] = item
+                if wanted and wanted <= history.keys():
+                    break
+                opened = [parse_time_aware(i["openTime"]) for i in items if i.get("openTime")]
+                if since and opened and min(opened) < since:
+                    break
+        finally:
+            await self.client.close()
+        return history
+
+    async def buy_sell(self, data: dict, retries=3, context: TradeContext = None):
         """
         Executa um trade na Quotex com base no gerenciamento ativo.
         - Escolhe apenas ativos abertos com payout > 80%.
         - Calcula o valor da entrada baseado na sequência de loss e no Martingale.
         - Aguarda o momento exato para enviar a ordem.
+        Com `context` (montado no agendamento) não há consulta ao banco.
         """
 
         # 📌 Obtém informações básicas do trade
@@ -86,43 +144,42 @@ class QuotexManagement:
         direction = data["direction"]
         broker_id = data["broker_id"]
 
-        # 📌 Obtém a conta Quotex do cliente
-        qx = await sync_to_async(lambda: Qx.objects.get(id=broker_id))()
-        qx_manager = await sync_to_async(lambda: QuotexManager.objects.filter(customer=qx.customer).first())()
+        # 📌 Obtém conta e gerenciamento do cliente
+        if context is None:
+            context = await sync_to_async(TradeContext.load)(broker_id)
 
         # 📌 Conecta ao Quotex
         await self.send_connect()
 
-        # 🎯 Obtém a lista de pares disponíveis e seus payouts
-        payment_data = self.client.get_payment()
-
-        # ✅ Normaliza os pares de moedas e filtra pelos payouts
-        normalized_assets = normalize_parities(payment_data)
+        # 🎯 Ativos abertos com payout >= 80% (em cache até o instruments/list mudar)
+        await self.client.get_instruments()
+        tradable_assets = open_tradable_assets(self.client.api.instrument_catalog)
 
         # ❌ Se não houver pares disponíveis, aborta a operação
-        if not normalized_assets:
+        if not tradable_assets:
             print(f"⚠️ {email}: Nenhum ativo disponível com payout acima de 80%. Operação cancelada.")
             await self.client.close()
             return None, {}
 
         # 🎯 Escolhe um par aleatório entre os disponíveis
-        asset, payout = random.choice(list(normalized_assets.items()))
+        asset, payout = random.choice(tradable_assets)
 
         # 📌 Calcula o valor da entrada inicial
-        amount = await sync_to_async(self.calculate_dynamic_entry)(qx, qx_manager, payout)
+        amount = self.calculate_dynamic_entry(context, payout)
 
         # 📌 Garante que o saldo seja suficiente antes de operar
-        available_balance = qx.real_balance if qx.account_type == "REAL" else qx.demo_balance
+        available_balance = context.balance
         if float(amount) > available_balance:
             print(f"⛔ {email} SALDO INSUFICIENTE! Entrada: {amount}, Saldo: {available_balance}")
             await self.client.close()
             return None, {}
 
-        # ⏳ Aguarda o segundo exato para enviar a ordem
-        await wait_until_second(59)
+        # ⏳ Aguarda o segundo exato (no relógio do servidor) para enviar a ordem
+        skew = await wait_until_second(59, now=self.client.api.timesync.server_timestamp)
+        print(f"⏱️ {email}: ordem liberada com skew de {skew * 1000:.3f} ms")
 
         # 🎯 Controle de Martingale
-        max_martingale = qx_manager.martingale  # Número máximo de martingales
+        max_martingale = context.martingale  # Número máximo de martingales
         martingale_count = 0  # Contador de martingales
         current_amount = amount  # Começa com o valor inicial
 
@@ -161,10 +218,10 @@ class QuotexManagement:
                                 return status_buy, info_buy
 
                             # 📌 **Calcula o próximo valor de entrada com Martingale**
-                            next_amount = await sync_to_async(self.calculate_dynamic_entry)(qx, qx_manager, payout)
+                            next_amount = self.calculate_dynamic_entry(context, payout)
 
                             # 📌 **Verifica se há saldo suficiente para continuar**
-                            available_balance = qx.real_balance if qx.account_type == "REAL" else qx.demo_balance
+                            available_balance = context.balance
                             if next_amount > available_balance:
                                 print(f"⚠️ {email}: Saldo insuficiente para próximo Martingale ({next_amount}). Parando operações.")
                                 await self.client.close()
@@ -212,7 +269,7 @@ class QuotexManagement:
         await asyncio.sleep(time_to_wait)  # Aguarda até o trade fechar
 
 
-    def calculate_dynamic_entry(self, qx, qx_manager, payout):
+    def calculate_dynamic_entry(self, qx_manager, payout):
         """
         Calcula a entrada baseada no gerenciamento ativo:
         - Entrada fixa se não houver sequência de Loss.
@@ -233,10 +290,11 @@ class QuotexManagement:
     async def verify_trader(self, trader_id: str):
         """Verifica o status de um trade."""
         #wait self.send_connect()
-        self.load_from_json()
         try:
+            # Resultado já registrado (por esta ou outra instância) no log de deals
+            deal = self.client.api.listinfodata.get(trader_id) or {}
             result = await self.client.check_win(id_number=trader_id)
-            profit = self.client.get_profit() or self.listinfodata_dict.get(trader_id, {}).get("profit", 0)
+            profit = self.client.get_profit() or deal.get("profit") or 0
             return {"status": result, "profit": profit}
         except Exception:
             return {"status": False, "profit": 0}
@@ -0,0 +1,93 @@
+import asyncio
+from decimal import Decimal
+from collections import defaultdict
+
+from loguru import logger
+from django.contrib.contenttypes.models import ContentType
+
+from trading.models import TradeOrder
+from integrations.models import Quotex
+
+from .persistence import settle_orders
+from .quotex_management import QuotexManagement
+
+
+def pending_orders(order_ids=None):
+    """Ordens de Quotex ainda sem resultado e com id_trade."""
+    queryset = TradeOrder.objects.filter(
+        content_type=ContentType.objects.get_for_model(Quotex),
+        order_result_status="PENDING",
+        id_trade__isnull=False,
+    ).exclude(id_trade="")
+    if order_ids is not None:
+        queryset = queryset.filter(id__in=order_ids)
+    return queryset
+
+
+def history_profit(item):
+    """Lucro líquido de uma operação do histórico (`profit` ou `profitAmount`)."""
+    profit = item.get("profit", item.get("profitAmount"))
+    return None if profit is None else Decimal(str(profit))
+
+
+def history_results(orders, history):
+    """
+    Casa as ordens com o histórico por `id_trade`.
+
+    Retorna `id_trade -> lucro` das ordens que já aparecem no histórico, no
+    formato de `settle_orders`.
+    """
+    results = {}
+    for order in orders:
+        item = history.get(order.id_trade)
+        if item is not None:
+            results[order.id_trade] = history_profit(item)
+    return results
+
+
+def reconcile_trade_results(order_ids=None, max_pages=50, batch_size=500):
+    """
+    Concilia em lote os resultados das ordens pendentes pelo histórico.
+
+    As ordens são agrupadas por conta: cada conta faz um único login, pagina
+    o `GetHistory` até cobrir a ordem pendente mais antiga e recebe um único
+    `settle_orders` (resultado e saldo na mesma transação). Retorna um resumo com contas, ordens e atualizações.
+    """
+    by_account = defaultdict(list)
+    for order in pending_orders(order_ids):
+        by_account[order.object_id].append(order)
+    accounts = Quotex.objects.in_bulk(list(by_account))
+
+    summary = {"accounts": len(by_account), "pending": 0, "updated": 0, "failed_accounts": 0}
+    for broker_id, orders in by_account.items():
+        summary["pending"] += len(orders)
+        broker = accounts.get(broker_id)
+        if broker is None:
+            logger.warning(f"Corretora {broker_id} não encontrada para {len(orders)} ordem(ns)")
+            summary["failed_accounts"] += 1
+            continue
+
+        since = min(order.open_time or order.created_at for order in orders)
+        manager = QuotexManagement(broker.email, broker.password, broker.account_type)
+        try:
+            history = asyncio.run(
+                manager.get_trade_history(
+                    since=since, wanted=[order.id_trade for order in orders], max_pages=max_pages
+                )
+            )
+        except Exception as e:
+            logger.error(f"Erro ao buscar histórico de {broker.email}: {e}")
+            history = None
+        if history is None:
+            summary["failed_accounts"] += 1
+            continue
+
+        # Resultado e saldo na mesma transação; ordens já liquidadas pelo
+        # websocket ficam de fora e não creditam o lucro de novo
+        _, updated = settle_orders(history_results(orders, history), batch_size)
+        summary["updated"] += len(updated)
+        logger.info(
+            f"Conciliação {broker.email}: {len(updated)}/{len(orders)} ordem(ns) atualizadas "
+            f"({len(history)} operações no histórico)"
+        )
+    return summary
@@ -0,0 +1,137 @@
+import math
+import time
+import zlib
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from django.contrib.contenttypes.models import ContentType
+
+from trading.models import TradeOrder
+from integrations.models import Quotex
+
+BALANCE_SYNCED_KEY = "balance_synced_{}"
+
+MAX_AGE = timedelta(hours=48)  # Toda conta é atualizada pelo menos uma vez nesse intervalo
+CYCLE = timedelta(minutes=30)  # Intervalo do beat que chama o planejador
+MAX_BACKOFF = timedelta(hours=12)  # Espera máxima entre tentativas de uma conta que só falha
+
+
+def mark_balance_synced(broker_ids, timeout=None):
+    """
+    Marca as contas cujo saldo acabou de ser atualizado por um deal do websocket.
+
+    O planejador rebaixa essas contas: o saldo delas já está em dia sem
+    precisar de login na corretora.
+    """
+    now = time.time()
+    timeout = MAX_AGE.total_seconds() if timeout is None else timeout
+    cache.set_many({BALANCE_SYNCED_KEY.format(broker_id): now for broker_id in broker_ids}, timeout=timeout)
+
+
+def clear_balance_synced(broker_ids):
+    cache.delete_many([BALANCE_SYNCED_KEY.format(broker_id) for broker_id in broker_ids])
+
+
+def score_account(staleness, recent_trades, synced, activity_weight=0.25, synced_discount=0.2):
+    """
+    Prioridade de uma conta na fila de atualização.
+
+    `staleness` é a idade do último refresh como fração de `MAX_AGE` (>= 1
+    significa atrasada), `recent_trades` as ordens abertas desde então e
+    `synced` se um deal já atualizou o saldo em processo.
+    """
+    score = staleness + activity_weight * recent_trades
+    if synced:
+        score *= synced_discount
+    return score
+
+
+def cycle_budget(total, max_age=MAX_AGE, cycle=CYCLE, minimum=5):
+    """Contas por ciclo para que todas caibam em `max_age`, espalhadas pelos ciclos."""
+    cycles = max(1, max_age // cycle)
+    return max(minimum, math.ceil(total / cycles))
+
+
+def retry_backoff(failures, cycle=CYCLE, max_backoff=MAX_BACKOFF):
+    """Espera antes de tentar de novo uma conta com `failures` falhas seguidas."""
+    if failures <= 0:
+        return timedelta(0)
+    return min(max_backoff, cycle * 2 ** (failures - 1))
+
+
+def spread_slot(broker_id, slots):
+    """Ciclo (de 0 a `slots - 1`) fixo de uma conta que nunca sincronizou."""
+    return zlib.crc32(str(broker_id).encode()) % slots
+
+
+def plan_refresh(budget=None, now=None, max_age=MAX_AGE, cycle=CYCLE):
+    """
+    Escolhe as contas a atualizar neste ciclo.
+
+    Pontua todas as contas ativas por idade do último refresh de perfil
+    (`profile_synced_at`; os deals mexem em `updated_at`), atividade
+    recente de trades e marcador de saldo sincronizado por deal, e devolve
+    os ids do top-K. Contas além de `max_age` passam na frente de todas
+    as outras, mas nunca além do orçamento: um ciclo não loga em todas as
+    contas de uma vez.
+
+    Contas que nunca sincronizaram (`profile_synced_at` nulo, como todas
+    logo depois da migração) são espalhadas por `ceil(nunca / orçamento)`
+    ciclos pelo hash do id (`spread_slot`): cada ciclo só considera as do
+    seu slot, e os refreshes seguintes não ficam todos em sincronia.
+
+    Contas cujo último refresh falhou ficam de fora até passar o backoff
+    (`retry_backoff` das falhas seguidas, contado da última tentativa):
+    uma conta que só falha não ocupa vaga em todo ciclo.
+
+    O marcador de saldo fica no cache do Django (Redis, compartilhado entre
+    workers), então vale para deals gravados por qualquer processo.
+    """
+    now = now or timezone.now()
+    recent_trades = (
+        TradeOrder.objects.filter(
+            content_type=ContentType.objects.get_for_model(Quotex),
+            object_id=OuterRef("pk"),
+            created_at__gt=OuterRef("profile_synced_at"),
+        )
+        .order_by()
+        .values("object_id")
+        .annotate(total=Count("id"))
+        .values("total")
+    )
+    accounts = list(
+        Quotex.objects.filter(is_active=True)
+        .annotate(recent_trades=Coalesce(Subquery(recent_trades, output_field=IntegerField()), 0))
+        .values_list(
+            "id", "profile_synced_at", "recent_trades",
+            "profile_refresh_attempted_at", "profile_refresh_failures",
+        )
+    )
+    if not accounts:
+        return []
+
+    budget = budget or cycle_budget(len(accounts), max_age, cycle)
+    synced = cache.get_many([BALANCE_SYNCED_KEY.format(broker_id) for broker_id, *_ in accounts])
+    max_age_s = max_age.total_seconds()
+
+    never_synced = sum(1 for _, synced_at, *_ in accounts if synced_at is None)
+    slots = max(1, math.ceil(never_synced / budget))
+    slot = int(now.timestamp() // cycle.total_seconds()) % slots
+
+    scored = []
+    for broker_id, synced_at, trades, attempted_at, failures in accounts:
+        if attempted_at is not None and now - attempted_at < retry_backoff(failures, cycle):
+            continue  # Falhou há pouco: espera o backoff
+        if synced_at is None and spread_slot(broker_id, slots) != slot:
+            continue  # Nunca sincronizou: fica para o ciclo do seu slot
+        staleness = math.inf if synced_at is None else (now - synced_at).total_seconds() / max_age_s
+        if staleness >= 1:
+            score = math.inf  # Atrasada: desempata pela idade
+        else:
+            score = score_account(staleness, trades, BALANCE_SYNCED_KEY.format(broker_id) in synced)
+        scored.append((score, staleness, broker_id))
+    scored.sort(reverse=True)
+    return [broker_id for _, _, broker_id in scored[:budget]]
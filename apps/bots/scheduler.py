@@ -0,0 +1,98 @@
+import time
+import asyncio
+import threading
+from collections import deque
+
+
+class DeadlineScheduler:
+    """
+    Dispara ordens num instante exato usando o relógio monotônico.
+
+    Em vez de consultar `datetime.now()` a cada 10 ms, cada prazo é convertido
+    para `time.monotonic()`: o grupo dorme com `asyncio.sleep` até faltar
+    `spin` segundos e só então faz espera ativa até o prazo. Todas as contas
+    que aguardam o mesmo prazo no mesmo event loop formam uma coorte e são
+    liberadas juntas por um único disparo; por isso as ordens de um lote
+    rodam num loop só (`execute_trade_batch`). Loops diferentes (outros
+    lotes ou workers) só se alinham pelo alvo comum no relógio do servidor.
+    """
+
+    def __init__(self, spin=0.002, history=1000):
+        self.spin = spin
+        self.skews = deque(maxlen=history)
+        self._cohorts = {}  # (loop, coorte) -> Future com o prazo do disparo
+        self._lock = threading.Lock()
+
+    def target_for_second(self, second=59, now=None):
+        """
+        Próximo início do segundo `second` do minuto.
+
+        `now` é o horário de referência (de preferência o horário do servidor,
+        `client.api.timesync.server_timestamp`); sem ele usa `time.time()`.
+        Se já estamos dentro do segundo pedido, dispara imediatamente, como
+        o antigo `wait_until_second`.
+
+        Retorna `(alvo, prazo)`: o alvo em segundos inteiros no relógio de
+        referência (identifica a coorte) e o prazo em `time.monotonic()`.
+        """
+        monotonic_now = time.monotonic()
+        now = time.time() if now is None else now
+        minute = now - now % 60
+        target = minute + second
+        if now >= target + 1:
+            target += 60
+        return int(target), monotonic_now + max(0.0, target - now)
+
+    async def wait_until(self, deadline, cohort=None):
+        """
+        Aguarda o prazo monotônico `deadline` junto com a sua coorte.
+
+        Quem chega com o mesmo `cohort` no mesmo event loop é liberado pelo
+        mesmo disparo, no prazo de quem chegou primeiro. Retorna o atraso
+        (skew) em segundos desta espera em relação a esse prazo.
+        """
+        loop = asyncio.get_running_loop()
+        key = (loop, deadline if cohort is None else cohort)
+        with self._lock:
+            fired = self._cohorts.get(key)
+            if fired is None:
+                fired = self._cohorts[key] = loop.create_future()
+                loop.create_task(self._fire(key, deadline, fired))
+        deadline = await asyncio.shield(fired)
+        skew = time.monotonic() - deadline
+        self.skews.append(skew)
+        return skew
+
+    async def wait_for_second(self, second=59, now=None):
+        """Atalho: aguarda o início do segundo `second` e retorna o skew."""
+        target, deadline = self.target_for_second(second, now)
+        return await self.wait_until(deadline, cohort=target)
+
+    async def _fire(self, key, deadline, fired):
+        try:
+            remaining = deadline - time.monotonic()
+            if remaining > self.spin:
+                await asyncio.sleep(remaining - self.spin)
+            # Espera ativa só no último ou nos dois últimos milissegundos
+            while time.monotonic() < deadline:
+                pass
+            fired.set_result(deadline)
+        finally:
+            with self._lock:
+                self._cohorts.pop(key, None)
+
+    def stats(self):
+        """Resumo do skew dos disparos registrados, em milissegundos."""
+        skews = sorted(abs(skew) * 1000 for skew in self.skews)
+        if not skews:
+            return {"fires": 0}
+        return {
+            "fires": len(skews),
+            "mean_ms": round(sum(skews) / len(skews), 3),
+            "p50_ms": round(skews[len(skews) // 2], 3),
+            "p99_ms": round(skews[min(len(skews) - 1, int(len(skews) * 0.99))], 3),
+            "max_ms": round(skews[-1], 3),
+        }
+
+
+fire_scheduler = DeadlineScheduler()
@@ -1,178 +1,195 @@
 # bots/tasks.py
 import asyncio
-from decimal import Decimal
 import random
-from celery import shared_task
-from django.utils import timezone
+from celery import group, shared_task
 
-from bots.utils import calculate_entry_amount, is_valid_trader
+from bots.utils import TradeContext, calculate_entry_amount, eligible_traders
 from trading.models import TradeOrder
 from bots.constants import PARITIES
 from bots.quotex_management import QuotexManagement as BaseQuotex
-from integrations.models import Quotex, QuotexManagement
+from bots.reconciliation import reconcile_trade_results
+from bots.account_refresh import refresh_accounts
+from bots.refresh_planner import plan_refresh
+from integrations.models import Quotex
+
+# Contas por task de trade: todas no mesmo event loop, liberadas pelo mesmo disparo
+TRADE_BATCH_SIZE = 25
 
 
 @shared_task
-def verify_and_update_quotex(quotex_id=None):
+def verify_and_update_quotex(quotex_id=None, concurrency=20, chunk_size=100):
     """
     Verifica credenciais, atualiza perfil e saldo para um único Quotex ou para todos os ativos.
-    Se `quotex_id` for None, atualiza todos os clientes ativos em lotes de 20.
+    Todas as contas rodam num único event loop, no máximo `concurrency` ao mesmo tempo,
+    reaproveitando a sessão salva quando o token ainda vale; as gravações saem em
+    `bulk_update` a cada `chunk_size` contas.
     """
     # 1️⃣ Seleciona as contas a serem atualizadas
     if quotex_id:
         quotex_accounts = Quotex.objects.filter(id=quotex_id, is_active=True)
     else:
         quotex_accounts = Quotex.objects.filter(is_active=True)
+    accounts = list(quotex_accounts.select_related("customer"))
+
+    # 2️⃣ Atualiza todas com concorrência limitada
+    summary = asyncio.run(refresh_accounts(accounts, concurrency, chunk_size))
+
+    for email, reason in summary["failures"].items():
+        print(f"🚨 Erro ao processar {email}: {reason}")
+    print(
+        f"✅ {summary['updated']}/{summary['accounts']} contas Quotex atualizadas "
+        f"({summary['accounts_per_min']} contas/min, {summary['failed']} falhas)"
+    )
 
-    total_accounts = quotex_accounts.count()
-    chunk_size = 20  # Processar 20 clientes por vez
-
-    for start in range(0, total_accounts, chunk_size):
-        batch = quotex_accounts[start : start + chunk_size]
-
-        for quotex in batch:
-            try:
-                # ✅ Inicializa o gerenciador da Quotex
-                manager = BaseQuotex(
-                    email=quotex.email,
-                    password=quotex.password,
-                    account_type=quotex.account_type
-                )
-
-                # ✅ Testa conexão
-                connected = asyncio.run(manager.send_connect())
-                if not connected:
-                    print(f"Erro ao conectar com {quotex.email}")
-                    continue
-
-                # ✅ Obtém perfil e saldo
-                profile_data = asyncio.run(manager.get_profile())
-                if not profile_data :
-                    print(f"Erro ao obter dados de {quotex.email}")
-                    continue
-
-                # ✅ Conversão de valores
-                demo_balance = Decimal(str(profile_data["demo_balance"]))
-                real_balance = Decimal(str(profile_data["live_balance"]))
-                currency_symbol = profile_data.get("currency_symbol", "R$")
-                country_name = profile_data.get("country_name", "")
-                profile_id = profile_data.get("profile_id", "")
-                avatar = profile_data.get("avatar", "")
-
-                # ✅ Atualiza o Quotex no banco de dados
-                quotex.trader_id = profile_id
-                quotex.demo_balance = demo_balance
-                quotex.real_balance = real_balance
-                quotex.currency_symbol = currency_symbol
-
-                # ✅ Valida saldo mínimo para operar
-                if quotex.account_type == "REAL" and real_balance < Decimal("5"):
-                    quotex.is_active = False  # Desativa se saldo for insuficiente
-                elif quotex.account_type == "PRACTICE" and demo_balance < Decimal("1"):
-                    quotex.is_active = False  # Desativa conta prática sem saldo
-
-                quotex.updated_at = timezone.now()
-                quotex.save()
-
-                # ✅ Atualiza os dados do cliente associado
-                customer = quotex.customer
-                customer.country = country_name
-                customer.trader_id = profile_id
-                customer.avatar = avatar
-                customer.data_callback = profile_data  # Armazena dados do perfil
-                customer.save()
-
-                print(f"✅ Quotex atualizado: {quotex.email}")
-
-            except KeyError as e:
-                print(f"🚨 Erro de chave ausente: {str(e)}")
-            except Exception as e:
-                print(f"🚨 Erro ao processar {quotex.email}: {str(e)}")
-
-    return {"status": "success", "updated_accounts": total_accounts}
+    return {"status": "success", "updated_accounts": summary["updated"], **summary}
 
 @shared_task
-def execute_random_trade(quotex_id, data):
+def refresh_stale_quotex(budget=None):
     """
-    Executa uma entrada (trade) para uma única conta Quotex,
-    considerando o gerenciamento de risco.
+    Atualiza só as contas mais prioritárias deste ciclo (top-K do planejador):
+    as mais tempo sem refresh, com mais trades desde então e sem deal que já
+    tenha sincronizado o saldo. O resto fica espalhado pelos próximos ciclos.
+    """
+    quotex_ids = plan_refresh(budget)
+    accounts = list(Quotex.objects.filter(id__in=quotex_ids).select_related("customer"))
+    summary = asyncio.run(refresh_accounts(accounts))
+
+    print(
+        f"✅ Refresh incremental: {summary['updated']}/{len(quotex_ids)} contas "
+        f"({summary['failed']} falhas)"
+    )
+    return {"status": "success", "planned": len(quotex_ids), **summary}
+
+def _load_context(context):
+    if isinstance(context, dict):
+        return TradeContext.from_message(context)
+    return TradeContext.load(context)
+
+
+def _passwords(contexts):
     """
+    Senhas das contas do lote, lidas pelo próprio worker numa consulta só.
+
+    A mensagem do Celery não leva credenciais; com a sessão salva ainda
+    válida a senha nem chega a ser usada.
+    """
+    broker_ids = {context.broker_id for context in contexts}
+    return dict(Quotex.objects.filter(id__in=broker_ids).values_list("id", "password"))
 
-    # Obter a instância do Quotex
-    qx = Quotex.objects.get(id=quotex_id)
 
+async def _trade(context, data, password):
     # Criar o gerenciador
     manager = BaseQuotex(
-        email=qx.email,
-        password=qx.password,
-        account_type=qx.account_type
+        email=context.email,
+        password=password,
+        account_type=context.account_type
     )
 
     # Executar a operação
-    status_buy, info_buy = asyncio.run(manager.buy_sell(data))
+    status_buy, info_buy = await manager.buy_sell(data, context=context)
 
     return {
-        "email": qx.email,
+        "email": context.email,
         "status_buy": status_buy,
         "info_buy": info_buy
     }
 
 
 @shared_task
-def schedule_random_trades():
-    """
-    A cada 20 minutos, agenda trades aleatórios para clientes ativos na Quotex.
-    Processa em lotes de 20 para evitar sobrecarga.
+def execute_random_trade(context, data):
     """
+    Executa uma entrada (trade) para uma única conta Quotex,
+    considerando o gerenciamento de risco.
 
-    chunk_size = 20  # Processamos 20 contas por vez
-    quotex_accounts = Quotex.objects.filter(is_active=True, is_bot_active=True)
-    total = quotex_accounts.count()
-
-    for start in range(0, total, chunk_size):
-        batch = quotex_accounts[start : start + chunk_size]
-
-        for qx in batch:
-            # ✅ Verifica se o cliente pode operar
-            qx_manager = QuotexManagement.objects.filter(customer=qx.customer).first()
+    `context` é o `TradeContext` montado no agendamento, só com os campos de
+    risco; a senha o worker busca no banco. Ordens antigas mandam só o id.
+    """
+    context = _load_context(context)
+    password = _passwords([context]).get(context.broker_id)
+    return asyncio.run(_trade(context, data, password))
 
-            if not is_valid_trader(qx, qx_manager):
-                continue  # Ignora clientes que não passaram na validação
 
-            # 🎯 Obter a entrada considerando gerenciamento
-            amount = float(qx_manager.entry_value) or float(5)
+@shared_task
+def execute_trade_batch(orders):
+    """
+    Executa um lote de entradas `[(context, data), ...]` num único event loop.
 
-            # Escolher um ativo aleatório
-            asset = random.choice(PARITIES)
+    Todas as contas do lote esperam o mesmo segundo do minuto e formam uma só
+    coorte no `DeadlineScheduler`: um disparo libera o lote inteiro. Entre
+    lotes diferentes (outros workers) o alinhamento vem só do alvo comum no
+    relógio do servidor.
+    """
+    contexts = [_load_context(context) for context, _ in orders]
+    passwords = _passwords(contexts)
+
+    async def run():
+        return await asyncio.gather(
+            *(
+                _trade(context, data, passwords.get(context.broker_id))
+                for context, (_, data) in zip(contexts, orders)
+            ),
+            return_exceptions=True,
+        )
+
+    results = []
+    for (context, data), result in zip(orders, asyncio.run(run())):
+        if isinstance(result, Exception):
+            print(f"⚠️ Erro ao executar trade para {data.get('email')}: {result}")
+            result = {"email": data.get("email"), "status_buy": None, "info_buy": {}}
+        results.append(result)
+    return results
 
-            # Escolher se será compra ou venda
-            direction = random.choice(["call", "put"])
 
-            # Definir tempo da ordem (exemplo: 60 segundos)
-            duration = 60
+@shared_task
+def schedule_random_trades(batch_size=TRADE_BATCH_SIZE):
+    """
+    A cada 20 minutos, agenda trades aleatórios para clientes ativos na Quotex.
 
-            # Montar os parâmetros da ordem
-            data = {
-                "amount": amount,
-                "asset": asset,
-                "duration": duration,
-                "direction": direction,
-                "email": qx.email,
-                "costumer_id": qx.customer.id,
-                "broker_id": qx.id,
+    A elegibilidade sai de uma única consulta (`eligible_traders`); cada conta
+    vira um `TradeContext` e o lote inteiro é publicado como um `group` de
+    `execute_trade_batch`, `batch_size` contas por task (um event loop cada).
+    """
 
-            }
+    orders = []
+    for qx in eligible_traders():
+        context = TradeContext.from_account(qx)
+
+        # Montar os parâmetros da ordem (ativo e direção aleatórios, 60 segundos)
+        data = {
+            "amount": float(context.entry_value) or float(5),
+            "asset": random.choice(PARITIES),
+            "duration": 60,
+            "direction": random.choice(["call", "put"]),
+            "email": context.email,
+            "costumer_id": context.customer_id,
+            "broker_id": context.broker_id,
+        }
+        orders.append((context.to_message(), data))
+
+    # Enviar todas as ordens de uma vez como **tasks Celery assíncronas**
+    if orders:
+        group(
+            execute_trade_batch.s(orders[start:start + batch_size])
+            for start in range(0, len(orders), batch_size)
+        ).apply_async()
+
+    return f"{len(orders)} trades agendados com sucesso!"
 
-            # Enviar a ordem como uma **task Celery assíncrona**
-            execute_random_trade.delay(qx.id, data)
+@shared_task
+def reconcile_trade_results_task(order_ids=None):
+    """
+    Concilia em lote as ordens pendentes (todas ou só `order_ids`) pelo
+    histórico da Quotex: um login e um `bulk_update` por conta, em vez de
+    um login e um `check_win` por ordem.
+    """
+    return reconcile_trade_results(order_ids)
 
-    return f"{total} trades agendados com sucesso!"
 
 @shared_task
 def check_trade_status_task(trade_order_id):
     """
     Verifica e atualiza o status de um TradeOrder,
-    usando a API da Quotex.
+    usando a mesma conciliação pelo histórico da Quotex.
     """
     try:
         # Carrega a ordem
@@ -181,45 +198,12 @@ def check_trade_status_task(trade_order_id):
         return {"error": f"TradeOrder {trade_order_id} não encontrado."}
 
     # Obtém o ID da trade na corretora (id_trade)
-    trader_id = trade_order.id_trade
-    if not trader_id:
+    if not trade_order.id_trade:
         return {"error": "Essa TradeOrder não possui id_trade para verificar."}
-    
-    trader_id = trade_order.id_trade
+
     if trade_order.order_result_status in ["WIN", "LOSS", "DOGI"]:
         return {"error": "Essa TradeOrder já foi verificado."}
 
-    # Precisamos do email, password e account_type para conectar
-    # Ao broker (Quotex). Se você tiver armazenado isso:
-    broker_obj = trade_order.broker  # se 'broker' for a GenericForeignKey para o modelo Quotex
-    email = broker_obj.email
-    password = broker_obj.password
-    account_type = broker_obj.account_type
-
-    manager = BaseQuotex(email, password, account_type)
-
-    # Faz a verificação de forma assíncrona:
-    status = asyncio.run(manager.verify_trader(trader_id))
-
-    # Decida como mapear esse `status` para o modelo
-    # Ex.: se status["status"] == "WIN", trade_order.order_result_status = "WIN"
-    if "status" in status:
-        if status["status"] == True:
-            trade_order.order_result_status = "WIN"
-            trade_order.result = trade_order.result
-        elif status["status"] == False:
-            trade_order.order_result_status = "LOSS"
-            trade_order.result = f"-{trade_order.amount}"
-        else:
-            trade_order.order_result_status = "DOGI"
-            trade_order.result = 0
-
-    # Se houver um lucro adicional
-    if "profit" in status:
-        trade_order.result = status["profit"]
-
-    # Marca como executada
-    trade_order.status = "EXECUTED"
-    trade_order.save()
-
-    return {"success": True, "new_status": trade_order.order_result_status}
\ No newline at end of file
+    reconcile_trade_results([trade_order.id])
+    trade_order.refresh_from_db(fields=["order_result_status"])
+    return {"success": True, "new_status": trade_order.order_result_status}
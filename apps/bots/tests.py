@@ -1,3 +1,83 @@
-from django.test import TestCase
+from datetime import datetime, timezone as dt_timezone
+from unittest import mock
 
-# Create your tests here.
+from django.test import SimpleTestCase, TestCase
+
+from customer.models import Customer
+from integrations.models import Quotex
+
+from quotexapi.ws.objects.instruments import InstrumentCatalog
+
+from bots import utils
+from bots.refresh_planner import CYCLE, plan_refresh
+
+
+def instrument_row(symbol, name, payout, is_open):
+    """Linha de `instruments/list` só com os campos que o catálogo lê."""
+    row = [0] * 24
+    row[0], row[1], row[2], row[3] = 1, symbol, name, "currency"
+    row[5], row[14], row[18] = payout, is_open, payout
+    return row
+
+
+INSTRUMENTS = [
+    instrument_row("EURUSD_otc", "EUR/USD (OTC)", 85, 1),
+    instrument_row("GBPUSD", "GBP/USD", 90, 0),
+    instrument_row("USDJPY_otc", "USD/JPY (OTC)", 70, 1),
+]
+
+
+class TradableUniverseCacheTests(SimpleTestCase):
+    """Sessões com o mesmo `instruments/list` montam o universo uma vez só."""
+
+    def setUp(self):
+        utils._UNIVERSE_CACHE.clear()
+        self.addCleanup(utils._UNIVERSE_CACHE.clear)
+
+    def catalog(self, rows):
+        catalog = InstrumentCatalog()
+        catalog.update([list(row) for row in rows])
+        return catalog
+
+    def test_sessions_with_the_same_instruments_share_one_build(self):
+        with mock.patch.object(utils, "normalize_pair_name", wraps=utils.normalize_pair_name) as normalize:
+            first = utils.open_tradable_assets(self.catalog(INSTRUMENTS))
+            builds = normalize.call_count
+            second = utils.open_tradable_assets(self.catalog(INSTRUMENTS))
+            self.assertEqual(normalize.call_count, builds)
+        self.assertIs(first, second)
+        self.assertEqual(first, [("EURUSD_otc", 85)])
+
+    def test_a_changed_payout_or_threshold_builds_again(self):
+        utils.tradable_universe(self.catalog(INSTRUMENTS))
+        changed = [instrument_row("EURUSD_otc", "EUR/USD (OTC)", 75, 1)] + INSTRUMENTS[1:]
+        self.assertEqual(utils.tradable_universe(self.catalog(changed)), {
+            "GBPUSD": utils.TradableAsset(90, False),
+        })
+        self.assertIn("USDJPY_otc", utils.tradable_universe(self.catalog(INSTRUMENTS), payout_min=60))
+
+
+class RefreshPlannerSpreadTests(TestCase):
+    """Contas que nunca sincronizaram não entram todas no mesmo ciclo."""
+
+    def setUp(self):
+        for n in range(40):
+            customer = Customer.objects.create(email=f"c{n}@example.com", trader_id=f"c{n}")
+            Quotex.objects.create(
+                customer=customer, trader_id=f"t{n}", email=f"q{n}@example.com", password="x", is_active=True
+            )
+
+    def test_null_only_population_is_spread_across_cycles(self):
+        now = datetime(2026, 10, 18, tzinfo=dt_timezone.utc)
+        per_cycle = []
+        for _ in range(12):
+            ids = plan_refresh(budget=5, now=now)
+            per_cycle.append(len(ids))
+            Quotex.objects.filter(id__in=ids).update(profile_synced_at=now)
+            now += CYCLE
+
+        self.assertLessEqual(max(per_cycle), 5)
+        self.assertEqual(Quotex.objects.filter(profile_synced_at__isnull=True).count(), 0)
+        # Sincronizadas em vários ciclos, não em lote: os próximos refreshes também se espalham
+        synced_at = set(Quotex.objects.values_list("profile_synced_at", flat=True))
+        self.assertGreaterEqual(len(synced_at), 8)
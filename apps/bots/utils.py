@@ -1,14 +1,26 @@
-import asyncio
 import datetime
+import threading
 from decimal import Decimal
+from collections import OrderedDict, namedtuple
 
+from django.db.models import Case, DecimalField, F, Value, When
 from django.utils import timezone
 from django.contrib.contenttypes.models import ContentType
 
 from .constants import PARITIES
+from .scheduler import fire_scheduler
 from trading.models import TradeOrder
 from integrations.models import Quotex, QuotexManagement
 
+PARITIES_SET = frozenset(PARITIES)
+
+TradableAsset = namedtuple("TradableAsset", "payout is_open")
+
+# Universos de ativos por (impressão digital do instruments/list, payout mínimo)
+UNIVERSE_CACHE_SIZE = 32
+_UNIVERSE_CACHE = OrderedDict()
+_UNIVERSE_LOCK = threading.Lock()
+
 
 def parse_time_aware(timestr):
     naive_dt = datetime.datetime.strptime(timestr, "%Y-%m-%d %H:%M:%S")
@@ -17,18 +29,13 @@ def parse_time_aware(timestr):
     return aware_dt
 
 
-async def wait_until_second(second=59):
+async def wait_until_second(second=59, now=None):
     """
-    Aguarda até que datetime.now().second == second.
-    Cuidado com latências de rede ou possíveis atrasos de execução.
+    Aguarda até o início do segundo `second` do minuto.
+    Usa o `DeadlineScheduler` (relógio monotônico + espera ativa só no fim)
+    e retorna o skew do disparo em segundos.
     """
-    while True:
-        now = datetime.datetime.now()
-        if now.second == second:
-            # Opcional: ajustar para quebrar no milissegundo 0, se quiser mais precisão
-            break
-        # Dorme apenas frações de segundo para não perder o timing
-        await asyncio.sleep(0.01)
+    return await fire_scheduler.wait_for_second(second, now)
 
 
 def is_valid_trader(qx: Quotex, qx_manager:QuotexManagement):
@@ -70,6 +77,86 @@ def is_valid_trader(qx: Quotex, qx_manager:QuotexManagement):
     return True  # Tudo certo para operar!
 
 
+def eligible_traders(now=None):
+    """
+    Contas aptas a operar, com as mesmas regras de `is_valid_trader` numa
+    única consulta (conta, cliente e gerenciamento via `select_related`).
+
+    Só entram contas com gerenciamento cadastrado: sem ele não há entrada
+    nem limite de Martingale para operar.
+    """
+    now = now or timezone.now()
+    decimal = DecimalField(max_digits=10, decimal_places=2)
+    return (
+        Quotex.objects.filter(is_active=True, is_bot_active=True)
+        .exclude(test_period=True, test_expiration__lt=now)  # Teste expirado
+        .select_related("customer__quotex_management")
+        .annotate(
+            balance=Case(When(account_type="REAL", then=F("real_balance")), default=F("demo_balance"),
+                         output_field=decimal),
+            min_balance=Case(When(currency_symbol="R$", then=Value(Decimal("5"))), default=Value(Decimal("1")),
+                             output_field=decimal),
+        )
+        .filter(
+            balance__gte=F("min_balance"),
+            customer__quotex_management__isnull=False,
+            customer__quotex_management__entry_value__lte=F("balance"),
+        )
+    )
+
+
+class TradeContext(namedtuple(
+    "TradeContext",
+    "broker_id customer_id email account_type currency_symbol balance entry_value stop_gain martingale",
+)):
+    """
+    Retrato imutável de uma conta no momento do agendamento.
+
+    Vai junto com a ordem na mensagem do Celery para o worker operar sem
+    voltar ao banco. Os saldos são os do agendamento, como antes eram os
+    lidos no começo do `buy_sell`. Credenciais não entram na mensagem: o
+    worker lê a senha da conta por conta própria.
+    """
+    __slots__ = ()
+
+    DECIMALS = ("balance", "entry_value", "stop_gain")
+
+    @classmethod
+    def from_account(cls, qx):
+        management = qx.customer.quotex_management
+        return cls(
+            broker_id=qx.id,
+            customer_id=qx.customer_id,
+            email=qx.email,
+            account_type=qx.account_type,
+            currency_symbol=qx.currency_symbol,
+            balance=qx.real_balance if qx.account_type == "REAL" else qx.demo_balance,
+            entry_value=management.entry_value,
+            stop_gain=management.stop_gain,
+            martingale=management.martingale,
+        )
+
+    @classmethod
+    def load(cls, broker_id):
+        """Monta o contexto direto do banco (ordens sem contexto na mensagem)."""
+        return cls.from_account(Quotex.objects.select_related("customer__quotex_management").get(id=broker_id))
+
+    def to_message(self):
+        """Dict serializável em JSON (decimais como texto)."""
+        message = self._asdict()
+        for field in self.DECIMALS:
+            message[field] = str(message[field])
+        return message
+
+    @classmethod
+    def from_message(cls, message):
+        values = dict(message)
+        values.pop("password", None)  # Mensagens publicadas antes de a senha sair
+        for field in cls.DECIMALS:
+            values[field] = Decimal(values[field])
+        return cls(**values)
+
+
 
 def calculate_entry_amount(qx, qx_manager):
     """
@@ -110,6 +197,11 @@ def calculate_entry_amount(qx, qx_manager):
     return max(entry_value, min_entry_value)
 
 
+def normalize_pair_name(name):
+    """Converte "USD/JPY (OTC)" para "USDJPY_otc"."""
+    return name.replace(" (OTC)", "_otc").replace("/", "")
+
+
 def normalize_parities(raw_parities, payout_min=80):
     """
     Normaliza os pares de moedas removendo "(OTC)" e adicionando "_otc" no final se necessário.
@@ -127,15 +219,64 @@ def normalize_parities(raw_parities, payout_min=80):
 
         # Verifica se o payout é maior ou igual ao mínimo
         if payout >= payout_min:
-            normalized_pair = pair.replace(" (OTC)", "_otc").replace("/", "")  # Converte "USDJPY (OTC)" para "USDJPY_otc"
+            normalized_pair = normalize_pair_name(pair)  # Converte "USDJPY (OTC)" para "USDJPY_otc"
             
             # Mantém apenas os pares que estão na lista definida
-            if normalized_pair.replace("_otc", "") in PARITIES:
+            if normalized_pair.replace("_otc", "") in PARITIES_SET:
                 normalized_parities[normalized_pair] = payout
 
     return normalized_parities
 
 
+def _shared_view(key, build):
+    """Cache de processo das visões do catálogo, compartilhado entre sessões."""
+    with _UNIVERSE_LOCK:
+        value = _UNIVERSE_CACHE.get(key)
+        if value is not None:
+            _UNIVERSE_CACHE.move_to_end(key)
+            return value
+    value = build()
+    with _UNIVERSE_LOCK:
+        _UNIVERSE_CACHE[key] = value
+        while len(_UNIVERSE_CACHE) > UNIVERSE_CACHE_SIZE:
+            _UNIVERSE_CACHE.popitem(last=False)
+    return value
+
+
+def tradable_universe(catalog, payout_min=80):
+    """
+    Universo de ativos negociáveis: {"USDJPY_otc": TradableAsset(payout, is_open)}.
+
+    Fica num cache do processo, chaveado pela impressão digital do
+    `instruments/list` e pelo payout mínimo: cada trade abre uma sessão (e um
+    catálogo) nova, mas enquanto a lista não mudar o universo é montado uma
+    vez só. Não altere o dicionário retornado, ele é compartilhado.
+    """
+    def build():
+        universe = {}
+        for instrument in catalog.by_name.values():
+            if instrument.payout < payout_min:
+                continue
+            symbol = normalize_pair_name(instrument.name)
+            if symbol.replace("_otc", "") in PARITIES_SET:
+                universe[symbol] = TradableAsset(instrument.payout, bool(instrument.is_open))
+        return universe
+
+    return _shared_view(("universe", catalog.fingerprint(), payout_min), build)
+
+
+def open_tradable_assets(catalog, payout_min=80):
+    """
+    Lista [(ativo, payout)] só dos ativos abertos do universo, pronta para
+    `random.choice`. Fica no mesmo cache de processo do universo.
+    """
+    def build():
+        universe = tradable_universe(catalog, payout_min)
+        return [(symbol, asset.payout) for symbol, asset in universe.items() if asset.is_open]
+
+    return _shared_view(("open_universe", catalog.fingerprint(), payout_min), build)
+
+
 def check_loss_streak(qx):
     """
     Verifica quantas perdas consecutivas o trader teve.
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.1 on 2026-10-18 10:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("integrations", "0008_quotexmanagement_management_type"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="quotex",
+            name="profile_synced_at",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="Quando perfil e saldo foram lidos da corretora pela última vez",
+                null=True,
+                verbose_name="Último Refresh do Perfil",
+            ),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.0.1 on 2026-10-18 11:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("integrations", "0009_quotex_profile_synced_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="quotex",
+            name="profile_refresh_attempted_at",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="Quando o último refresh do perfil foi tentado, com ou sem sucesso",
+                null=True,
+                verbose_name="Última Tentativa de Refresh",
+            ),
+        ),
+        migrations.AddField(
+            model_name="quotex",
+            name="profile_refresh_failures",
+            field=models.PositiveIntegerField(
+                default=0,
+                help_text="Refreshes de perfil que falharam desde o último sucesso",
+                verbose_name="Falhas Seguidas de Refresh",
+            ),
+        ),
+    ]
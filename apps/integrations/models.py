@@ -54,6 +54,23 @@ class Quotex(models.Model):
         max_length=255,
         verbose_name="Slug"
     )
+    profile_synced_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Último Refresh do Perfil",
+        help_text="Quando perfil e saldo foram lidos da corretora pela última vez"
+    )
+    profile_refresh_attempted_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Última Tentativa de Refresh",
+        help_text="Quando o último refresh do perfil foi tentado, com ou sem sucesso"
+    )
+    profile_refresh_failures = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Falhas Seguidas de Refresh",
+        help_text="Refreshes de perfil que falharam desde o último sucesso"
+    )
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Data de Criação")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="Última Atualização")
 
@@ -103,9 +103,10 @@ class TradeOrderAdmin(ExportMixin, admin.ModelAdmin):
 
     @admin.action(description="Verificar Status de Operações")
     def verify_status(self, request, queryset):
-        from bots.tasks import check_trade_status_task
-        for trade_order in queryset:
-            check_trade_status_task.delay(trade_order.id)
-        self.message_user(request, f"Verificação disparada para {queryset.count()} ordem(ns).")
+        from bots.tasks import reconcile_trade_results_task
+        # Uma única tarefa concilia todas as ordens: um login por conta
+        order_ids = list(queryset.values_list("id", flat=True))
+        reconcile_trade_results_task.delay(order_ids)
+        self.message_user(request, f"Verificação disparada para {len(order_ids)} ordem(ns).")
 
 
@@ -28,10 +28,11 @@ app.conf.beat_schedule = {
         'schedule': crontab(minute='*/20'),  # A cada 20 minutos
     },
 
-    # ✅ Tarefa: Verificar e atualizar informações da Quotex a cada 5 horas
-    'verify-update-quotex-every-5-hours': {
-        'task': 'bots.tasks.verify_and_update_quotex',
-        'schedule': crontab(minute=0, hour='*/5'),  # A cada 5 horas
+    # ✅ Tarefa: Atualizar informações da Quotex de forma incremental a cada 30 minutos
+    # (só o top-K das contas mais desatualizadas; todas passam em até 48h)
+    'refresh-stale-quotex-every-30-minutes': {
+        'task': 'bots.tasks.refresh_stale_quotex',
+        'schedule': crontab(minute='*/30'),  # A cada 30 minutos
         'args': []  # Pode ser chamado com argumentos caso necessário
     },
 
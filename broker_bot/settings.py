@@ -167,6 +167,15 @@ CELERY_RESULT_BACKEND = config(
     default=f"redis://{REDIS_HOST}:{REDIS_PORT}/0"
 )
 
+# Cache compartilhado entre web, workers e beat (deduplicação de eventos do
+# websocket e marcadores do planejador precisam valer entre processos)
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": config("CACHE_URL", default=f"redis://{REDIS_HOST}:{REDIS_PORT}/1"),
+    }
+}
+
 # Outras configurações Celery
 CELERY_ACCEPT_CONTENT = ["json"]
 CELERY_TASK_SERIALIZER = "json"
@@ -0,0 +1,52 @@
+"""Benchmark: calculate_candles/process_candles em Python x versões NumPy.
+
+A equivalência das duas implementações é coberta pelos testes
+(`quotexapi/tests.py`); aqui só se mede o tempo.
+
+Uso: python dev/benchmarks/candles.py [periodo]
+"""
+
+import sys
+import time
+import random
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from quotexapi.utils import processor  # noqa: E402
+
+SIZES = (10_000, 100_000, 1_000_000)
+
+
+def build_history(count, seed=None):
+    """Ticks no formato do history/list/v2: [tempo, preço, 0]."""
+    rng = random.Random(seed)
+    timestamp = 1721510058.627
+    history = []
+    for _ in range(count):
+        timestamp += rng.random() * rng.choice((0.3, 2.0, 30.0))
+        history.append([timestamp, round(rng.uniform(1.05, 1.10), 5), 0])
+    return history
+
+
+def measure(func, history, period):
+    start = time.perf_counter()
+    func(history, period)
+    return time.perf_counter() - start
+
+
+def main():
+    period = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+    for count in SIZES:
+        history = build_history(count, seed=count)
+        for name in ("calculate_candles", "process_candles"):
+            reference = measure(getattr(processor, name), history, period)
+            vectorized = measure(getattr(processor, name + "_np"), history, period)
+            print(
+                f"{name:18} {count:>9} ticks  python {reference * 1000:9.1f} ms  "
+                f"numpy {vectorized * 1000:8.1f} ms  {reference / vectorized:5.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""Benchmark: latência ordem→ack do envio antigo x pipeline enxuto de ordens.
+
+Sobe um servidor websocket local que imita o da Quotex (decodifica cada
+frame e responde `orders/open` com `s_orders/open`) e mede:
+
+* ordens em sequência, uma de cada vez: antes cada ordem levava
+  `settings/store` + `tick` + `orders/open` montado com `json.dumps`;
+  agora só o `orders/open` a partir do template (settings uma vez por sessão);
+* rajada de várias ordens: antes um frame por vez pela fila, agora
+  `Buy.many`, escritas em sequência numa única rajada.
+
+Uso: python dev/benchmarks/order_pipeline.py [ordens] [tamanho_da_rajada]
+"""
+
+import sys
+import json
+import time
+import asyncio
+import statistics
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from websockets.asyncio.client import connect  # noqa: E402
+from websockets.asyncio.server import serve  # noqa: E402
+
+from quotexapi.ws.channels.buy import Buy  # noqa: E402
+from quotexapi.ws.objects.timesync import TimeSync  # noqa: E402
+from quotexapi.ws.sender import AsyncWebsocketSender  # noqa: E402
+
+ASSET = "EURUSD_otc"
+
+
+async def stand_in_server(connection):
+    """Responde cada orders/open com o ack; os demais frames só são lidos."""
+    async for message in connection:
+        if not message.startswith("42"):
+            continue
+        event, *payload = json.loads(message[2:])
+        if event == "orders/open":
+            ack = {"id": f"deal{payload[0]['requestId']}", **payload[0]}
+            await connection.send(f'42["s_orders/open",{json.dumps(ack)}]')
+
+
+class StandInAPI:
+    """O mínimo de `QuotexAPI` usado pelo canal `Buy`."""
+
+    account_type = 1
+
+    def __init__(self, sender):
+        self.sender = sender
+        self.session = SimpleNamespace(chart_settings_stored=False)
+        self.timesync = TimeSync()
+
+    def send_websocket_request(self, data, priority=None):
+        return self.sender.send(data, priority)
+
+    def send_websocket_burst(self, frames, priority=None):
+        return self.sender.send_many(frames, priority)
+
+
+def legacy_buy(api, price, asset, direction, duration, request_id):
+    """Cópia do envio antigo: settings/store + tick + orders/open por ordem."""
+    payload = {
+        "chartId": "graph",
+        "settings": {
+            "chartId": "graph",
+            "chartType": 2,
+            "currentExpirationTime": duration,
+            "isFastOption": False,
+            "isFastAmountOption": False,
+            "isIndicatorsMinimized": False,
+            "isIndicatorsShowing": True,
+            "isShortBetElement": False,
+            "chartPeriod": 4,
+            "currentAsset": {"symbol": asset},
+            "dealValue": 5,
+            "dealPercentValue": 1,
+            "isVisible": True,
+            "timePeriod": 30,
+            "gridOpacity": 8,
+            "isAutoScrolling": 1,
+            "isOneClickTrade": True,
+            "upColor": "#0FAF59",
+            "downColor": "#FF6251",
+        },
+    }
+    api.send_websocket_request(f'42["settings/store",{json.dumps(payload)}]')
+    payload = {
+        "asset": asset,
+        "amount": price,
+        "time": duration,
+        "action": direction,
+        "isDemo": api.account_type,
+        "tournamentId": 0,
+        "requestId": request_id,
+        "optionType": 100,
+    }
+    api.send_websocket_request('42["tick"]')
+    api.send_websocket_request(f'42["orders/open",{json.dumps(payload)}]')
+
+
+class Client:
+    """Conexão com o servidor local; casa cada ack com a ordem pelo requestId."""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.pending = {}
+        self.sender = AsyncWebsocketSender(self.write).start()
+        self.api = StandInAPI(self.sender)
+        self.request_id = 0
+        self.reader = asyncio.ensure_future(self.read())
+
+    async def write(self, data):
+        await self.connection.send(data)
+        return True
+
+    async def read(self):
+        async for message in self.connection:
+            ack = json.loads(message[2:])[1]
+            self.pending.pop(ack["requestId"]).set_result(ack)
+
+    def orders(self, count):
+        loop = asyncio.get_running_loop()
+        orders = []
+        for _ in range(count):
+            self.request_id += 1
+            self.pending[self.request_id] = loop.create_future()
+            orders.append((5, ASSET, "call", 60, self.request_id))
+        return orders
+
+    async def close(self):
+        self.sender.stop()
+        self.reader.cancel()
+        await self.connection.close()
+
+
+async def sequential(client, send, count):
+    """Latências (ms) de `count` ordens, uma após o ack da anterior."""
+    latencies = []
+    for _ in range(count):
+        order = client.orders(1)[0]
+        future = client.pending[order[-1]]
+        start = time.perf_counter()
+        send(client.api, *order)
+        await future
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+async def burst(client, send_all, size, rounds):
+    """Tempo (ms) até o último ack de cada rajada de `size` ordens."""
+    elapsed = []
+    for _ in range(rounds):
+        orders = client.orders(size)
+        futures = [client.pending[order[-1]] for order in orders]
+        start = time.perf_counter()
+        send_all(client.api, orders)
+        await asyncio.gather(*futures)
+        elapsed.append((time.perf_counter() - start) * 1000)
+    return elapsed
+
+
+def legacy_burst(api, orders):
+    for order in orders:
+        legacy_buy(api, *order)
+
+
+def lean_burst(api, orders):
+    Buy(api).many(orders)
+
+
+def lean_buy(api, *order):
+    Buy(api)(*order)
+
+
+def summary(values):
+    values = sorted(values)
+    p99 = values[min(len(values) - 1, int(len(values) * 0.99))]
+    return f"p50 {statistics.median(values):7.3f} ms  p99 {p99:7.3f} ms"
+
+
+async def run(count, size):
+    async with serve(stand_in_server, "localhost", 0) as server:
+        port = server.sockets[0].getsockname()[1]
+        client = Client(await connect(f"ws://localhost:{port}", max_size=None))
+        # Aquecimento da conexão e do servidor
+        await sequential(client, lean_buy, 50)
+
+        before = await sequential(client, legacy_buy, count)
+        after = await sequential(client, lean_buy, count)
+        print(f"ordens em sequência ({count}):")
+        print(f"  antes:  {summary(before)}")
+        print(f"  depois: {summary(after)}")
+
+        rounds = max(1, count // size)
+        before = await burst(client, legacy_burst, size, rounds)
+        after = await burst(client, lean_burst, size, rounds)
+        print(f"rajadas de {size} ordens ({rounds}x), até o último ack:")
+        print(f"  antes:  {summary(before)}")
+        print(f"  depois: {summary(after)}")
+        await client.close()
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    size = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    asyncio.run(run(count, size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Microbenchmark: frames/sec do on_message antigo x `WebsocketClient.on_message`.
+
+O lado "depois" passa cada frame pelo caminho real do cliente: decodificação
+no `FrameDecoder`, roteamento por evento e handler de cotações (ring buffer,
+streams, builders e sincronização de relógio) de uma `QuotexAPI` sem conexão.
+O client importa os models do Django, então o script sobe o Django com
+`DJANGO_SETTINGS_MODULE` (padrão `broker_bot.settings`).
+
+Uso: python dev/benchmarks/ws_dispatch.py [quantidade_de_frames]
+"""
+
+import os
+import sys
+import json
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path[:0] = [str(ROOT), str(ROOT / "apps")]
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "broker_bot.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from quotexapi.api import QuotexAPI  # noqa: E402
+from quotexapi.ws.client import WebsocketClient  # noqa: E402
+from quotexapi.ws.objects.ticks import TickBuffer  # noqa: E402
+
+ASSET = "EURUSD_otc"
+
+
+def build_frames(count):
+    """Sequência parecida com um stream real: placeholder + binário de cotação."""
+    frames = []
+    for i in range(count // 2):
+        frames.append('451-["quotes/stream",{"_placeholder":true,"num":0}]')
+        quote = [[ASSET, 1721510058.627 + i, 1.08123 + i * 1e-5, 0]]
+        frames.append(b"\x04" + json.dumps(quote).encode())
+    return frames
+
+
+def legacy_on_message(state, message):
+    """Cópia da cascata de substrings do `on_message` anterior ao dispatcher.
+
+    Só os envios (`tick` a cada 5 s) e os logs ficaram de fora; os testes
+    e atribuições são os mesmos, na mesma ordem.
+    """
+    current_time = time.localtime()
+    if current_time.tm_sec in [0, 5, 10, 15, 20, 30, 40, 50]:
+        pass
+    try:
+        if "authorization/reject" in str(message):
+            state["rejected"] = 1
+        elif "s_authorization" in str(message):
+            state["accepted"] = 1
+        elif "instruments/list" in str(message):
+            state["listen_instruments"] = True
+        try:
+            message = message[1:].decode()
+            message = json.loads(message)
+            state["wss_message"] = message
+            if "call" in str(message) or "put" in str(message):
+                state["instruments"] = message
+            if message.get("signals"):
+                pass
+        except Exception:
+            pass
+        if str(message) == "41":
+            state["connected"] = 0
+        if "51-" in str(message):
+            state["temp_status"] = str(message)
+        elif len(message[0]) == 4:
+            state["prices"].append({"time": message[0][1], "price": message[0][2]})
+    except Exception:
+        pass
+
+
+def run_legacy(frames):
+    state = {"temp_status": "", "prices": []}
+    for frame in frames:
+        legacy_on_message(state, frame)
+    return len(state["prices"])
+
+
+def build_client(capacity):
+    """`WebsocketClient` de uma `QuotexAPI` sem conexão, assinando o ativo."""
+    api = QuotexAPI("qxbroker.com", "bench@example.com", "", "pt", {"token": None})
+    api.realtime_price[ASSET] = TickBuffer(capacity)
+    return api, WebsocketClient(api)
+
+
+def run_client(frames):
+    api, client = build_client(len(frames))
+    for message in frames:
+        client.on_message(client.wss, message)
+    return len(api.realtime_price[ASSET])
+
+
+def measure(func, frames):
+    start = time.perf_counter()
+    ticks = func(frames)
+    elapsed = time.perf_counter() - start
+    return len(frames) / elapsed, ticks
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    frames = build_frames(count)
+    before, ticks_before = measure(run_legacy, frames)
+    after, ticks_after = measure(run_client, frames)
+    assert ticks_before == ticks_after, (ticks_before, ticks_after)
+    print(f"frames: {len(frames)}")
+    print(f"antes:  {before:,.0f} frames/s")
+    print(f"depois: {after:,.0f} frames/s ({after / before:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
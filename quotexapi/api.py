@@ -1,7 +1,6 @@
 """Module for Quotex websocket."""
 
 import os
-import time
 import json
 import ssl
 import requests
@@ -12,7 +11,6 @@ import atexit
 import asyncio
 import platform
 import threading
-from . import global_value
 from .http.home import Home
 from .http.login import Login
 from .http.logout import Logout
@@ -23,11 +21,16 @@ from .ws.channels.ssid import Ssid
 from .ws.channels.buy import Buy
 from .ws.channels.candles import GetCandles
 from .ws.channels.sell_option import SellOption
-from .ws.objects.timesync import TimeSync
-from .ws.objects.candles import Candles
-from .ws.objects.profile import Profile
-from .ws.objects.listinfodata import ListInfoData
 from .ws.client import WebsocketClient
+from .ws.sender import WebsocketSender, AsyncWebsocketSender
+from .ws.async_client import AsyncWebsocketClient
+from .session import SessionContext
+from .ws.objects.ticks import TickBuffer
+from .utils.processor import MultiCandleAggregator
+from .ws.correlation import PendingRequests
+from .ws.subscriptions import SubscriptionRegistry
+from .ws.heartbeat import Heartbeat
+from .ws.streams import StreamHub
 
 urllib3.disable_warnings()
 logger = logging.getLogger(__name__)
@@ -50,7 +53,6 @@ ssl_context.load_verify_locations(certifi.where())
 class QuotexAPI(object):
     """Class for communication with Quotex API."""
 
-    socket_option_opened = {}
     buy_id = None
     trace_ws = False
     buy_expiration = None
@@ -64,10 +66,6 @@ class QuotexAPI(object):
     profit_in_operation = None
     profit_today = None
     sold_options_respond = None
-    listinfodata = ListInfoData()
-    timesync = TimeSync()
-    candles = Candles()
-    profile = Profile()
 
     def __init__(
         self,
@@ -81,6 +79,9 @@ class QuotexAPI(object):
         auto_logout=True,
         user_data_dir=None,
         resource_path=None,
+        transport="thread",
+        tick_capacity=4096,
+        tick_interval=5,
     ):
         """
         :param str host: The hostname or ip address of a Quotex server.
@@ -92,13 +93,27 @@ class QuotexAPI(object):
         :param proxies: The proxies of a Quotex server.
         :param user_data_dir: The path of a Browser cache.
         :param resource_path: The path of a Quotex files session.
+        :param str transport: ``"thread"`` (websocket-client em thread) or
+            ``"asyncio"`` (websockets no event loop atual).
+        :param int tick_capacity: Ticks kept per asset in ``realtime_price``.
+        :param float tick_interval: Seconds between ``tick`` keepalive frames.
         """
+        self.session = SessionContext(session_data.get("token"))
+        self.socket_option_opened = {}
+        self.pending = PendingRequests()
+        self.subscriptions = SubscriptionRegistry(self)
+        self.heartbeat = Heartbeat(self, tick_interval)
+        self.streams = StreamHub()
         self.host = host
         self.https_url = f"https://{host}"
         self.wss_url = f"wss://ws2.{host}/socket.io/?EIO=3&transport=websocket"
         self.wss_message = None
         self.websocket_thread = None
         self.websocket_client = None
+        self.websocket_sender = None
+        self.websocket_task = None
+        self.transport = transport
+        self.tick_capacity = tick_capacity
         self.set_ssid = None
         self.is_logged = False
         self.email = email
@@ -116,6 +131,7 @@ class QuotexAPI(object):
         self.get_candle_data = {}
         self.candle_v2_data = {}
         self.realtime_price = {}
+        self.candle_builders = {}
         self.real_time_candles = {}
         self.realtime_sentiment = {}
         self.top_list_leader = {}
@@ -125,6 +141,31 @@ class QuotexAPI(object):
         self.browser.set_headers(headers)
         self.user_agent = headers.get("User-Agent")
 
+    @property
+    def listinfodata(self):
+        """Property to get the deal results of this session."""
+        return self.session.listinfodata
+
+    @property
+    def instrument_catalog(self):
+        """Property to get the instrument catalog of this session."""
+        return self.session.instrument_catalog
+
+    @property
+    def timesync(self):
+        """Property to get the time sync of this session."""
+        return self.session.timesync
+
+    @property
+    def candles(self):
+        """Property to get the candles of this session."""
+        return self.session.candles
+
+    @property
+    def profile(self):
+        """Property to get the profile of this session."""
+        return self.session.profile
+
     @property
     def websocket(self):
         """Property to get websocket.
@@ -143,11 +184,31 @@ class QuotexAPI(object):
         return self.send_websocket_request(data)
 
     def subscribe_realtime_candle(self, asset, period):
-        self.realtime_price[asset] = []
+        if asset not in self.realtime_price:
+            self.realtime_price[asset] = TickBuffer(self.tick_capacity)
         payload = {"asset": asset, "period": period}
         data = f'42["instruments/update", {json.dumps(payload)}]'
         return self.send_websocket_request(data)
 
+    def candle_builder(self, asset, period):
+        """Get (or create) the streaming candle builder for ``asset``/``period``.
+
+        :returns: The instance of :class:`CandleAggregator
+            <quotexapi.utils.processor.CandleAggregator>`.
+        """
+        return self.candle_builders_for(asset).timeframe(period)
+
+    def candle_builders_for(self, asset):
+        """Get (or create) the multi-timeframe builder fed by ``asset`` ticks.
+
+        :returns: The instance of :class:`MultiCandleAggregator
+            <quotexapi.utils.processor.MultiCandleAggregator>`.
+        """
+        builders = self.candle_builders.get(asset)
+        if builders is None:
+            builders = self.candle_builders[asset] = MultiCandleAggregator()
+        return builders
+
     def follow_candle(self, asset):
         data = f'42["depth/follow", {json.dumps(asset)}]'
         return self.send_websocket_request(data)
@@ -269,7 +330,7 @@ class QuotexAPI(object):
         """
         url = resource.url
         logger.debug(url)
-        global_value.SSID = self.session_data.get("token")
+        self.session.SSID = self.session_data.get("token")
         if headers.get("cookie"):
             self.browser.headers["Cookie"] = headers["cookie"]
         elif headers.get("referer"):
@@ -325,20 +386,40 @@ class QuotexAPI(object):
         data = history.get("data", {})
         return data
 
-    def send_websocket_request(self, data, no_force_send=True):
+    def send_websocket_request(self, data, priority=None):
         """Send websocket request to Quotex server.
         :param str data: The websocket request data.
-        :param bool no_force_send: Default None.
+        :param int priority: (optional) Queue priority, see
+            :mod:`quotexapi.ws.sender`.
+        :returns: The instance of :class:`concurrent.futures.Future`.
         """
-        while (
-            global_value.ssl_Mutual_exclusion or global_value.ssl_Mutual_exclusion_write
-        ) and no_force_send:
-            pass
-        global_value.ssl_Mutual_exclusion_write = True
-        if global_value.check_websocket_if_connect == 1:
-            self.websocket.send(data)
+        if self.websocket_sender is None:
+            self.websocket_sender = self._create_sender()
+        return self.websocket_sender.send(data, priority)
+
+    def send_websocket_burst(self, frames, priority=None):
+        """Send several frames back to back, with nothing written between them.
+        :param list frames: The websocket frames.
+        :param int priority: (optional) Queue priority, see
+            :mod:`quotexapi.ws.sender`.
+        :returns: The instance of :class:`concurrent.futures.Future`.
+        """
+        if self.websocket_sender is None:
+            self.websocket_sender = self._create_sender()
+        return self.websocket_sender.send_many(frames, priority)
+
+    def _create_sender(self):
+        if self.transport == "asyncio":
+            return AsyncWebsocketSender(self.websocket_client.send_frame).start()
+        return WebsocketSender(self._write_websocket).start()
+
+    def _write_websocket(self, data):
+        """Write a frame to the socket; called only by the sender thread."""
+        if self.session.check_websocket_if_connect != 1:
+            return False
+        self.websocket.send(data)
         logger.debug(data)
-        global_value.ssl_Mutual_exclusion_write = False
+        return True
 
     async def authenticate(self):
         print("Login Account User...")
@@ -346,7 +427,7 @@ class QuotexAPI(object):
         status, message = await self.login(self.email, self.password, self.email_pass)
         if status:
             self.is_logged = True
-            global_value.SSID = self.session_data.get("token")
+            self.session.SSID = self.session_data.get("token")
         print(message)
         return status
 
@@ -354,13 +435,16 @@ class QuotexAPI(object):
         """
         Inicia o WebSocket e monitora sua conexão com um timeout.
         """
-        global_value.check_websocket_if_connect = None
-        global_value.check_websocket_if_error = False
-        global_value.websocket_error_reason = None
-        if not global_value.SSID:
+        self.session.reset_connection()
+        if not self.session.SSID:
             await self.authenticate()
 
+        if self.transport == "asyncio":
+            return await self.start_websocket_async()
+
         self.websocket_client = WebsocketClient(self)
+        if self.websocket_sender is None:
+            self.websocket_sender = self._create_sender()
         payload = {
             "ping_interval": 24,
             "ping_timeout": 20,
@@ -391,22 +475,22 @@ class QuotexAPI(object):
         start_time = asyncio.get_event_loop().time()
 
         while True:
-            if global_value.check_websocket_if_error:
+            if self.session.check_websocket_if_error:
                 logger.error(
-                    "Erro na conexão WebSocket: %s", global_value.websocket_error_reason
+                    "Erro na conexão WebSocket: %s", self.session.websocket_error_reason
                 )
-                return False, global_value.websocket_error_reason
+                return False, self.session.websocket_error_reason
 
-            elif global_value.check_websocket_if_connect == 0:
+            elif self.session.check_websocket_if_connect == 0:
                 logger.debug("WebSocket conexão fechada.")
                 return False, "WebSocket conexão fechada."
 
-            elif global_value.check_websocket_if_connect == 1:
+            elif self.session.check_websocket_if_connect == 1:
                 logger.debug("WebSocket conectado com sucesso!")
                 return True, "WebSocket conectado com sucesso!"
 
-            elif global_value.check_rejected_connection == 1:
-                global_value.SSID = None
+            elif self.session.check_rejected_connection == 1:
+                self.session.SSID = None
                 logger.debug("WebSocket Token Rejeitado.")
                 return True, "WebSocket Token Rejeitado."
 
@@ -423,17 +507,64 @@ class QuotexAPI(object):
 
             await asyncio.sleep(0.5)
 
-    def send_ssid(self, timeout=10):
-        self.wss_message = None
-        if not global_value.SSID:
+    async def start_websocket_async(self, timeout=30):
+        """
+        Inicia o WebSocket no event loop atual e aguarda o estado da conexão
+        pelos eventos do cliente, sem polling.
+        """
+        self.websocket_client = AsyncWebsocketClient(self)
+        self.websocket_sender = self._create_sender()
+        self.websocket_task = asyncio.ensure_future(
+            self.websocket_client.run(ssl_context, reconnect=5)
+        )
+        client = self.websocket_client
+        waiters = {
+            asyncio.ensure_future(client.connected.wait()): "connected",
+            asyncio.ensure_future(client.failed.wait()): "failed",
+            asyncio.ensure_future(client.disconnected.wait()): "closed",
+        }
+        done, pending = await asyncio.wait(
+            waiters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+        )
+        for waiter in pending:
+            waiter.cancel()
+        if not done:
+            logger.error(
+                "Timeout: WebSocket não conseguiu conectar dentro do tempo limite."
+            )
+            return (
+                False,
+                "Timeout: WebSocket não conseguiu conectar dentro do tempo limite.",
+            )
+
+        state = waiters[done.pop()]
+        if state == "connected":
+            logger.debug("WebSocket conectado com sucesso!")
+            return True, "WebSocket conectado com sucesso!"
+        if state == "failed":
+            logger.error(
+                "Erro na conexão WebSocket: %s", self.session.websocket_error_reason
+            )
+            return False, self.session.websocket_error_reason
+        logger.debug("WebSocket conexão fechada.")
+        return False, "WebSocket conexão fechada."
+
+    async def send_ssid(self, timeout=10):
+        """
+        Envia o SSID e aguarda a resposta da autorização pelo evento do
+        cliente (`s_authorization` ou `authorization/reject`), sem polling.
+
+        Retorna `True` só quando o token foi aceito.
+        """
+        if not self.session.SSID:
+            return False
+        key = ("authorization",)
+        future = self.pending.register(key)
+        self.ssid(self.session.SSID)
+        try:
+            return await self.pending.wait(key, future, timeout)
+        except asyncio.TimeoutError:
             return False
-        self.ssid(global_value.SSID)
-        start_time = time.time()
-        while self.wss_message is None:
-            if time.time() - start_time > timeout:
-                return False
-            time.sleep(0.5)
-        return True
 
     def logout_wrapper(self):
         loop = asyncio.new_event_loop()
@@ -442,13 +573,12 @@ class QuotexAPI(object):
 
     async def connect(self, is_demo, debug_ws=False):
         """Method for connection to Quotex API."""
-        homepage = self.homepage()
+        # requests é bloqueante; fora do loop várias contas conectam em paralelo
+        homepage = await asyncio.to_thread(self.homepage)
         logger.info(homepage.reason)
         self.account_type = is_demo
         self.trace_ws = debug_ws
-        global_value.ssl_Mutual_exclusion = False
-        global_value.ssl_Mutual_exclusion_write = False
-        if global_value.check_websocket_if_connect:
+        if self.session.check_websocket_if_connect:
             logger.info("Closing websocket connection...")
             self.close()
         if self.auto_logout:
@@ -457,18 +587,24 @@ class QuotexAPI(object):
         check_websocket, websocket_reason = await self.start_websocket()
         if not check_websocket:
             return check_websocket, websocket_reason
-        check_ssid = self.send_ssid()
+        check_ssid = await self.send_ssid()
         if not check_ssid:
             await self.authenticate()
             if self.is_logged:
-                self.send_ssid()
+                await self.send_ssid()
         return check_websocket, websocket_reason
 
     def close(self):
+        self.heartbeat.stop()
+        if self.websocket_sender:
+            self.websocket_sender.stop()
+            self.websocket_sender = None
         if self.websocket_client:
-            self.websocket.close()
+            self.websocket_client.close()
             # self.websocket_thread.join()
         return True
 
     def websocket_alive(self):
+        if self.transport == "asyncio":
+            return self.websocket_task is not None and not self.websocket_task.done()
         return self.websocket_thread.is_alive()
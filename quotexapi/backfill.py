@@ -0,0 +1,159 @@
+"""Module for Quotex concurrent candle history backfill."""
+
+import asyncio
+import logging
+from collections import namedtuple
+
+from . import expiration
+from .utils.processor import calculate_candles_np
+
+logger = logging.getLogger(__name__)
+
+BACKFILL_WINDOW_CANDLES = 500
+
+BackfillResult = namedtuple("BackfillResult", "candles gaps overlaps failed")
+BackfillResult.__doc__ = """Stitched history of a backfill.
+
+:param list candles: Candles sorted by time, one per timestamp.
+:param list gaps: ``(from_time, to_time)`` holes between consecutive candles.
+:param int overlaps: Candles received by more than one window.
+:param list failed: ``(end_time, offset)`` windows that got no answer.
+"""
+
+
+def split_windows(start_time, end_time, window):
+    """Split ``[start_time, end_time]`` into ``(end_time, offset)`` windows.
+
+    :param float start_time: Oldest time wanted.
+    :param float end_time: Newest time wanted.
+    :param int window: Seconds covered by one ``history/load`` request.
+    """
+    windows = []
+    while end_time > start_time:
+        offset = min(window, end_time - start_time)
+        windows.append((end_time, offset))
+        end_time -= offset
+    return windows
+
+
+def rows_to_candles(rows, period):
+    """Normalize a ``history/load`` payload into candle dicts.
+
+    The broker answers either with candle rows
+    ``[time, open, close, high, low, ticks]`` or with raw ticks
+    ``[time, price, ...]``; ticks are aggregated with
+    :func:`calculate_candles_np <quotexapi.utils.processor.calculate_candles_np>`.
+    """
+    if not rows:
+        return []
+    first = rows[0]
+    if isinstance(first, dict):
+        return list(rows)
+    if len(first) >= 5:
+        return [
+            {
+                "time": row[0],
+                "open": row[1],
+                "close": row[2],
+                "high": row[3],
+                "low": row[4],
+                "ticks": row[5] if len(row) > 5 else 0,
+            }
+            for row in rows
+        ]
+    return calculate_candles_np(rows, period)
+
+
+def stitch(chunks, period):
+    """Merge the candles of every window into one ordered series.
+
+    :returns: ``(candles, gaps, overlaps)``.
+    """
+    by_time = {}
+    overlaps = 0
+    for chunk in chunks:
+        for candle in chunk:
+            if candle["time"] in by_time:
+                overlaps += 1
+                # Mantém a vela com mais ticks: a outra janela pode ter cortado a vela
+                if candle.get("ticks", 0) <= by_time[candle["time"]].get("ticks", 0):
+                    continue
+            by_time[candle["time"]] = candle
+    candles = [by_time[t] for t in sorted(by_time)]
+    gaps = [
+        (previous["time"], current["time"])
+        for previous, current in zip(candles, candles[1:])
+        if current["time"] - previous["time"] > period
+    ]
+    return candles, gaps, overlaps
+
+
+class HistoryBackfill(object):
+    """Fetches a long candle history with concurrent ``history/load`` requests.
+
+    Each window gets its own request index, and the response carrying that
+    index resolves the matching future in :attr:`QuotexAPI.pending
+    <quotexapi.api.QuotexAPI.pending>`, so windows don't have to wait for
+    each other.
+    """
+
+    def __init__(
+        self,
+        api,
+        window_candles=BACKFILL_WINDOW_CANDLES,
+        concurrency=4,
+        timeout=30,
+        retries=1,
+    ):
+        """
+        :param api: The instance of :class:`QuotexAPI <quotexapi.api.QuotexAPI>`.
+        :param int window_candles: Candles requested per window.
+        :param int concurrency: Windows in flight at the same time.
+        :param float timeout: Seconds to wait for each window.
+        :param int retries: Extra attempts for a window that timed out or
+            came back without rows.
+        """
+        self.api = api
+        self.window_candles = window_candles
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.retries = retries
+
+    async def fetch(self, asset, period, start_time, end_time):
+        """Backfill ``[start_time, end_time]`` of ``asset``.
+
+        :returns: The instance of :class:`BackfillResult`.
+        """
+        windows = split_windows(start_time, end_time, period * self.window_candles)
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def load(window):
+            async with semaphore:
+                return await self._load_window(asset, period, *window)
+
+        results = await asyncio.gather(*(load(window) for window in windows))
+        chunks = [chunk for chunk in results if chunk is not None]
+        failed = [window for window, chunk in zip(windows, results) if chunk is None]
+        candles, gaps, overlaps = stitch(chunks, period)
+        candles = [c for c in candles if start_time <= c["time"] <= end_time]
+        if failed:
+            logger.warning("Backfill de %s: %d janelas sem resposta.", asset, len(failed))
+        return BackfillResult(candles, gaps, overlaps, failed)
+
+    async def _load_window(self, asset, period, end_time, offset):
+        for _ in range(self.retries + 1):
+            index = expiration.get_request_id()
+            key = ("history_load", index)
+            future = self.api.pending.register(key)
+            self.api.get_candles(asset, index, end_time, offset, period)
+            try:
+                response = await self.api.pending.wait(key, future, self.timeout)
+            except asyncio.TimeoutError:
+                continue
+            rows = response.get("data") or response.get("candles") or response.get("history")
+            if not rows:
+                # Frame sem linhas não prova que a janela está vazia: tenta de novo
+                logger.debug("Janela %s/%s de %s veio sem linhas.", end_time, offset, asset)
+                continue
+            return rows_to_candles(rows, period)
+        return None
@@ -1,12 +1,24 @@
 import time
 import calendar
+import threading
 from datetime import datetime, timedelta
 
+_request_id_lock = threading.Lock()
+_last_request_id = 0
+
 
 def get_timestamp():
     return int(calendar.timegm(time.gmtime()))
 
 
+def get_request_id():
+    """Timestamp-based request id that never repeats within the process."""
+    global _last_request_id
+    with _request_id_lock:
+        _last_request_id = max(_last_request_id + 1, get_timestamp())
+        return _last_request_id
+
+
 def datetime_to_timestamp(dt):
     return time.mktime(dt.timetuple())
 
@@ -1,5 +1,7 @@
 """Module for Quotex http history resource."""
 
+import asyncio
+
 from ..http.resource import Resource
 
 
@@ -21,7 +23,7 @@ class GetHistory(Resource):
             "content-type": "application/json",
             "accept": "application/json",
         }
-        response = self._get(headers=headers)
+        response = await asyncio.to_thread(self._get, headers=headers)
         if response:
             return response.json()
         return {}
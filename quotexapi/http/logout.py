@@ -1,5 +1,7 @@
 """Module for Quotex http logout resource."""
 
+import asyncio
+
 from ..http.resource import Resource
 
 
@@ -21,4 +23,4 @@ class Logout(Resource):
             "content-type": "application/json",
             "accept": "application/json",
         }
-        return self._get(headers=headers)
+        return await asyncio.to_thread(self._get, headers=headers)
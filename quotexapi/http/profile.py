@@ -1,5 +1,7 @@
 """Module for Quotex http profile resource."""
 
+import asyncio
+
 from ..http.resource import Resource
 
 
@@ -22,7 +24,7 @@ class GetProfile(Resource):
             "accept": "application/json",
         }
 
-        response = self._get(headers=headers)
+        response = await asyncio.to_thread(self._get, headers=headers)
         if response:
             return response.json()
         return {}
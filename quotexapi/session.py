@@ -0,0 +1,41 @@
+"""Module for Quotex per-session state."""
+
+from .ws.objects.timesync import TimeSync
+from .ws.objects.candles import Candles
+from .ws.objects.profile import Profile
+from .ws.objects.listinfodata import ListInfoData
+from .ws.objects.instruments import InstrumentCatalog
+
+
+class SessionContext(object):
+    """State owned by one :class:`QuotexAPI <quotexapi.api.QuotexAPI>`.
+
+    Replaces the module-level ``global_value`` flags and the class-level
+    singletons so several accounts can run in the same process without
+    overwriting each other's token, connection flags, candles or deals.
+    """
+
+    def __init__(self, ssid=None):
+        """
+        :param str ssid: (optional) The session token.
+        """
+        self.SSID = ssid
+        self.check_websocket_if_connect = None
+        self.started_listen_instruments = True
+        self.check_rejected_connection = False
+        self.check_accepted_connection = False
+        self.check_websocket_if_error = False
+        self.websocket_error_reason = None
+        self.chart_settings = None  # (ativo, expiração) do último settings/store
+        self.balance_id = None
+        self.listinfodata = ListInfoData()
+        self.timesync = TimeSync()
+        self.candles = Candles()
+        self.profile = Profile()
+        self.instrument_catalog = InstrumentCatalog()
+
+    def reset_connection(self):
+        """Clear the connection flags before a new websocket is opened."""
+        self.check_websocket_if_connect = None
+        self.check_websocket_if_error = False
+        self.websocket_error_reason = None
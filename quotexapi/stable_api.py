@@ -1,16 +1,27 @@
-import time
 import logging
 import asyncio
+import contextlib
 from . import expiration
-from . import global_value
 from .api import QuotexAPI
 from .utils.services import truncate
-from .utils.processor import calculate_candles, process_candles_v2, merge_candles
+from .ws.correlation import RequestError
+from .utils.processor import calculate_candles_np, process_candles_v2, merge_candles
+from .utils.candle_cache import shared_cache
+from .backfill import HistoryBackfill, BACKFILL_WINDOW_CANDLES, split_windows
+from .ws.streams import DROP_OLDEST, FAIL_ON_OVERFLOW
 from .config import load_session, resource_path, update_session, user_data_dir
 from typing import Optional, Union
 
 logger = logging.getLogger(__name__)
 
+# Segundos além da expiração que o stream de um deal fica preso sem o fechamento
+DEAL_HOLD_GRACE = 60
+
+
+def order_tag(amount, asset, direction):
+    """What an order asked for; matches acks and errors that lost their requestId."""
+    return {"asset": asset, "amount": float(amount), "direction": direction}
+
 
 class Quotex(object):
 
@@ -27,6 +38,11 @@ class Quotex(object):
         data_dir=user_data_dir,
         asset_default="EURUSD",
         period_default=60,
+        transport="thread",
+        tick_capacity=4096,
+        candle_cache_dir=None,
+        candle_cache_size=64,
+        tick_interval=5,
     ):
         """
         Initialize Quotex instance.
@@ -43,6 +59,11 @@ class Quotex(object):
             data_dir (str, optional): User data directory path (default is user_data_dir).
             asset_default (str, optional): Default trading asset (default is "EURUSD").
             period_default (int, optional): Default period for trading (default is 60).
+            transport (str, optional): Websocket transport, "thread" or "asyncio" (default is "thread").
+            tick_capacity (int, optional): Realtime ticks kept per asset (default is 4096).
+            candle_cache_dir (str, optional): Directory of the on-disk candle cache (default is "<root_path>/candle_cache").
+            candle_cache_size (int, optional): Candle histories kept in memory (default is 64).
+            tick_interval (float, optional): Seconds between keepalive ticks (default is 5).
         """
         self.email = email
         self.password = password
@@ -52,6 +73,9 @@ class Quotex(object):
         self.auto_logout = auto_logout
         self.asset_default = asset_default
         self.period_default = period_default
+        self.transport = transport
+        self.tick_capacity = tick_capacity
+        self.tick_interval = tick_interval
         self.suspend = 0.5
         self.account_is_demo = 1
         self.api = None
@@ -61,6 +85,9 @@ class Quotex(object):
         self.debug_ws_enable = False
         self.user_data_dir = data_dir
         self.resource_path = resource_path(root_path)
+        self.candle_cache = shared_cache(
+            candle_cache_dir or self.resource_path / "candle_cache", candle_cache_size
+        )
         session = load_session(email, user_agent)
         self.session_data = session
 
@@ -73,14 +100,13 @@ class Quotex(object):
         """
         return self.websocket_client.wss
 
-    @staticmethod
-    def check_connect():
+    def check_connect(self):
         """Check if there is an accepted connection.
 
         Returns:
             bool: True if connection is accepted, False otherwise.
         """
-        if global_value.check_accepted_connection == 1:
+        if self.api is not None and self.api.session.check_accepted_connection == 1:
             return True
         return False
 
@@ -102,15 +128,26 @@ class Quotex(object):
         }
         self.session_data = update_session(self.email, session)
 
-    async def get_instruments(self):
+    async def get_instruments(self, timeout: float = 30):
         """
         Retrieve instruments data asynchronously.
 
+        Args:
+            timeout (float, optional): Seconds to wait for the instruments list (default is 30).
+
         Returns:
             list: List of available instruments.
         """
-        while self.check_connect() and self.api.instruments is None:
-            await asyncio.sleep(0.1)
+        if self.api.instruments is None and self.check_connect():
+            key = ("instruments",)
+            future = self.api.pending.register(key)
+            if self.api.instruments is None:
+                try:
+                    await self.api.pending.wait(key, future, timeout)
+                except asyncio.TimeoutError:
+                    logger.warning("Timeout aguardando a lista de instrumentos.")
+            else:
+                self.api.pending.discard(key, future)
         return self.api.instruments or []
 
     def get_all_asset_name(self):
@@ -120,8 +157,8 @@ class Quotex(object):
         Returns:
             list: List of asset names.
         """
-        if self.api.instruments:
-            return [[i[1], i[2].replace("\n", "")] for i in self.api.instruments]
+        if self.api.instrument_catalog:
+            return self.api.instrument_catalog.names()
 
     async def get_available_asset(self, asset_name: str, force_open: bool = False):
         """
@@ -152,10 +189,10 @@ class Quotex(object):
         Returns:
             tuple: Information about the asset if open.
         """
-        instruments = await self.get_instruments()
-        for i in instruments:
-            if asset_name == i[1]:
-                return i[0], i[2].replace("\n", ""), i[14]
+        await self.get_instruments()
+        instrument = self.api.instrument_catalog.get(asset_name)
+        if instrument is not None:
+            return instrument.id, instrument.name, instrument.is_open
 
     async def get_candles(
         self,
@@ -163,65 +200,149 @@ class Quotex(object):
         end_from_time: Optional[float] = None,
         offset: int = 0,
         period: int = 60,
+        timeout: float = 30,
     ):
         """
         Get candles data asynchronously for a specified asset.
 
+        Candles already in the candle cache are served from it; only the
+        missing part of ``[end_from_time - offset, end_from_time]`` is
+        requested from the broker and merged into the cache.
+
         Args:
             asset (str): Asset name.
             end_from_time (float, optional): End time for fetching candles (default is current time).
             offset (int, optional): Offset for fetching candles (default is 0).
             period (int, optional): Period for fetching candles (default is 60).
+            timeout (float, optional): Seconds to wait for the history (default is 30).
 
         Returns:
             list: List of candles data.
         """
         if end_from_time is None:
-            end_from_time = time.time()
-        index = expiration.get_timestamp()
+            end_from_time = self.api.timesync.server_timestamp
+        if not offset:
+            candles = await self._load_candles(asset, end_from_time, offset, period, timeout)
+            self.candle_cache.merge(asset, period, candles, now=self.api.timesync.server_timestamp)
+            return candles
+        fetched = []
+        for end_time, span in self.candle_cache.missing(asset, period, end_from_time, offset):
+            if span > period * BACKFILL_WINDOW_CANDLES:
+                result = await self.backfill_candles(
+                    asset, period, end_time - span, end_time, timeout=timeout
+                )
+                fetched += result.candles
+                continue
+            candles = await self._load_candles(asset, end_time, span, period, timeout)
+            self.candle_cache.merge(
+                asset, period, candles,
+                now=self.api.timesync.server_timestamp,
+                spans=[(end_time - span, end_time)],
+            )
+            fetched += candles
+        start_time = end_from_time - offset
+        fetched = [c for c in fetched if start_time <= c["time"] <= end_from_time]
+        return merge_candles(
+            self.candle_cache.get(asset, period, end_from_time, offset) + fetched
+        )
+
+    async def backfill_candles(
+        self,
+        asset: str,
+        period: int,
+        start_time: float,
+        end_time: Optional[float] = None,
+        concurrency: int = 4,
+        window_candles: int = BACKFILL_WINDOW_CANDLES,
+        timeout: float = 30,
+    ):
+        """
+        Fetch a long candle history with concurrent `history/load` windows.
+
+        The range is split into windows of `window_candles` candles, up to
+        `concurrency` of them are requested at once, and the answers are
+        stitched into one ordered series and merged into the candle cache.
+
+        Args:
+            asset (str): Asset name.
+            period (int): Candle period in seconds.
+            start_time (float): Oldest time wanted.
+            end_time (float, optional): Newest time wanted (default is current time).
+            concurrency (int, optional): Windows in flight at once (default is 4).
+            window_candles (int, optional): Candles per window (default is 500).
+            timeout (float, optional): Seconds to wait for each window (default is 30).
+
+        Returns:
+            BackfillResult: Candles plus the gaps, overlaps and failed windows found.
+        """
+        if end_time is None:
+            end_time = self.api.timesync.server_timestamp
+        backfill = HistoryBackfill(
+            self.api,
+            window_candles=window_candles,
+            concurrency=concurrency,
+            timeout=timeout,
+        )
+        with self.api.subscriptions.hold(asset, period):
+            result = await backfill.fetch(asset, period, start_time, end_time)
+        # Só as janelas que responderam contam como cobertas
+        failed = set(result.failed)
+        spans = [
+            (window_end - window, window_end)
+            for window_end, window in split_windows(start_time, end_time, period * window_candles)
+            if (window_end, window) not in failed
+        ]
+        self.candle_cache.merge(
+            asset, period, result.candles, now=self.api.timesync.server_timestamp, spans=spans
+        )
+        return result
+
+    async def _load_candles(self, asset, end_from_time, offset, period, timeout):
+        """Send one `history/load` request and prepare the candles it returns."""
+        index = expiration.get_request_id()
         self.api.current_asset = asset
-        self.api.candles.candles_data = None
-        self.start_candles_stream(asset, period)
-        while True:
+        key = ("history", asset, index)
+        future = self.api.pending.register(key)
+        with self.api.subscriptions.hold(asset, period, refresh=True):
             self.api.get_candles(asset, index, end_from_time, offset, period)
-            while self.check_connect and self.api.candles.candles_data is None:
-                await asyncio.sleep(0.1)
-            if self.api.candles.candles_data is not None:
-                break
-        candles = self.prepare_candles(asset, period)
-        return candles
+            history = await self.api.pending.wait(key, future, timeout)
+        return self.prepare_candles(asset, period, history["history"])
 
-    async def get_candles_v2(self, asset: str, period: int):
+    async def get_candles_v2(self, asset: str, period: int, timeout: float = 30):
         """
         Get candles data version 2 asynchronously for a specified asset.
 
         Args:
             asset (str): Asset name.
             period (int): Period for fetching candles.
+            timeout (float, optional): Seconds to wait for the history (default is 30).
 
         Returns:
             list: List of candles data.
         """
-        self.api.candle_v2_data[asset] = None
         self.api.current_asset = asset
-        self.start_candles_stream(asset, period)
-        while self.api.candle_v2_data[asset] is None:
-            await asyncio.sleep(0.1)
-        candles = self.prepare_candles(asset, period)
+        key = ("history", asset)
+        future = self.api.pending.register(key)
+        with self.api.subscriptions.hold(asset, period, refresh=True):
+            history = await self.api.pending.wait(key, future, timeout)
+        candles = self.prepare_candles(asset, period, history["history"])
         return candles
 
-    def prepare_candles(self, asset: str, period: int):
+    def prepare_candles(self, asset: str, period: int, history: Optional[list] = None):
         """
         Prepare candles data for a specified asset.
 
         Args:
             asset (str): Asset name.
             period (int): Period for fetching candles.
+            history (list, optional): Tick history to use (default is the last history received).
 
         Returns:
             list: List of prepared candles data.
         """
-        candles_data = calculate_candles(self.api.candles.candles_data, period)
+        if history is None:
+            history = self.api.candles.candles_data
+        candles_data = calculate_candles_np(history, period)
         candles_v2_data = process_candles_v2(
             self.api.candle_v2_data, asset, candles_data
         )
@@ -236,19 +357,8 @@ class Quotex(object):
         Returns:
             tuple: Connection status and reason.
         """
-        self.api = QuotexAPI(
-            self.host,
-            self.email,
-            self.password,
-            self.lang,
-            self.session_data,
-            email_pass=self.email_pass,
-            auto_logout=self.auto_logout,
-            user_data_dir=self.user_data_dir,
-            resource_path=self.resource_path,
-        )
+        self.api = self._create_api()
         trace_ws = self.debug_ws_enable
-        global_value.SSID = self.session_data.get("token")
         self.api.current_asset = self.asset_default
         self.api.current_period = self.period_default
         check, reason = await self.api.connect(self.account_is_demo, debug_ws=trace_ws)
@@ -263,6 +373,22 @@ class Quotex(object):
             return check, reason
         return check, reason
 
+    def _create_api(self):
+        return QuotexAPI(
+            self.host,
+            self.email,
+            self.password,
+            self.lang,
+            self.session_data,
+            email_pass=self.email_pass,
+            auto_logout=self.auto_logout,
+            user_data_dir=self.user_data_dir,
+            resource_path=self.resource_path,
+            transport=self.transport,
+            tick_capacity=self.tick_capacity,
+            tick_interval=self.tick_interval,
+        )
+
     def set_account_mode(self, balance_mode: str = "PRACTICE"):
         """
         Set active account mode.
@@ -287,30 +413,42 @@ class Quotex(object):
         self.account_is_demo = 0 if balance_mode.upper() == "REAL" else 1
         self.api.change_account(self.account_is_demo)
 
-    async def edit_practice_balance(self, amount: float = None):
+    async def edit_practice_balance(self, amount: float = None, timeout: float = 10):
         """Edit the practice balance to the specified amount.
 
         Args:
             amount (float, optional): The amount to set the practice balance to. If None, it does not change.
+            timeout (float, optional): Seconds to wait for the confirmation (default is 10).
 
         Returns:
             The response from the API after editing the balance.
         """
-        self.api.training_balance_edit_request = None
+        key = ("training_balance",)
+        future = self.api.pending.register(key)
         self.api.edit_training_balance(amount)
-        while self.api.training_balance_edit_request is None:
-            await asyncio.sleep(0.1)
-        return self.api.training_balance_edit_request
+        return await self.api.pending.wait(key, future, timeout)
 
-    async def get_balance(self):
+    async def get_balance(self, timeout: float = 10):
         """Retrieve the current balance of the account.
 
+        Args:
+            timeout (float, optional): Seconds to wait for the first balance frame (default is 10).
+
         Returns:
-            float: The current balance, adjusted by any profit from operations.
+            float: The current balance, adjusted by any profit from operations,
+            or None if no balance frame arrived within `timeout`.
         """
         if not self.api.account_balance:
-            while True:
-                await asyncio.sleep(0.1)
+            key = ("balance",)
+            future = self.api.pending.register(key)
+            if not self.api.account_balance:
+                try:
+                    await self.api.pending.wait(key, future, timeout)
+                except asyncio.TimeoutError:
+                    logger.warning("Timeout aguardando o saldo da conta.")
+                    return None
+            else:
+                self.api.pending.discard(key, future)
         balance = self.api.account_balance.get("liveBalance")
         if self.api.account_type > 0:
             balance = self.api.account_balance.get("demoBalance")
@@ -319,9 +457,13 @@ class Quotex(object):
     async def get_profile(self):
         """Fetch the user profile information.
 
+        Only needs the saved session cookies, so it also works before `connect`.
+
         Returns:
             The user profile data from the API.
         """
+        if self.api is None:
+            self.api = self._create_api()
         return await self.api.get_user_profile()
 
     async def get_history(self):
@@ -333,7 +475,14 @@ class Quotex(object):
         account_type = "demo" if self.account_is_demo else "live"
         return await self.api.get_trader_history(account_type, page_number=1)
 
-    async def buy(self, amount: float, asset: str, direction: str, duration: int):
+    async def buy(
+        self,
+        amount: float,
+        asset: str,
+        direction: str,
+        duration: int,
+        timeout: Optional[float] = None,
+    ):
         """Buy a binary option.
 
         Args:
@@ -341,88 +490,146 @@ class Quotex(object):
             asset (str): The asset to buy.
             direction (str): The direction of the option (e.g., "call" or "put").
             duration (int): The duration in seconds for the option.
+            timeout (float, optional): Seconds to wait for the order ack (default is `duration`).
 
         Returns:
             tuple: A tuple containing the status of the buy operation and whether it was successful.
         """
-        request_id = expiration.get_timestamp()
-        self.api.buy_id = None
+        request_id = expiration.get_request_id()
         self.api.current_asset = asset
-        self.api.timesync.server_timestamp = time.time()
-        self.start_candles_stream(asset, duration)
-        self.api.buy(amount, asset, direction, duration, request_id)
-        count = 0.1
-        while self.api.buy_id is None:
-            count += 0.1
-            if count > duration:
-                status_buy = False
-                break
-            await asyncio.sleep(0.1)
-            if global_value.check_websocket_if_error:
-                return False, global_value.websocket_error_reason
-        else:
-            status_buy = True
-        return status_buy, self.api.buy_successful
+        key = ("order", request_id)
+        future = self.api.pending.register(key, order_tag(amount, asset, direction))
+        with self.api.subscriptions.hold(asset, duration):
+            sent_at = self.api.timesync.local_time()
+            self.api.buy(amount, asset, direction, duration, request_id)
+            result = await self._wait_order(key, future, timeout or duration, sent_at)
+            self._hold_deal(asset, duration, result)
+            return result
+
+    async def buy_many(self, orders: list, timeout: Optional[float] = None):
+        """Buy several binary options sent back to back in one burst.
+
+        Args:
+            orders (list): Tuples of ``(amount, asset, direction, duration)``.
+            timeout (float, optional): Seconds to wait for each order ack (default is its `duration`).
+
+        Returns:
+            list: One ``(status, info)`` tuple per order, in the same order, as returned by `buy`.
+        """
+        orders = [tuple(order) for order in orders]
+        if not orders:
+            return []
+        request_ids = [expiration.get_request_id() for _ in orders]
+        keys = [("order", request_id) for request_id in request_ids]
+        futures = [
+            self.api.pending.register(key, order_tag(*order[:3]))
+            for key, order in zip(keys, orders)
+        ]
+        self.api.current_asset = orders[-1][1]
+        with contextlib.ExitStack() as stack:
+            for amount, asset, direction, duration in orders:
+                stack.enter_context(self.api.subscriptions.hold(asset, duration))
+            sent_at = self.api.timesync.local_time()
+            self.api.buy.many(
+                order + (request_id,) for order, request_id in zip(orders, request_ids)
+            )
+            results = await asyncio.gather(
+                *(
+                    self._wait_order(key, future, timeout or order[3], sent_at)
+                    for key, future, order in zip(keys, futures, orders)
+                )
+            )
+            for order, result in zip(orders, results):
+                self._hold_deal(order[1], order[3], result)
+            return results
+
+    async def _wait_order(self, key, future, timeout, sent_at):
+        timesync = self.api.timesync
+        try:
+            info_buy = await self.api.pending.wait(key, future, timeout)
+        except RequestError as e:
+            return False, str(e)
+        except asyncio.TimeoutError:
+            return False, None
+        if info_buy.get("openTimestamp"):
+            timesync.add_exchange(sent_at, info_buy["openTimestamp"], timesync.local_time())
+        return True, info_buy
+
+    def _hold_deal(self, asset, duration, result):
+        # Mantém o stream até o deal fechar: quem solta é o frame de deals
+        # (ou o prazo de segurança, se o fechamento nunca chegar)
+        status, info_buy = result
+        if not status or not info_buy.get("id"):
+            return
+        owner = ("deal", info_buy["id"])
+        self.api.subscriptions.subscribe(asset, duration, owner)
+        asyncio.get_running_loop().call_later(
+            duration + DEAL_HOLD_GRACE, self.api.subscriptions.release, owner
+        )
 
-    async def sell_option(self, options_ids: Union[list, int]):
+    async def sell_option(self, options_ids: Union[list, int], timeout: float = 10):
         """Sell a specified asset on Quotex.
 
         Args:
             options_ids (Union[list, int]): The ID(s) of the option(s) to sell.
+            timeout (float, optional): Seconds to wait for each confirmation (default is 10).
 
         Returns:
-            The response from the API after selling the option.
+            The response from the API after selling the option, or a list of responses
+            when several IDs are given.
         """
+        tickets = options_ids if isinstance(options_ids, list) else [options_ids]
+        waiters = [(("ticket", t), self.api.pending.register(("ticket", t))) for t in tickets]
         self.api.sell_option(options_ids)
-        self.api.sold_options_respond = None
-        while self.api.sold_options_respond is None:
-            await asyncio.sleep(0.1)
-        return self.api.sold_options_respond
+        responses = await asyncio.gather(
+            *(self.api.pending.wait(key, future, timeout) for key, future in waiters)
+        )
+        return responses if isinstance(options_ids, list) else responses[0]
 
     def get_payment(self):
         """Get payment details from the Quotex server.
 
+        The dict is built once per catalog version and shared; don't mutate it.
+
         Returns:
             dict: A dictionary containing payment information for each asset.
         """
-        assets_data = {}
-        for i in self.api.instruments:
-            assets_data[i[2].replace("\n", "")] = {
-                "turbo_payment": i[18],
-                "payment": i[5],
-                "profit": {"1M": i[-9], "5M": i[-8]},
-                "open": i[14],
-            }
-        return assets_data
-
-    async def get_leader_ranking(self):
+        return self.api.instrument_catalog.payments()
+
+    async def get_leader_ranking(self, timeout: float = 10):
         """Fetch the leader ranking data.
 
+        Args:
+            timeout (float, optional): Seconds to wait for the ranking (default is 10).
+
         Returns:
             The leader ranking information from the API.
         """
+        key = ("leader",)
+        future = self.api.pending.register(key)
         self.api.subscribe_leader()
-        while not self.api.top_list_leader:
-            await asyncio.sleep(1)
-        return self.api.top_list_leader
+        return await self.api.pending.wait(key, future, timeout)
 
-    async def get_profit_today(self):
+    async def get_profit_today(self, timeout: float = 10):
         """Retrieve today's profit.
 
+        Args:
+            timeout (float, optional): Seconds to wait for the answer (default is 10).
+
         Returns:
             The profit made today as per the API response.
         """
+        key = ("profit_today",)
+        future = self.api.pending.register(key)
         self.api.subscribe_leader()
-        while self.api.profit_today is None:
-            await asyncio.sleep(0.1)
-        return self.api.profit_today
+        return await self.api.pending.wait(key, future, timeout)
 
     async def start_remaing_time(self):
         """Start a countdown timer until the candle expiration.
 
         Prints the remaining time in seconds.
         """
-        now_stamp = expiration.timestamp_to_datetime(expiration.get_timestamp())
+        now_stamp = expiration.timestamp_to_datetime(self.api.timesync.server_timestamp)
         expiration_stamp = expiration.timestamp_to_datetime(
             self.api.candle_close_timestamp
         )
@@ -435,22 +642,29 @@ class Quotex(object):
             # )
             await asyncio.sleep(1)
 
-    async def check_win(self, id_number: int):
+    async def check_win(self, id_number: int, timeout: Optional[float] = None):
         """Check if the trade is a win based on its ID.
 
         Args:
             id_number (int): The ID of the trade to check.
+            timeout (float, optional): Seconds to wait for the deal result; waits
+                until the deal closes by default. Raises `asyncio.TimeoutError` when given
+                and exceeded.
 
         Returns:
             bool: True if the trade is a win, False otherwise.
         """
-        task = asyncio.create_task(self.start_remaing_time())
-        while True:
-            data_dict = self.api.listinfodata.get(id_number)
-            if data_dict and data_dict.get("game_state") == 1:
-                break
-            await asyncio.sleep(0.5)
-        task.cancel()
+        key = ("deal", id_number)
+        future = self.api.pending.register(key)
+        data_dict = self.api.listinfodata.get(id_number)
+        if data_dict and data_dict.get("game_state") == 1:
+            self.api.pending.discard(key, future)
+        else:
+            task = asyncio.create_task(self.start_remaing_time())
+            try:
+                data_dict = await self.api.pending.wait(key, future, timeout)
+            finally:
+                task.cancel()
         self.api.listinfodata.delete(id_number)
         return data_dict["win"]
 
@@ -466,74 +680,148 @@ class Quotex(object):
         )
         return server_date, server_time
 
-    def start_candles_stream(self, asset, period=0):
+    def start_candles_stream(self, asset, period=0, owner="default"):
         """Start streaming candle data for a specified asset.
 
+        Subscription frames are only sent when the stream gets its first
+        consumer; calling it again with the same `owner` is a no-op.
+
         Args:
             asset (str): The asset to stream data for.
             period (int, optional): The period for the candles. Defaults to 0.
+            owner (str, optional): The consumer holding the stream. Defaults to "default".
+
+        Returns:
+            bool: True if subscription frames were sent.
         """
-        self.api.subscribe_realtime_candle(asset, period)
-        self.api.follow_candle(asset)
+        return self.api.subscriptions.subscribe(asset, period, owner)
 
-    def stop_candles_stream(self, asset: str):
+    def stop_candles_stream(self, asset: str, period: Optional[int] = None, owner="default"):
         """Stop streaming candle data for a specified asset.
 
+        The server is only told to stop once the last consumer leaves.
+
         Args:
             asset (str): The asset to stop streaming data for.
+            period (int, optional): The period to release. Defaults to None,
+                which drops every consumer of the asset.
+            owner (str, optional): The consumer releasing the stream. Defaults to "default".
         """
-        self.api.unsubscribe_realtime_candle(asset)
-        self.api.unfollow_candle(asset)
+        self.api.subscriptions.unsubscribe(asset, period, owner)
 
     def start_signals_data(self):
         """Start receiving signal data from the API."""
         self.api.signals_subscribe()
 
-    async def get_realtime_candles(self, asset: str, period: int = 0):
+    async def get_realtime_candles(
+        self, asset: str, period: int = 60, timeout: float = 30
+    ):
         """Retrieve real-time candle data for a specified asset.
 
+        The history is processed only once per asset/period to seed a
+        streaming builder; after that candles are served from the state kept
+        up to date by the tick stream.
+
         Args:
             asset (str): The asset to get candle data for.
-            period (int, optional): The period for the candles. Defaults to 0.
+            period (int, optional): The period for the candles. Defaults to 60.
+            timeout (float, optional): Seconds to wait for the history. Defaults to 30.
 
         Returns:
-            dict: A dictionary of real-time candle data.
+            dict: A dictionary of real-time candle data keyed by candle time.
         """
-        self.start_candles_stream(asset, period)
-        while True:
-            if self.api.candle_v2_data.get(asset):
-                candles = self.prepare_candles(asset, period)
-                for candle in candles:
-                    self.api.real_time_candles[candle["time"]] = candle
-                return self.api.real_time_candles
-            await asyncio.sleep(0.1)
+        builder = self.api.candle_builder(asset, period)
+        if builder.seeded:
+            self.start_candles_stream(asset, period, owner="realtime_candles")
+        else:
+            history = await self._stream_history(asset, period, "realtime_candles", timeout)
+            builder.seed(
+                self.prepare_candles(asset, period, history["history"]),
+                now=self.api.timesync.server_timestamp,
+            )
+        return {candle["time"]: candle for candle in builder.candles()}
+
+    async def get_candles_multi(
+        self, asset: str, periods: list = (5, 15, 30, 60, 300), timeout: float = 30
+    ):
+        """Retrieve candles of several timeframes from a single subscription.
+
+        Only one `instruments/update` subscription (at the smallest period) is
+        sent; every timeframe is derived from the same tick stream, and the
+        history is replayed once for all of them.
+
+        Args:
+            asset (str): The asset to get candle data for.
+            periods (list, optional): Candle periods in seconds. Defaults to 5 s, 15 s, 30 s, 1 m and 5 m.
+            timeout (float, optional): Seconds to wait for the history. Defaults to 30.
 
-    async def start_realtime_price(self, asset: str, period: int = 0):
+        Returns:
+            dict: Candles keyed by period, e.g. `{60: [candle, ...]}`.
+        """
+        builders = self.api.candle_builders_for(asset)
+        for period in periods:
+            builders.timeframe(period)
+        if all(builders.timeframe(period).seeded for period in periods):
+            self.start_candles_stream(asset, min(periods), owner="candles_multi")
+        else:
+            history = await self._stream_history(asset, min(periods), "candles_multi", timeout)
+            builders.seed_from_ticks(history["history"], periods)
+        return builders.candles(periods)
+
+    async def _stream_history(self, asset, period, owner, timeout):
+        """Subscribe `owner` to the stream and get the history it pushes."""
+        history = self.api.candle_v2_data.get(asset)
+        if history:
+            self.start_candles_stream(asset, period, owner)
+            return history
+        key = ("history", asset)
+        future = self.api.pending.register(key)
+        if not self.start_candles_stream(asset, period, owner):
+            # Stream já assinado por outro consumidor: pede o histórico de novo
+            self.api.subscriptions.refresh(asset, period)
+        return await self.api.pending.wait(key, future, timeout)
+
+    async def start_realtime_price(
+        self, asset: str, period: int = 0, as_dicts: bool = False
+    ):
         """Start streaming real-time price data for a specified asset.
 
         Args:
             asset (str): The asset to stream price data for.
             period (int, optional): The period for the price data. Defaults to 0.
+            as_dicts (bool, optional): Return lists of {"time", "price"} dicts
+                instead of tick buffers. Defaults to False.
 
         Returns:
-            dict: The real-time price data.
+            dict: The real-time price data, keyed by asset.
         """
-        self.start_candles_stream(asset, period)
+        self.start_candles_stream(asset, period, owner="realtime_price")
         while True:
             if self.api.realtime_price.get(asset):
+                if as_dicts:
+                    return {
+                        name: ticks.to_list()
+                        for name, ticks in self.api.realtime_price.items()
+                    }
                 return self.api.realtime_price
             await asyncio.sleep(0.1)
 
-    async def get_realtime_price(self, asset: str):
+    async def get_realtime_price(self, asset: str, as_dicts: bool = False):
         """Get the real-time price for a specified asset.
 
         Args:
             asset (str): The asset to get the price for.
+            as_dicts (bool, optional): Return a list of {"time", "price"} dicts
+                instead of the tick buffer. Defaults to False.
 
         Returns:
-            dict: The real-time price data.
+            TickBuffer: The ring buffer of (timestamp, price) ticks; use
+                `last(n)` or `since(t)` for zero-copy views.
         """
-        return self.api.realtime_price.get(asset, {})
+        ticks = self.api.realtime_price.get(asset)
+        if ticks is None:
+            return [] if as_dicts else None
+        return ticks.to_list() if as_dicts else ticks
 
     async def start_realtime_sentiment(self, asset: str, period: int = 0):
         """Start receiving real-time sentiment data for a specified asset.
@@ -545,7 +833,7 @@ class Quotex(object):
         Returns:
             dict: The real-time sentiment data.
         """
-        self.start_candles_stream(asset, period)
+        self.start_candles_stream(asset, period, owner="realtime_sentiment")
         while True:
             if self.api.realtime_sentiment.get(asset):
                 return self.api.realtime_sentiment[asset]
@@ -562,6 +850,108 @@ class Quotex(object):
         """
         return self.api.realtime_sentiment.get(asset, {})
 
+    def stream_prices(
+        self, asset: str, period: int = 0, maxsize: int = 1000, overflow: str = DROP_OLDEST
+    ):
+        """Stream every new tick of an asset.
+
+        Use with `async with` (or call `close()`) so the asset subscription
+        is released when the consumer stops::
+
+            async with client.stream_prices("EURUSD_otc") as ticks:
+                async for timestamp, price in ticks:
+                    ...
+
+        Args:
+            asset (str): The asset to stream.
+            period (int, optional): The period of the asset subscription. Defaults to 0.
+            maxsize (int, optional): Items queued for this consumer. Defaults to 1000.
+            overflow (str, optional): "drop_oldest" or "fail_on_overflow" when the queue is full.
+
+        Returns:
+            Subscription: Async iterator of `(timestamp, price)` tuples.
+        """
+        return self._open_stream(("ticks", asset), maxsize, overflow, asset, period)
+
+    def stream_candles(
+        self, asset: str, period: int = 60, maxsize: int = 1000, overflow: str = DROP_OLDEST
+    ):
+        """Stream each candle of an asset as soon as it is sealed.
+
+        Args:
+            asset (str): The asset to stream.
+            period (int, optional): The candle period in seconds. Defaults to 60.
+            maxsize (int, optional): Items queued for this consumer. Defaults to 1000.
+            overflow (str, optional): "drop_oldest" or "fail_on_overflow" when the queue is full.
+
+        Returns:
+            Subscription: Async iterator of candle dicts.
+        """
+        self.api.candle_builder(asset, period)
+        return self._open_stream(("candles", asset, period), maxsize, overflow, asset, period)
+
+    def stream_sentiment(
+        self, asset: str, period: int = 0, maxsize: int = 100, overflow: str = DROP_OLDEST
+    ):
+        """Stream the sentiment updates of an asset.
+
+        Args:
+            asset (str): The asset to stream.
+            period (int, optional): The period of the asset subscription. Defaults to 0.
+            maxsize (int, optional): Items queued for this consumer. Defaults to 100.
+            overflow (str, optional): "drop_oldest" or "fail_on_overflow" when the queue is full.
+
+        Returns:
+            Subscription: Async iterator of `{"sentiment": {"sell", "buy"}}` dicts.
+        """
+        return self._open_stream(("sentiment", asset), maxsize, overflow, asset, period)
+
+    def stream_deals(self, maxsize: int = 1000, overflow: str = FAIL_ON_OVERFLOW):
+        """Stream the result of every closed deal of this session.
+
+        Args:
+            maxsize (int, optional): Items queued for this consumer. Defaults to 1000.
+            overflow (str, optional): "fail_on_overflow" (default: nothing is dropped silently;
+                the stream raises `StreamOverflow` if the consumer falls too far behind)
+                or "drop_oldest".
+
+        Returns:
+            Subscription: Async iterator of deal dicts with `id`, `win` and `profit`.
+        """
+        return self._open_stream(("deals",), maxsize, overflow)
+
+    def stream_signals(self, maxsize: int = 100, overflow: str = DROP_OLDEST):
+        """Stream the signal updates pushed by the platform.
+
+        Args:
+            maxsize (int, optional): Items queued for this consumer. Defaults to 100.
+            overflow (str, optional): "drop_oldest" or "fail_on_overflow" when the queue is full.
+
+        Returns:
+            Subscription: Async iterator of `{asset: {time: {"dir", "duration"}}}` dicts.
+        """
+        self.start_signals_data()
+        return self._open_stream(("signals",), maxsize, overflow)
+
+    def _open_stream(self, topic, maxsize, overflow, asset=None, period=0):
+        subscription = self.api.streams.subscribe(topic, maxsize, overflow)
+        if asset is not None:
+            self.start_candles_stream(asset, period, owner=subscription)
+            subscription.on_close = lambda: self.stop_candles_stream(
+                asset, period, owner=subscription
+            )
+        return subscription
+
+    def get_latency(self):
+        """Get the rolling round-trip time to the broker.
+
+        Measured by the session heartbeat from each Engine.IO ping to its pong.
+
+        Returns:
+            dict: RTT percentiles in milliseconds plus the sample and lost ping counts.
+        """
+        return self.api.heartbeat.percentiles()
+
     def get_signal_data(self):
         """Get the current signal data from the API.
 
@@ -0,0 +1,635 @@
+import json
+import time
+import random
+import asyncio
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.test import SimpleTestCase
+from websockets.asyncio.server import serve
+
+from quotexapi.api import QuotexAPI
+from quotexapi.stable_api import Quotex
+from quotexapi.backfill import HistoryBackfill
+from quotexapi.ws.client import WebsocketClient
+from quotexapi.ws.correlation import PendingRequests
+from quotexapi.ws.heartbeat import Heartbeat
+from quotexapi.ws.sender import WebsocketSender
+from quotexapi.ws.channels.buy import Buy
+from quotexapi.ws.streams import FAIL_ON_OVERFLOW, StreamHub, StreamOverflow
+from quotexapi.ws.objects.timesync import TimeSync
+from quotexapi.ws.subscriptions import SubscriptionRegistry
+from quotexapi.utils.deal_store import DEAL_LOG, DealStore
+from quotexapi.utils import processor
+from quotexapi.utils.candle_cache import CandleCache
+from quotexapi.utils.processor import CandleAggregator
+
+REJECTED_SSID = "ssid-rejected"
+
+
+def binary_event(event, payload):
+    """Evento binário do Socket.IO: placeholder + corpo JSON."""
+    return (
+        f'451-["{event}",{{"_placeholder":true,"num":0}}]',
+        b"\x04" + json.dumps(payload).encode(),
+    )
+
+
+def session_number(ssid):
+    return int(ssid.rsplit("-", 1)[1])
+
+
+def session_history(number):
+    now = time.time()
+    return [[now - 2 + i, 1.1 + number + i / 1000, 0] for i in range(3)]
+
+
+async def stand_in_server(connection):
+    """Imita a Quotex: autoriza pelo SSID e responde com dados só daquela sessão."""
+    async for message in connection:
+        if not isinstance(message, str) or not message.startswith('42["authorization"'):
+            continue
+        ssid = json.loads(message[2:])[1]["session"]
+        if ssid == REJECTED_SSID:
+            await connection.send('42["authorization/reject"]')
+            continue
+        number = session_number(ssid)
+        await connection.send('42["s_authorization"]')
+        history = {
+            "asset": f"ASSET{number}_otc",
+            "period": 60,
+            "history": session_history(number),
+            "candles": [[int(time.time()) // 60 * 60, 1.1, 1.2, 1.3, 1.0, number]],
+        }
+        deals = {"profit": number, "deals": [{"id": f"deal-{number}", "profit": number}]}
+        for event, payload in (("history/list/v2", history), ("s_orders/close", deals)):
+            for frame in binary_event(event, payload):
+                await connection.send(frame)
+
+
+class SessionIsolationTests(SimpleTestCase):
+    """Várias `QuotexAPI` no mesmo processo e no mesmo loop, lado a lado."""
+
+    sessions = 4
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        store = DealStore(Path(self.tmp.name) / DEAL_LOG)
+        for patcher in (
+            mock.patch("quotexapi.ws.objects.listinfodata.shared_store", return_value=store),
+            mock.patch("quotexapi.ws.objects.listinfodata.trade_persistence"),
+            mock.patch("quotexapi.api.ssl_context", None),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def build_api(self, url, ssid, asset):
+        api = QuotexAPI(
+            "qxbroker.com", f"{ssid}@example.com", "", "pt",
+            {"token": ssid, "headers": {"User-Agent": "tests"}},
+            transport="asyncio",
+        )
+        api.wss_url = url
+        api.current_asset = asset
+        api.current_period = 60
+        return api
+
+    async def run_session(self, api, number):
+        history = ("history", api.current_asset)
+        deal = ("deal", f"deal-{number}")
+        waiters = [(key, api.pending.register(key)) for key in (history, deal)]
+        api.ssid(api.session.SSID)
+        return await asyncio.gather(*(api.pending.wait(key, future, 5) for key, future in waiters))
+
+    async def test_sessions_keep_their_own_state(self):
+        async with serve(stand_in_server, "127.0.0.1", 0) as server:
+            port = server.sockets[0].getsockname()[1]
+            url = f"ws://127.0.0.1:{port}/"
+            apis = [self.build_api(url, f"ssid-{n}", f"ASSET{n}_otc") for n in range(self.sessions)]
+            rejected = self.build_api(url, REJECTED_SSID, "ASSET9_otc")
+            try:
+                connected = await asyncio.gather(*(api.start_websocket() for api in apis + [rejected]))
+                self.assertTrue(all(ok for ok, _ in connected))
+
+                rejected.ssid(rejected.session.SSID)
+                results = await asyncio.gather(
+                    *(self.run_session(api, n) for n, api in enumerate(apis))
+                )
+                for _ in range(50):
+                    if rejected.session.check_rejected_connection:
+                        break
+                    await asyncio.sleep(0.02)
+            finally:
+                for api in apis + [rejected]:
+                    api.close()
+                await asyncio.wait([api.websocket_task for api in apis + [rejected]], timeout=5)
+
+        self.assertEqual(len({id(api.session) for api in apis}), self.sessions)
+        for number, (api, (history, deal)) in enumerate(zip(apis, results)):
+            asset = f"ASSET{number}_otc"
+            self.assertEqual(api.session.SSID, f"ssid-{number}")
+            self.assertEqual(api.session.check_accepted_connection, 1)
+            self.assertFalse(api.session.check_rejected_connection)
+            self.assertEqual(history["asset"], asset)
+            self.assertEqual(list(api.candle_v2_data), [asset])
+            self.assertEqual([tick[1] for tick in api.candles.candles_data],
+                             [tick[1] for tick in session_history(number)])
+            self.assertEqual(deal["profit"], number)
+            self.assertEqual(api.profit_in_operation, number)
+            self.assertEqual(api.listinfodata.get(f"deal-{number}")["profit"], number)
+
+        self.assertEqual(rejected.session.SSID, REJECTED_SSID)
+        self.assertEqual(rejected.session.check_rejected_connection, 1)
+        self.assertFalse(rejected.session.check_accepted_connection)
+        self.assertEqual(rejected.candle_v2_data, {})
+        self.assertIsNone(rejected.profit_in_operation)
+
+
+    async def test_send_ssid_waits_for_the_authorization_event(self):
+        async with serve(stand_in_server, "127.0.0.1", 0) as server:
+            port = server.sockets[0].getsockname()[1]
+            url = f"ws://127.0.0.1:{port}/"
+            accepted = self.build_api(url, "ssid-0", "ASSET0_otc")
+            rejected = self.build_api(url, REJECTED_SSID, "ASSET9_otc")
+            try:
+                await asyncio.gather(accepted.start_websocket(), rejected.start_websocket())
+                started = time.monotonic()
+                outcome = await asyncio.gather(accepted.send_ssid(), rejected.send_ssid())
+                elapsed = time.monotonic() - started
+            finally:
+                for api in (accepted, rejected):
+                    api.close()
+                await asyncio.wait([accepted.websocket_task, rejected.websocket_task], timeout=5)
+
+        self.assertEqual(outcome, [True, False])
+        # Sem polling: a resposta chega bem antes dos 500 ms do antigo sleep
+        self.assertLess(elapsed, 0.4)
+
+class CandleAggregatorSeedTests(SimpleTestCase):
+    """Vela aberta do histórico continua sendo atualizada pelos ticks."""
+
+    def history(self):
+        return [
+            {"time": 0, "open": 1.0, "close": 1.05, "high": 1.1, "low": 0.95, "ticks": 4},
+            {"time": 60, "open": 1.05, "close": 1.1, "high": 1.2, "low": 0.9, "ticks": 5},
+        ]
+
+    def test_seed_then_ticks_in_the_same_bucket(self):
+        aggregator = CandleAggregator(60)
+        aggregator.seed(self.history(), now=90)
+        self.assertIsNone(aggregator.add_tick(100, 1.3))
+        self.assertIsNone(aggregator.add_tick(110, 0.8))
+
+        closed, current = aggregator.candles()
+        self.assertEqual(closed["time"], 0)
+        self.assertEqual(
+            current,
+            {"time": 60, "open": 1.05, "close": 0.8, "high": 1.3, "low": 0.8, "ticks": 7},
+        )
+
+        sealed = aggregator.add_tick(125, 1.0)
+        self.assertEqual(sealed["time"], 60)
+        self.assertEqual([c["time"] for c in aggregator.candles()], [0, 60, 120])
+
+    def test_seed_merges_the_live_candle_of_the_same_bucket(self):
+        aggregator = CandleAggregator(60)
+        aggregator.add_tick(95, 1.15)
+        aggregator.seed(self.history())
+
+        closed, current = aggregator.candles()
+        self.assertEqual(closed["time"], 0)
+        self.assertEqual(current["time"], 60)
+        self.assertEqual(current["open"], 1.05)
+        self.assertEqual(current["close"], 1.15)
+        self.assertEqual((current["high"], current["low"]), (1.2, 0.9))
+
+    def test_seed_seals_candles_that_already_ended(self):
+        aggregator = CandleAggregator(60)
+        aggregator.seed(self.history(), now=120)
+        self.assertIsNone(aggregator.current)
+        self.assertEqual([c["time"] for c in aggregator.candles()], [0, 60])
+
+
+def random_history(rng, count, shuffle=False):
+    """Ticks no formato do history/list/v2: [tempo, preço, 0]."""
+    timestamp = 1721510058.627
+    history = []
+    for _ in range(count):
+        timestamp += rng.random() * rng.choice((0.3, 2.0, 30.0))
+        history.append([timestamp, round(rng.uniform(1.05, 1.10), 5), 0])
+    if shuffle:
+        for _ in range(count // 10):
+            i, j = rng.randrange(count), rng.randrange(count)
+            history[i], history[j] = history[j], history[i]
+    return history
+
+
+class NumpyCandlesTests(SimpleTestCase):
+    """As versões NumPy devolvem exatamente as velas das versões em Python."""
+
+    pairs = (
+        (processor.calculate_candles, processor.calculate_candles_np),
+        (processor.process_candles, processor.process_candles_np),
+    )
+
+    def assertSameCandles(self, history, period):
+        for reference, vectorized in self.pairs:
+            with self.subTest(func=reference.__name__, period=period, ticks=len(history)):
+                self.assertEqual(vectorized(history, period), reference(history, period))
+
+    def test_random_histories(self):
+        for trial in range(100):
+            rng = random.Random(trial)
+            history = random_history(rng, rng.choice((2, 7, 100, 2_000)), shuffle=trial % 3 == 0)
+            self.assertSameCandles(history, rng.choice((1, 5, 15, 60, 300)))
+
+    def test_empty_history(self):
+        for period in (1, 60):
+            self.assertSameCandles([], period)
+
+    def test_single_tick(self):
+        for period in (1, 60):
+            self.assertSameCandles([[1721510058.627, 1.08123, 0]], period)
+            self.assertSameCandles([[1721510040.0, 1.08123, 0]], period)
+
+    def test_ticks_on_bucket_boundaries(self):
+        history = [
+            [0.0, 1.0, 0], [59.999, 1.2, 0], [60.0, 1.1, 0], [60.0, 1.3, 0],
+            [119.5, 0.9, 0], [120.0, 1.0, 0], [180.0, 1.4, 0], [300.0, 1.5, 0],
+        ]
+        for period in (1, 30, 60, 120):
+            self.assertSameCandles(history, period)
+
+    def test_dict_ticks(self):
+        history = [{"time": t, "price": p} for t, p, _ in random_history(random.Random(7), 300)]
+        self.assertEqual(
+            processor.process_candles_np(history, 60), processor.process_candles(history, 60)
+        )
+
+
+def minute_candles(start, end):
+    return [
+        {"time": t, "open": 1.0, "close": 1.1, "high": 1.2, "low": 0.9, "ticks": 3}
+        for t in range(start, end + 1, 60)
+    ]
+
+
+class CandleCacheCoverageTests(SimpleTestCase):
+    """A cobertura do cache não se estende por buracos entre buscas."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.cache = CandleCache(self.tmp.name)
+
+    def test_query_between_two_disjoint_fetches(self):
+        self.cache.merge("EURUSD", 60, minute_candles(0, 3540), spans=[(0, 3540)])
+        self.cache.merge("EURUSD", 60, minute_candles(7200, 10740), spans=[(7200, 10740)])
+        self.assertEqual(self.cache.coverage("EURUSD", 60), [(0, 3540), (7200, 10740)])
+
+        # Tudo no buraco do meio: nada em cache, pede o intervalo inteiro
+        self.assertEqual(self.cache.missing("EURUSD", 60, 6000, 1800), [(6000, 1800)])
+        self.assertEqual(self.cache.get("EURUSD", 60, 6000, 1800), [])
+
+        # Atravessa o buraco: pede só o que falta entre as duas buscas
+        self.assertEqual(self.cache.missing("EURUSD", 60, 9000, 7200), [(7200, 3660)])
+
+        # Dentro de uma busca: nada a pedir
+        self.assertEqual(self.cache.missing("EURUSD", 60, 3000, 1800), [])
+
+        # Depois de buscar o buraco, os dois lados viram uma cobertura só
+        self.cache.merge("EURUSD", 60, minute_candles(3540, 7200), spans=[(3540, 7200)])
+        self.assertEqual(self.cache.coverage("EURUSD", 60), [(0, 10740)])
+        self.assertEqual(self.cache.missing("EURUSD", 60, 9000, 7200), [])
+
+    def test_empty_fetch_still_counts_as_covered(self):
+        self.cache.merge("EURUSD", 60, [], spans=[(0, 3600)])
+        self.assertEqual(self.cache.missing("EURUSD", 60, 3000, 1800), [])
+
+    def test_coverage_survives_the_disk_tier(self):
+        self.cache.merge("EURUSD", 60, minute_candles(0, 600), spans=[(0, 600)])
+        self.cache.merge("EURUSD", 60, minute_candles(3000, 3600), spans=[(3000, 3600)])
+        cold = CandleCache(self.tmp.name)
+        self.assertEqual(cold.coverage("EURUSD", 60), [(0, 600), (3000, 3600)])
+        self.assertEqual(len(cold.get("EURUSD", 60, 3600, 3600)), 22)
+
+    def test_open_candles_are_not_covered(self):
+        self.cache.merge("EURUSD", 60, minute_candles(0, 600), now=630, spans=[(0, 630)])
+        self.assertEqual(self.cache.coverage("EURUSD", 60), [(0, 570)])
+
+
+class FakeHistoryAPI(object):
+    """Responde cada pedido de histórico com o próximo frame da fila."""
+
+    def __init__(self, frames):
+        self.frames = list(frames)
+        self.pending = PendingRequests()
+        self.requests = 0
+
+    def get_candles(self, asset, index, end_time, offset, period):
+        self.requests += 1
+        frame = dict(self.frames.pop(0), index=index)
+        client = mock.Mock(api=self)
+        asyncio.get_running_loop().call_soon(WebsocketClient._on_candle_close, client, frame)
+
+
+class HistoryBackfillWindowTests(SimpleTestCase):
+    """Uma janela só conta como carregada quando o frame traz linhas."""
+
+    def fetch(self, frames, retries=1):
+        api = FakeHistoryAPI(frames)
+        backfill = HistoryBackfill(api, window_candles=60, timeout=0.2, retries=retries)
+        result = asyncio.run(backfill.fetch("EURUSD", 60, 0, 3540))
+        return api, result
+
+    def test_empty_frame_is_retried(self):
+        rows = [[t, 1.0, 1.1, 1.2, 0.9, 3] for t in range(0, 3600, 60)]
+        api, result = self.fetch([{"closeTimestamp": 3600}, {"data": rows}])
+        self.assertEqual(api.requests, 2)
+        self.assertEqual(result.failed, [])
+        self.assertEqual(len(result.candles), 60)
+
+    def test_window_without_rows_is_reported_as_failed(self):
+        api, result = self.fetch([{"closeTimestamp": 3600}, {"history": []}])
+        self.assertEqual(api.requests, 2)
+        self.assertEqual(len(result.failed), 1)
+        self.assertEqual(result.candles, [])
+
+
+class BuySubscriptionTests(SimpleTestCase):
+    """O stream de uma compra fica assinado até o deal fechar, não só até o ack."""
+
+    def build_client(self):
+        api = mock.Mock()
+        api.pending = PendingRequests()
+        api.subscriptions = SubscriptionRegistry(api)
+        api.timesync.local_time.return_value = 0
+
+        def buy(amount, asset, direction, duration, request_id):
+            api.pending.resolve(("order", request_id), {"id": "deal-1", "asset": asset})
+
+        api.buy.side_effect = buy
+        client = Quotex.__new__(Quotex)
+        client.api = api
+        return client
+
+    def test_stream_is_released_when_the_deal_closes(self):
+        client = self.build_client()
+        api = client.api
+
+        async def scenario():
+            status, info = await client.buy(10, "EURUSD", "call", 60)
+            self.assertTrue(status)
+            self.assertEqual(api.subscriptions.active(), [("EURUSD", 60)])
+            api.unsubscribe_realtime_candle.assert_not_called()
+
+            deals = {"profit": 8, "deals": [{"id": info["id"], "profit": 8}]}
+            WebsocketClient._on_deals(mock.Mock(api=api), deals)
+
+        asyncio.run(scenario())
+        self.assertEqual(api.subscriptions.active(), [])
+        api.unsubscribe_realtime_candle.assert_called_once_with("EURUSD")
+
+    def test_failed_order_releases_the_stream_right_away(self):
+        client = self.build_client()
+        api = client.api
+        api.buy.side_effect = lambda *args: api.pending.fail(("order", args[-1]), "not_money")
+
+        status, _ = asyncio.run(client.buy(10, "EURUSD", "call", 60))
+        self.assertFalse(status)
+        self.assertEqual(api.subscriptions.active(), [])
+
+
+class HeartbeatRestartTests(SimpleTestCase):
+    """Um stop seguido de start logo em seguida deixa uma única execução viva."""
+
+    def build_heartbeat(self, transport):
+        api = mock.Mock(transport=transport)
+        api.send_websocket_request.return_value = mock.Mock()
+        return Heartbeat(api, tick_interval=0.01, ping_interval=0.01)
+
+    def test_quick_restart_leaves_one_thread(self):
+        heartbeat = self.build_heartbeat("thread")
+        heartbeat.start()
+        runs = [heartbeat._thread]
+        for _ in range(20):
+            heartbeat.stop(timeout=0)
+            heartbeat.start()
+            runs.append(heartbeat._thread)
+        self.addCleanup(heartbeat.stop)
+        for thread in runs[:-1]:
+            thread.join(1)
+        self.assertEqual([thread.is_alive() for thread in runs].count(True), 1)
+        self.assertTrue(runs[-1].is_alive())
+
+    def test_quick_restart_leaves_one_task(self):
+        heartbeat = self.build_heartbeat("asyncio")
+
+        async def scenario():
+            heartbeat.start()
+            runs = [heartbeat._task]
+            for _ in range(20):
+                heartbeat.stop()
+                heartbeat.start()
+                runs.append(heartbeat._task)
+            await asyncio.sleep(0.05)
+            alive = [not task.done() for task in runs]
+            heartbeat.stop()
+            await asyncio.sleep(0)
+            return alive
+
+        alive = asyncio.run(scenario())
+        self.assertEqual(alive.count(True), 1)
+        self.assertTrue(alive[-1])
+
+
+class TimeSyncSeedTests(SimpleTestCase):
+    """Só amostras recentes acertam o relógio; o histórico pode ter minutos."""
+
+    def build_api(self):
+        api = mock.Mock(current_asset="EURUSD", candle_v2_data={})
+        api.pending = PendingRequests()
+        api.timesync = TimeSync()
+        api.heartbeat.last_rtt = 0.1
+        return api
+
+    def test_history_does_not_seed_the_offset(self):
+        api = self.build_api()
+        stale = api.timesync.local_time() - 600
+        data = {"asset": "EURUSD", "history": [[stale, 1.1]], "candles": []}
+        WebsocketClient._on_history(mock.Mock(api=api), data)
+        self.assertFalse(api.timesync.synced)
+        self.assertEqual(api.timesync.offset, 0.0)
+
+    def test_live_quotes_seed_the_offset(self):
+        api = self.build_api()
+        api.realtime_price = {}
+        api.candle_builders = {}
+        now = api.timesync.local_time()
+        WebsocketClient._on_quotes(mock.Mock(api=api), [["EURUSD", now + 2, 1.1]])
+        self.assertTrue(api.timesync.synced)
+        self.assertAlmostEqual(api.timesync.offset, 2.05, places=1)
+
+
+class OrderCorrelationTests(SimpleTestCase):
+    """Acks e erros sem requestId só vão para a ordem que casa sem ambiguidade."""
+
+    def setUp(self):
+        patcher = mock.patch("quotexapi.ws.client.trade_persistence")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def build(self, frames):
+        api = mock.Mock()
+        api.pending = PendingRequests()
+        api.subscriptions = SubscriptionRegistry(api)
+        api.timesync.local_time.return_value = 0
+        ws = WebsocketClient.__new__(WebsocketClient)
+        ws.api = api
+
+        def burst(orders):
+            # Responde fora de ordem e sem requestId
+            for handler, frame in reversed(frames):
+                asyncio.get_running_loop().call_soon(getattr(ws, handler), frame)
+
+        api.buy.many.side_effect = burst
+        client = Quotex.__new__(Quotex)
+        client.api = api
+        return client
+
+    def test_ack_without_request_id_matches_by_asset_amount_and_direction(self):
+        client = self.build([
+            ("_on_order_opened", {"id": "a", "asset": "EURUSD", "amount": 10, "command": 0}),
+            ("_on_error", {"error": "not_money", "asset": "GBPUSD"}),
+        ])
+        results = asyncio.run(client.buy_many(
+            [(10, "EURUSD", "call", 60), (10, "GBPUSD", "put", 60)], timeout=0.2
+        ))
+        self.assertEqual(results[0], (True, {"id": "a", "asset": "EURUSD", "amount": 10, "command": 0}))
+        self.assertEqual(results[1], (False, "not_money"))
+
+    def test_ambiguous_frames_are_dropped(self):
+        client = self.build([
+            ("_on_order_opened", {"id": "a", "asset": "EURUSD", "amount": 10, "command": 0}),
+            ("_on_error", {"error": "not_money"}),
+        ])
+        with self.assertLogs("quotexapi.ws.client", "WARNING"):
+            results = asyncio.run(client.buy_many(
+                [(10, "EURUSD", "call", 60), (10, "EURUSD", "call", 60)], timeout=0.2
+            ))
+        self.assertEqual(results, [(False, None), (False, None)])
+
+
+class SubscriptionPeriodTests(SimpleTestCase):
+    """O servidor assina por ativo: um segundo período não tira o stream do primeiro."""
+
+    def setUp(self):
+        self.api = mock.Mock()
+        self.registry = SubscriptionRegistry(self.api)
+
+    def sent(self):
+        return [(c[0], c[1]) for c in self.api.method_calls]
+
+    def test_second_period_does_not_move_the_stream(self):
+        self.assertTrue(self.registry.subscribe("EURUSD", 60, "chart"))
+        self.assertFalse(self.registry.subscribe("EURUSD", 300, "deal"))
+        self.assertEqual(self.registry.streamed_period("EURUSD"), 60)
+        self.assertEqual(self.sent(), [
+            ("subscribe_realtime_candle", ("EURUSD", 60)),
+            ("follow_candle", ("EURUSD",)),
+        ])
+
+    def test_releasing_one_period_keeps_the_asset(self):
+        self.registry.subscribe("EURUSD", 60, "chart")
+        self.registry.subscribe("EURUSD", 300, "deal")
+        self.assertFalse(self.registry.unsubscribe("EURUSD", 60, "chart"))
+        self.api.unsubscribe_realtime_candle.assert_not_called()
+        self.assertEqual(self.registry.active(), [("EURUSD", 300)])
+        # O consumidor que sobrou passa a ditar o período
+        self.assertEqual(self.registry.streamed_period("EURUSD"), 300)
+        self.api.subscribe_realtime_candle.assert_called_with("EURUSD", 300)
+
+        self.assertTrue(self.registry.unsubscribe("EURUSD", 300, "deal"))
+        self.api.unsubscribe_realtime_candle.assert_called_once_with("EURUSD")
+        self.assertEqual(self.registry.active(), [])
+
+    def test_refresh_hold_restores_the_first_period(self):
+        self.registry.subscribe("EURUSD", 60, "chart")
+        with self.registry.hold("EURUSD", 5, refresh=True):
+            self.assertEqual(self.registry.streamed_period("EURUSD"), 5)
+        self.assertEqual(self.registry.streamed_period("EURUSD"), 60)
+        self.assertEqual(
+            [c.args for c in self.api.subscribe_realtime_candle.call_args_list],
+            [("EURUSD", 60), ("EURUSD", 5), ("EURUSD", 60)],
+        )
+        self.api.unsubscribe_realtime_candle.assert_not_called()
+
+
+class StreamOverflowTests(SimpleTestCase):
+    """`fail_on_overflow` não descarta nada em silêncio: falha o consumidor atrasado."""
+
+    def test_backlog_past_the_limit_fails_the_stream(self):
+        async def scenario():
+            hub = StreamHub()
+            stream = hub.subscribe(("deals",), maxsize=2, overflow=FAIL_ON_OVERFLOW, max_backlog=1)
+            for n in range(5):
+                hub.publish(("deals",), n)
+            received = []
+            with self.assertRaises(StreamOverflow):
+                async for item in stream:
+                    received.append(item)
+            return hub, received
+
+        hub, received = asyncio.run(scenario())
+        self.assertEqual(received, [0, 1, 2])
+        self.assertFalse(hub.has(("deals",)))
+
+    def test_block_is_not_a_policy(self):
+        async def scenario():
+            StreamHub().subscribe(("deals",), overflow="block")
+
+        with self.assertRaises(ValueError):
+            asyncio.run(scenario())
+
+
+class BuySettingsOrderTests(SimpleTestCase):
+    """O settings/store sai logo antes da ordem e de novo quando o par muda."""
+
+    def test_settings_are_written_right_before_the_order_they_describe(self):
+        written = []
+        writer = WebsocketSender(lambda frame: written.append(frame) or True)
+        api = mock.Mock(account_type=1)
+        api.session.chart_settings = None
+        api.send_websocket_request.side_effect = writer.send
+        api.send_websocket_burst.side_effect = writer.send_many
+        buy = Buy(api)
+
+        # Fila montada antes do writer começar: a prioridade decide a ordem
+        api.send_websocket_request('42["tick"]')
+        buy(5, "EURUSD_otc", "call", 60, 1)
+        buy.many([(5, "GBPUSD_otc", "put", 60, 2), (5, "GBPUSD_otc", "put", 60, 3)])
+        done = buy(5, "GBPUSD_otc", "call", 120, 4)
+        writer.start()
+        done.result(timeout=2)
+        writer.stop()
+
+        events = []
+        for frame in written:
+            event, payload = json.loads(frame[2:]) if frame != '42["tick"]' else ("tick", None)
+            if event == "settings/store":
+                settings = payload["settings"]
+                events.append((event, settings["currentAsset"]["symbol"], settings["currentExpirationTime"]))
+            elif event == "orders/open":
+                events.append((event, payload["requestId"]))
+        self.assertEqual(events, [
+            ("settings/store", "EURUSD_otc", 60),
+            ("orders/open", 1),
+            ("settings/store", "GBPUSD_otc", 60),
+            ("orders/open", 2),
+            ("orders/open", 3),
+            ("settings/store", "GBPUSD_otc", 120),
+            ("orders/open", 4),
+        ])
+        self.assertEqual(written[-1], '42["tick"]')
@@ -0,0 +1,256 @@
+"""Module for Quotex candle history cache."""
+
+import os
+import threading
+from pathlib import Path
+from collections import OrderedDict
+
+import numpy as np
+
+COLUMNS = ("time", "open", "close", "high", "low", "ticks")
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def shared_cache(path, max_entries=64):
+    """Get the process-wide :class:`CandleCache` stored at ``path``.
+
+    Every :class:`Quotex <quotexapi.stable_api.Quotex>` of the process that
+    points to the same directory shares one LRU tier.
+    """
+    path = Path(path).resolve()
+    with _caches_lock:
+        cache = _caches.get(path)
+        if cache is None:
+            cache = _caches[path] = CandleCache(path, max_entries)
+        return cache
+
+
+def to_columns(candles):
+    """Candle dicts to a ``(6, n)`` float64 array, one row per column."""
+    if not candles:
+        return np.empty((len(COLUMNS), 0), dtype=np.float64)
+    return np.array(
+        [[candle[column] for candle in candles] for column in COLUMNS],
+        dtype=np.float64,
+    )
+
+
+def to_candles(columns):
+    """``(6, n)`` array back to the candle dicts used by the API."""
+    rows = np.asarray(columns).T.tolist()
+    return [
+        {
+            "time": int(time) if time.is_integer() else time,
+            "open": open_price,
+            "close": close_price,
+            "high": high_price,
+            "low": low_price,
+            "ticks": int(ticks),
+        }
+        for time, open_price, close_price, high_price, low_price, ticks in rows
+    ]
+
+
+def covered_spans(times, period):
+    """Spans of consecutive candle times, split where a candle is missing.
+
+    Used for caches written before coverage was tracked: only what is
+    really stored counts as covered.
+    """
+    if not len(times):
+        return []
+    breaks = np.flatnonzero(np.diff(times) > period)
+    starts = np.r_[times[0], times[breaks + 1]]
+    ends = np.r_[times[breaks], times[-1]]
+    return list(zip(starts.tolist(), ends.tolist()))
+
+
+def add_span(spans, start, end, period):
+    """Union of ``spans`` and ``[start, end]``; spans one candle apart are joined."""
+    spans = sorted(spans + [(start, end)])
+    merged = [spans[0]]
+    for first, last in spans[1:]:
+        if first <= merged[-1][1] + period:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], last))
+        else:
+            merged.append((first, last))
+    return merged
+
+
+class CandleStore(object):
+    """On-disk tier: one columnar ``.npy`` file per asset and period.
+
+    Files are memory-mapped read-only, so a warm start costs only the pages
+    actually read. Writes go to a temporary file that atomically replaces
+    the old one, so other processes never see a half written history. The
+    covered time spans live next to the candles in ``<period>.spans.npy``.
+    """
+
+    def __init__(self, root):
+        """
+        :param root: The directory holding the cache files.
+        """
+        self.root = Path(root)
+
+    def path(self, asset, period, suffix=""):
+        return self.root / asset / f"{int(period)}{suffix}.npy"
+
+    def load(self, asset, period):
+        """Load the columns of ``(asset, period)`` or None if not cached."""
+        path = self.path(asset, period)
+        try:
+            columns = np.load(path, mmap_mode="r")
+        except (FileNotFoundError, ValueError, OSError):
+            return None
+        if columns.ndim != 2 or columns.shape[0] != len(COLUMNS):
+            return None
+        return columns
+
+    def load_spans(self, asset, period):
+        """Load the covered ``(start, end)`` spans or None if not recorded."""
+        try:
+            spans = np.load(self.path(asset, period, ".spans"))
+        except (FileNotFoundError, ValueError, OSError):
+            return None
+        if spans.ndim != 2 or spans.shape[1] != 2:
+            return None
+        return [tuple(span) for span in spans.tolist()]
+
+    def save(self, asset, period, columns, spans=None):
+        # Velas antes da cobertura: quem ler no meio vê cobertura a menos, nunca a mais
+        self._write(self.path(asset, period), columns)
+        if spans is not None:
+            self._write(self.path(asset, period, ".spans"), np.array(spans, dtype=np.float64).reshape(-1, 2))
+
+    def _write(self, path, array):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = path.with_name(f"{path.stem}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with temporary.open("wb") as file:
+            np.save(file, np.ascontiguousarray(array))
+        os.replace(temporary, path)
+
+
+class CandleCache(object):
+    """Candle history cache keyed by ``(asset, period)``.
+
+    Lookups hit an in-memory LRU first and fall back to the memory-mapped
+    :class:`CandleStore`. Only sealed candles are kept, sorted by time and
+    unique per timestamp. Besides the candles, the cache keeps the time
+    spans that were actually fetched, so a hole between two fetches (or a
+    stretch with no candles) is told apart from a range already covered.
+    """
+
+    def __init__(self, root, max_entries=64):
+        """
+        :param root: The directory of the on-disk tier.
+        :param int max_entries: Histories kept in the memory tier.
+        """
+        self.store = CandleStore(root)
+        self.max_entries = max_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+    def columns(self, asset, period):
+        """The cached ``(6, n)`` columns, promoting disk hits to memory."""
+        entry = self._entry(asset, period)
+        return entry[0] if entry is not None else None
+
+    def coverage(self, asset, period):
+        """The covered ``(start, end)`` spans, sorted by time."""
+        entry = self._entry(asset, period)
+        return list(entry[1]) if entry is not None else []
+
+    def _entry(self, asset, period):
+        key = (asset, int(period))
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                return entry
+            entry = self._load(asset, period)
+            if entry is not None:
+                self._remember(key, entry)
+            return entry
+
+    def _load(self, asset, period):
+        columns = self.store.load(asset, period)
+        if columns is None:
+            return None
+        spans = self.store.load_spans(asset, period)
+        if spans is None:
+            spans = covered_spans(columns[0], period)
+        return columns, spans
+
+    def missing(self, asset, period, end_time, offset):
+        """Time ranges of ``[end_time - offset, end_time]`` not in the cache.
+
+        A range is missing when it holds a candle time outside every
+        covered span; holes shorter than one candle are ignored.
+
+        :returns: A list of ``(end_time, offset)`` pairs, ready to be sent as
+            ``history/load`` requests.
+        """
+        start_time = end_time - offset
+        ranges = []
+        cursor = start_time
+        for first, last in self.coverage(asset, period):
+            if last < cursor:
+                continue
+            if first > end_time:
+                break
+            if first - cursor > period:
+                ranges.append((first, first - cursor))
+            cursor = max(cursor, last)
+        # A última vela coberta pode ter fechado sem os ticks finais: pede de novo
+        if end_time - cursor > period or cursor == start_time:
+            ranges.append((end_time, end_time - cursor))
+        return ranges
+
+    def get(self, asset, period, end_time, offset):
+        """Cached candles with ``end_time - offset <= time <= end_time``."""
+        columns = self.columns(asset, period)
+        if columns is None:
+            return []
+        times = columns[0]
+        start = np.searchsorted(times, end_time - offset, side="left")
+        end = np.searchsorted(times, end_time, side="right")
+        return to_candles(columns[:, start:end])
+
+    def merge(self, asset, period, candles, now=None, spans=None):
+        """Merge fetched candles; newer data wins on equal timestamps.
+
+        Candles still open at ``now`` are not cached. ``spans`` are the
+        ``(start, end)`` ranges the fetch covered, empty stretches included;
+        by default the range from the first to the last candle.
+        """
+        period = int(period)
+        if now is not None:
+            candles = [c for c in candles if c["time"] + period <= now]
+        if spans is None:
+            spans = [(candles[0]["time"], candles[-1]["time"])] if candles else []
+        if now is not None:
+            spans = [(start, min(end, now - period)) for start, end in spans if start <= now - period]
+        fresh = to_columns(candles)
+        if not fresh.shape[1] and not spans:
+            return
+        key = (asset, period)
+        with self._lock:
+            entry = self._memory.get(key) or self._load(asset, period)
+            current, coverage = entry if entry is not None else (None, [])
+            if current is not None and current.shape[1]:
+                fresh = np.concatenate((fresh, current), axis=1)
+            # np.unique guarda a primeira ocorrência: as velas novas vêm antes
+            _, index = np.unique(fresh[0], return_index=True)
+            columns = np.array(fresh[:, index])
+            for start, end in spans:
+                coverage = add_span(coverage, float(start), float(end), period)
+            self.store.save(asset, period, columns, coverage)
+            self._remember(key, (columns, coverage))
+
+    def _remember(self, key, entry):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
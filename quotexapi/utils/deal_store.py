@@ -0,0 +1,187 @@
+"""Module for Quotex deal results kept in memory and in an append-only log."""
+
+import os
+import json
+import time
+import threading
+import contextlib
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows: só o lock entre threads
+    fcntl = None
+
+DEAL_LOG = "list_info_data.jsonl"
+LEGACY_JSON = "list_info_data.json"
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def shared_store(path=DEAL_LOG, ttl=86400, compact_interval=3600):
+    """Get the process-wide :class:`DealStore` backed by the log at ``path``.
+
+    Every session of the process that points to the same file shares one
+    in-memory map, so the log is replayed only once.
+    """
+    path = Path(path).resolve()
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = _stores[path] = DealStore(path, ttl, compact_interval)
+        return store
+
+
+class DealStore(object):
+    """Deal results by id, in memory, backed by a JSON-lines log.
+
+    * :meth:`set` appends one line with ``O_APPEND``; several processes can
+      append to the same log under a shared ``flock``.
+    * :meth:`get` is a dict lookup; on a miss the lines other processes
+      appended since the last read are replayed first.
+    * Entries older than ``ttl`` seconds are evicted, and every
+      ``compact_interval`` seconds the log is rewritten with only the live
+      entries (under an exclusive ``flock``) and atomically replaced.
+    """
+
+    def __init__(self, path, ttl=86400, compact_interval=3600):
+        """
+        :param path: The log file.
+        :param float ttl: Seconds a deal result is kept.
+        :param float compact_interval: Seconds between log compactions.
+        """
+        self.path = Path(path)
+        self.ttl = ttl
+        self.compact_interval = compact_interval
+        self.entries = {}  # id -> (timestamp, resultado)
+        self._offset = 0
+        self._inode = None
+        self._lock = threading.RLock()
+        self._next_compaction = time.monotonic() + compact_interval
+        self._import_legacy()
+        self.replay()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, id_number):
+        return self.get(id_number) is not None
+
+    def set(self, id_number, result):
+        """Store the result of a deal and append it to the log."""
+        timestamp = time.time()
+        key = str(id_number)
+        line = json.dumps({"id": key, "ts": timestamp, **result}, ensure_ascii=False)
+        with self._lock:
+            self.entries[key] = (timestamp, result)
+            with self._file_lock(fcntl and fcntl.LOCK_SH):
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(line + "\n")
+            if time.monotonic() >= self._next_compaction:
+                self.compact()
+
+    def get(self, id_number):
+        """Get the result of a deal, or ``None`` if unknown or expired."""
+        key = str(id_number)
+        entry = self.entries.get(key)
+        if entry is None:
+            self.replay()
+            entry = self.entries.get(key)
+        if entry is None or entry[0] < time.time() - self.ttl:
+            return None
+        return entry[1]
+
+    def delete(self, id_number):
+        """Forget a deal in this process; the log keeps it until it expires."""
+        with self._lock:
+            self.entries.pop(str(id_number), None)
+
+    def replay(self):
+        """Apply the lines appended to the log since the last read.
+
+        Reads the whole log again if it was compacted in the meantime.
+        """
+        with self._lock:
+            try:
+                stat = os.stat(self.path)
+            except FileNotFoundError:
+                return
+            if stat.st_ino != self._inode or stat.st_size < self._offset:
+                self.entries = {}
+                self._offset = 0
+                self._inode = stat.st_ino
+            if stat.st_size == self._offset:
+                return
+            with open(self.path, "rb") as f:
+                f.seek(self._offset)
+                chunk = f.read()
+            # Só linhas completas; uma escrita em andamento fica para a próxima
+            end = chunk.rfind(b"\n") + 1
+            self._offset += end
+            for line in chunk[:end].splitlines():
+                self._apply(line)
+            self.evict()
+
+    def _apply(self, line):
+        try:
+            record = json.loads(line)
+            key = record.pop("id")
+            timestamp = record.pop("ts")
+        except (ValueError, KeyError, AttributeError):
+            return
+        self.entries[key] = (timestamp, record)
+
+    def evict(self, now=None):
+        """Drop the entries older than ``ttl``."""
+        limit = (time.time() if now is None else now) - self.ttl
+        with self._lock:
+            expired = [key for key, (ts, _) in self.entries.items() if ts < limit]
+            for key in expired:
+                del self.entries[key]
+        return len(expired)
+
+    def compact(self):
+        """Rewrite the log with only the live entries."""
+        with self._lock, self._file_lock(fcntl and fcntl.LOCK_EX):
+            self.replay()
+            self.evict()
+            temporary = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            with open(temporary, "w", encoding="utf-8") as f:
+                for key, (timestamp, result) in self.entries.items():
+                    f.write(json.dumps({"id": key, "ts": timestamp, **result}, ensure_ascii=False))
+                    f.write("\n")
+            os.replace(temporary, self.path)
+            stat = os.stat(self.path)
+            self._inode = stat.st_ino
+            self._offset = stat.st_size
+            self._next_compaction = time.monotonic() + self.compact_interval
+
+    @contextlib.contextmanager
+    def _file_lock(self, operation):
+        """``flock`` on a sidecar file, shared by every process using the log."""
+        if not operation:
+            yield
+            return
+        with open(f"{self.path}.lock", "a") as lock:
+            fcntl.flock(lock, operation)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _import_legacy(self):
+        """Bring the results of the old ``list_info_data.json`` into the log once."""
+        legacy = self.path.with_name(LEGACY_JSON)
+        if self.path.exists() or not legacy.exists():
+            return
+        try:
+            with open(legacy, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (ValueError, OSError):
+            return
+        timestamp = time.time()
+        with open(self.path, "a", encoding="utf-8") as f:
+            for key, result in data.items():
+                f.write(json.dumps({"id": key, "ts": timestamp, **result}, ensure_ascii=False))
+                f.write("\n")
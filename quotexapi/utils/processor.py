@@ -1,3 +1,9 @@
+import time
+from collections import deque
+from operator import itemgetter
+
+import numpy as np
+
 from quotexapi.utils.services import group_by_period
 
 
@@ -95,6 +101,111 @@ def calculate_candles(history, period):
     return candles
 
 
+def _tick_columns(history):
+    """Timestamp and price columns of a tick history as float64 arrays."""
+    if isinstance(history, np.ndarray):
+        if history.ndim != 2 or not len(history):
+            return np.empty(0), np.empty(0)
+        return history[:, 0].astype(np.float64), history[:, 1].astype(np.float64)
+    count = len(history)
+    timestamps = np.fromiter(map(itemgetter(0), history), np.float64, count)
+    prices = np.fromiter(map(itemgetter(1), history), np.float64, count)
+    return timestamps, prices
+
+
+def _reduce_groups(prices, starts):
+    """Open, close, high, low and tick count of each contiguous group."""
+    ends = np.append(starts[1:], len(prices))
+    return (
+        prices[starts],
+        prices[ends - 1],
+        np.maximum.reduceat(prices, starts),
+        np.minimum.reduceat(prices, starts),
+        ends - starts,
+    )
+
+
+def calculate_candles_np(history, period):
+    """Vectorized :func:`calculate_candles`; same output, NumPy binning.
+
+    Ticks are binned with ``timestamp // period`` and each bin is reduced
+    with ``np.maximum.reduceat``/``np.minimum.reduceat``. Accepts the same
+    ``[time, price, ...]`` rows or an ``(n, 2)`` array such as a
+    :class:`TickBuffer <quotexapi.ws.objects.ticks.TickBuffer>` view.
+    """
+    timestamps, prices = _tick_columns(history)
+    if not len(timestamps):
+        return []
+    bins = np.floor_divide(timestamps, period).astype(np.int64)
+    if np.any(bins[1:] < bins[:-1]):
+        # Fora de ordem: agrupa na ordem da primeira aparição, igual ao dict
+        unique, first, inverse = np.unique(bins, return_index=True, return_inverse=True)
+        rank = np.empty(len(unique), dtype=np.int64)
+        rank[np.argsort(first)] = np.arange(len(unique))
+        order = np.argsort(rank[inverse], kind="stable")
+        bins, prices = bins[order], prices[order]
+    starts = np.flatnonzero(np.r_[True, bins[1:] != bins[:-1]])
+    opens, closes, highs, lows, ticks = _reduce_groups(prices, starts)
+    candles = [
+        {
+            "time": minute * period,
+            "open": open_price,
+            "close": close_price,
+            "high": high_price,
+            "low": low_price,
+            "ticks": num_ticks,
+        }
+        for minute, open_price, close_price, high_price, low_price, num_ticks in zip(
+            bins[starts].tolist(),
+            opens.tolist(),
+            closes.tolist(),
+            highs.tolist(),
+            lows.tolist(),
+            ticks.tolist(),
+        )
+    ]
+    return candles[:-1]
+
+
+def process_candles_np(history, period):
+    """Vectorized :func:`process_candles`; same output, NumPy binning.
+
+    A new candle starts whenever a tick reaches the end of the open one,
+    i.e. where the running maximum of ``timestamp // period`` increases.
+    """
+    if len(history) and isinstance(history[0], dict):
+        history = [(entry["time"], entry["price"]) for entry in history]
+    timestamps, prices = _tick_columns(history)
+    if not len(timestamps):
+        return []
+    bins = np.maximum.accumulate(np.floor_divide(timestamps, period))
+    starts = np.flatnonzero(np.r_[True, bins[1:] != bins[:-1]])
+    opens, closes, highs, lows, ticks = _reduce_groups(prices, starts)
+    start_times = timestamps[starts] - np.mod(timestamps[starts], period)
+    candles = [
+        {
+            "open": open_price,
+            "high": high_price,
+            "low": low_price,
+            "close": close_price,
+            "start_time": start_time,
+            "end_time": start_time + period,
+            "ticks": num_ticks,
+        }
+        for start_time, open_price, close_price, high_price, low_price, num_ticks in zip(
+            start_times.tolist(),
+            opens.tolist(),
+            closes.tolist(),
+            highs.tolist(),
+            lows.tolist(),
+            ticks.tolist(),
+        )
+    ]
+    # A primeira vela da versão em Python nunca recebe start_time
+    candles[0]["start_time"] = None
+    return candles[:-1]
+
+
 def merge_candles(candles_data):
     seen_times = set()
     merged_list = []
@@ -105,3 +216,151 @@ def merge_candles(candles_data):
     merged_list.sort(key=lambda x: x["time"])
 
     return merged_list
+
+
+class CandleAggregator(object):
+    """Builds candles incrementally from a tick stream.
+
+    Each tick updates the open candle in O(1); when a tick crosses the
+    period boundary the open candle is sealed and a new one starts.
+    """
+
+    def __init__(self, period, max_candles=1000):
+        self.period = period
+        self.sealed = deque(maxlen=max_candles)
+        self.current = None
+        self.seeded = False
+        self._end = None
+        self._latest = None
+
+    def add_tick(self, timestamp, price):
+        """Feed one tick. Returns the candle sealed by this tick, if any."""
+        if self._latest is None or timestamp > self._latest:
+            self._latest = timestamp
+        candle = self.current
+        if candle is not None and timestamp < self._end:
+            if timestamp < candle["time"]:
+                return None  # tick atrasado de uma vela já fechada
+            candle["close"] = price
+            if price > candle["high"]:
+                candle["high"] = price
+            elif price < candle["low"]:
+                candle["low"] = price
+            candle["ticks"] += 1
+            return None
+        start = timestamp - (timestamp % self.period)
+        self._end = start + self.period
+        self.current = {
+            "time": start,
+            "open": price,
+            "close": price,
+            "high": price,
+            "low": price,
+            "ticks": 1,
+        }
+        if candle is not None:
+            self.sealed.append(candle)
+        return candle
+
+    def seed(self, candles, now=None):
+        """Load history candles before (or while) the stream runs.
+
+        Candles that end by ``now`` (default: the latest tick seen, or the
+        local clock) are sealed. A last candle still open at ``now``
+        becomes the current candle, merged with the live one of the same
+        bucket, so ticks of that minute keep updating it.
+        """
+        if self._latest is not None:
+            now = self._latest if now is None else max(now, self._latest)
+        elif now is None:
+            now = time.time()
+        last_time = self.sealed[-1]["time"] if self.sealed else None
+        open_candle = None
+        for candle in candles:
+            if last_time is not None and candle["time"] <= last_time:
+                continue
+            if candle["time"] + self.period > now:
+                open_candle = dict(candle)
+                break
+            self.sealed.append(dict(candle))
+            last_time = candle["time"]
+
+        current = self.current
+        if current is not None and last_time is not None and current["time"] <= last_time:
+            current = None  # o histórico já fechou essa vela
+        if open_candle is not None:
+            if current is None or current["time"] < open_candle["time"]:
+                current = open_candle
+            elif current["time"] == open_candle["time"]:
+                # Mesma vela: abertura e extremos do histórico, fechamento ao vivo
+                current["open"] = open_candle["open"]
+                current["high"] = max(current["high"], open_candle["high"])
+                current["low"] = min(current["low"], open_candle["low"])
+                current["ticks"] = max(current["ticks"], open_candle.get("ticks", 0))
+            else:
+                self.sealed.append(open_candle)
+        self.current = current
+        self._end = current["time"] + self.period if current is not None else None
+        self.seeded = True
+
+    def candles(self, include_current=True):
+        candles = list(self.sealed)
+        if include_current and self.current is not None:
+            candles.append(self.current)
+        return candles
+
+
+class MultiCandleAggregator(object):
+    """Derives several timeframes from one tick stream in a single pass.
+
+    Every timeframe is aligned to the epoch (``time % period == 0``), so a
+    5 s, 15 s, 30 s, 1 m and 5 m candle that start together share the same
+    boundary.
+    """
+
+    def __init__(self, periods=(), max_candles=1000):
+        self.max_candles = max_candles
+        self.timeframes = {}
+        for period in periods:
+            self.timeframe(period)
+
+    @property
+    def periods(self):
+        return sorted(self.timeframes)
+
+    def timeframe(self, period):
+        """Get (or create) the aggregator of one period."""
+        aggregator = self.timeframes.get(period)
+        if aggregator is None:
+            aggregator = CandleAggregator(period, self.max_candles)
+            self.timeframes[period] = aggregator
+        return aggregator
+
+    def add_tick(self, timestamp, price):
+        """Feed one tick to every timeframe. Returns ``[(period, candle)]`` sealed."""
+        sealed = []
+        for period, aggregator in self.timeframes.items():
+            candle = aggregator.add_tick(timestamp, price)
+            if candle is not None:
+                sealed.append((period, candle))
+        return sealed
+
+    def seed_from_ticks(self, ticks, periods=None):
+        """Seed timeframes from a tick history (``[time, price, ...]`` rows) in one pass."""
+        periods = [p for p in (periods or self.timeframes) if not self.timeframe(p).seeded]
+        if not periods:
+            return
+        replay = MultiCandleAggregator(periods, self.max_candles)
+        for tick in ticks:
+            replay.add_tick(tick[0], tick[1])
+        for period in periods:
+            replayed = replay.timeframes[period]
+            self.timeframes[period].seed(replayed.candles(), now=replayed._latest)
+
+    def candles(self, periods=None, include_current=True):
+        """Candles per period as ``{period: [candle, ...]}``."""
+        periods = periods or self.periods
+        return {
+            period: self.timeframe(period).candles(include_current)
+            for period in periods
+        }
@@ -0,0 +1,99 @@
+"""Module for Quotex asyncio websocket transport."""
+
+import asyncio
+import logging
+
+try:
+    from websockets.asyncio.client import connect
+except ImportError:  # pragma: no cover - dependência opcional
+    connect = None
+
+from .client import WebsocketClient
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncWebsocketClient(WebsocketClient):
+    """Websocket transport running inside an asyncio event loop.
+
+    Frames are read by a task on the loop and handed straight to
+    :meth:`WebsocketClient.on_message`, so hundreds of sessions can share a
+    single loop instead of one ``run_forever`` thread each. Connection state
+    is exposed as :class:`asyncio.Event` objects.
+    """
+
+    def create_wss(self):
+        if connect is None:
+            raise ImportError(
+                "O transporte asyncio requer o pacote 'websockets' (pip install websockets)."
+            )
+        self.loop = None
+        self.connection = None
+        self.connected = asyncio.Event()
+        self.disconnected = asyncio.Event()
+        self.failed = asyncio.Event()
+        self._closing = False
+        return None
+
+    async def run(self, ssl_context=None, reconnect=5):
+        """Connect and read frames until :meth:`close` is called.
+
+        :param ssl_context: (optional) The :class:`ssl.SSLContext` to use.
+        :param int reconnect: Seconds to wait before reconnecting; ``0``
+            disables reconnection.
+        """
+        self.loop = asyncio.get_running_loop()
+        # Mesmos cabeçalhos do transporte em thread; Host sai da URL e Origin
+        # e User-Agent têm parâmetros próprios no `connect`
+        headers = {
+            name: value
+            for name, value in self.headers.items()
+            if name not in ("Host", "Origin", "User-Agent")
+        }
+        while not self._closing:
+            try:
+                async with connect(
+                    self.api.wss_url,
+                    ssl=ssl_context,
+                    origin=self.api.https_url,
+                    user_agent_header=self.headers["User-Agent"],
+                    additional_headers=headers,
+                    ping_interval=None,
+                    max_size=None,
+                    open_timeout=20,
+                ) as connection:
+                    self.connection = connection
+                    self.failed.clear()
+                    self.disconnected.clear()
+                    self.on_open(None)
+                    self.connected.set()
+                    async for message in connection:
+                        self.on_message(None, message)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.on_error(None, e)
+                self.failed.set()
+            finally:
+                self.connection = None
+                self.connected.clear()
+                self.on_close(None, None, None)
+                self.disconnected.set()
+            if self._closing or not reconnect:
+                break
+            await asyncio.sleep(reconnect)
+
+    async def send_frame(self, data):
+        """Write one frame; used by :class:`AsyncWebsocketSender
+        <quotexapi.ws.sender.AsyncWebsocketSender>`."""
+        if self.connection is None:
+            return False
+        await self.connection.send(data)
+        logger.debug(data)
+        return True
+
+    def close(self):
+        """Close the connection; safe to call from any thread."""
+        self._closing = True
+        if self.connection is not None and self.loop is not None:
+            asyncio.run_coroutine_threadsafe(self.connection.close(), self.loop)
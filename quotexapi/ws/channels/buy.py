@@ -1,24 +1,75 @@
 import json
+from quotexapi.ws import sender
 from quotexapi.ws.channels.base import Base
 from quotexapi.expiration import get_expiration_time_quotex
 
+# Payload de orders/open já serializado; só os campos variáveis são formatados
+ORDER_FRAME = (
+    '42["orders/open",{"asset":%s,"amount":%s,"time":%d,"action":%s,'
+    '"isDemo":%d,"tournamentId":0,"requestId":%d,"optionType":%d}]'
+)
+
 
 class Buy(Base):
-    """Class for Quotex buy websocket channel."""
+    """Class for Quotex buy websocket channel.
+
+    The chart ``settings/store`` frame is only sent when the session's
+    ``(asset, expiration)`` pair changes, instead of ahead of every order.
+    When it is due it goes in the same urgent burst as the order, right
+    before it, so the server has the new expiration when the order lands.
+    """
 
     name = "buy"
 
     def __call__(self, price, asset, direction, duration, request_id):
+        """Send one ``orders/open`` frame (after the settings, if they changed).
+
+        :returns: The instance of :class:`concurrent.futures.Future` of the write.
+        """
+        return self.api.send_websocket_burst(
+            self.order_frames(price, asset, direction, duration, request_id),
+            priority=sender.URGENT,
+        )
+
+    def many(self, orders):
+        """Send several ``orders/open`` frames back to back in one burst.
+
+        :param orders: Iterable of ``(price, asset, direction, duration, request_id)``.
+        :returns: The instance of :class:`concurrent.futures.Future` of the burst.
+        """
+        frames = [frame for order in orders for frame in self.order_frames(*order)]
+        return self.api.send_websocket_burst(frames, priority=sender.URGENT)
+
+    def order_frames(self, price, asset, direction, duration, request_id):
+        """Build the frames of one order: the settings when due, then ``orders/open``."""
         option_type = 100
         if "_otc" not in asset:
             option_type = 1
             duration = get_expiration_time_quotex(
                 int(self.api.timesync.server_timestamp), duration
             )
+        frames = []
+        settings = self.settings_frame(asset, duration)
+        if settings is not None:
+            frames.append(settings)
+        frames.append(ORDER_FRAME % (
+            json.dumps(asset),
+            json.dumps(price),
+            duration,
+            json.dumps(direction),
+            self.api.account_type,
+            request_id,
+            option_type,
+        ))
+        return frames
 
-        data = f'42["depth/follow", f"{asset}"]'
-        self.send_websocket_request(data)
-
+    def settings_frame(self, asset, duration):
+        """The chart settings frame if ``(asset, duration)`` differs from the
+        pair last stored in this websocket session, else ``None``."""
+        session = self.api.session
+        if session.chart_settings == (asset, duration):
+            return None
+        session.chart_settings = (asset, duration)
         payload = {
             "chartId": "graph",
             "settings": {
@@ -43,21 +94,4 @@ class Buy(Base):
                 "downColor": "#FF6251",
             },
         }
-        data = f'42["settings/store",{json.dumps(payload)}]'
-        self.send_websocket_request(data)
-
-        payload = {
-            "asset": asset,
-            "amount": price,
-            "time": duration,
-            "action": direction,
-            "isDemo": self.api.account_type,
-            "tournamentId": 0,
-            "requestId": request_id,
-            "optionType": option_type,
-        }
-
-        data = f'42["tick"]'
-        self.send_websocket_request(data)
-        data = f'42["orders/open",{json.dumps(payload)}]'
-        order = self.send_websocket_request(data)
\ No newline at end of file
+        return f'42["settings/store",{json.dumps(payload)}]'
@@ -1,6 +1,8 @@
 import json
 from quotexapi.ws.channels.base import Base
 
+CANCEL_FRAME = '42["orders/cancel",{"ticket":%s}]'
+
 
 class SellOption(Base):
     """Class for Quotex sell option websocket channel."""
@@ -10,13 +12,11 @@ class SellOption(Base):
     def __call__(self, options_ids):
         """
         :param options_ids: list or int
+        :returns: The instance of :class:`concurrent.futures.Future` of the write.
         """
         if type(options_ids) != list:
-            payload = {"ticket": options_ids}
-            self.send_websocket_request(f'42["orders/cancel",{json.dumps(payload)}]')
-        else:
-            for ids in options_ids:
-                payload = {"ticket": ids}
-                self.send_websocket_request(
-                    f'42["orders/cancel",{json.dumps(payload)}]'
-                )
+            return self.send_websocket_request(CANCEL_FRAME % json.dumps(options_ids))
+        # Todos os cancelamentos saem juntos, em uma única rajada
+        return self.api.send_websocket_burst(
+            [CANCEL_FRAME % json.dumps(ids) for ids in options_ids]
+        )
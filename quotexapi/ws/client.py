@@ -1,18 +1,35 @@
 """Module for Quotex websocket."""
 
-import json
-import time
 import logging
 import websocket
 
-from bots.services import create_trade_order_sync
-from trading.models import TradeOrder
+from bots.persistence import trade_persistence
 
-from .. import global_value
+from . import protocol
+from . import sender
 
 
 logger = logging.getLogger(__name__)
 
+# `command` dos frames de ordem: 0 é compra (call), 1 é venda (put)
+ORDER_COMMANDS = {0: "call", 1: "put"}
+
+
+def order_matches(tag, data):
+    """Se o frame ``data`` pode ser a resposta da ordem descrita por ``tag``.
+
+    Só compara os campos que o frame traz: um erro sem nenhum deles casa com
+    qualquer ordem.
+    """
+    if data.get("asset") is not None and data["asset"] != tag["asset"]:
+        return False
+    if data.get("amount") is not None and float(data["amount"]) != tag["amount"]:
+        return False
+    command = data.get("command")
+    if command is not None and ORDER_COMMANDS.get(command) != tag["direction"]:
+        return False
+    return True
+
 
 class WebsocketClient(object):
     """Class for work with Quotex API websocket."""
@@ -29,9 +46,41 @@ class WebsocketClient(object):
             "Origin": self.api.https_url,
             "Host": f"ws2.{self.api.host}",
         }
+        cookie = (self.api.session_data.get("headers") or {}).get("Cookie")
+        if cookie:
+            self.headers["Cookie"] = cookie
 
+        self.ping_interval = 24
+        self.decoder = protocol.FrameDecoder()
+        self.handlers = {
+            "s_authorization": self._on_authorization,
+            "authorization/reject": self._on_authorization_reject,
+            "instruments/list": self._on_instruments,
+            "settings/list": self._on_settings,
+            "history/list/v2": self._on_history,
+            "quotes/stream": self._on_quotes,
+        }
+        # Rotas por formato do payload, na mesma ordem de prioridade de antes,
+        # para eventos que ainda não têm nome registrado.
+        self.payload_handlers = (
+            ("signals", self._on_signals),
+            ("liveBalance", self._on_balance),
+            ("demoBalance", self._on_balance),
+            ("position", self._on_leader),
+            ("index", self._on_candle_close),
+            ("id", self._on_order_opened),
+            ("ticket", self._on_option_sold),
+            ("deals", self._on_deals),
+            ("isDemo", self._on_training_balance),
+            ("error", self._on_error),
+        )
+
+        self.wss = self.create_wss()
+
+    def create_wss(self):
+        """Create the underlying :class:`websocket.WebSocketApp`."""
         websocket.enableTrace(self.api.trace_ws)
-        self.wss = websocket.WebSocketApp(
+        return websocket.WebSocketApp(
             self.api.wss_url,
             on_message=self.on_message,
             on_error=self.on_error,
@@ -43,154 +92,265 @@ class WebsocketClient(object):
             # cookie=self.api.cookies
         )
 
+    def close(self):
+        """Close the websocket connection."""
+        self.wss.close()
+
     def on_message(self, wss, message):
         """Method to process websocket messages."""
-        global_value.ssl_Mutual_exclusion = True
-        current_time = time.localtime()
-        if current_time.tm_sec in [0, 5, 10, 15, 20, 30, 40, 50]:
-            self.wss.send('42["tick"]')
         try:
-            if "authorization/reject" in str(message):
-                logger.info("Token rejeitado, fazendo reconexão automática.")
-                global_value.check_rejected_connection = 1
-            elif "s_authorization" in str(message):
-                global_value.check_accepted_connection = 1
-                global_value.check_rejected_connection = 0
-            elif "instruments/list" in str(message):
-                global_value.started_listen_instruments = True
+            self.dispatch(self.decoder.decode(message))
+        except Exception:
+            logger.exception("Falha ao processar mensagem do websocket.")
+
+    def dispatch(self, frame):
+        """Route a decoded frame to its handler by event name.
+
+        :param frame: The instance of :class:`Frame
+            <quotexapi.ws.protocol.Frame>`.
+        """
+        if frame.kind == protocol.PLACEHOLDER:
+            return
+        if frame.kind == protocol.OPEN:
+            if frame.data and frame.data.get("pingInterval"):
+                self.ping_interval = frame.data["pingInterval"] / 1000
+            return
+        if frame.kind == protocol.PING:
+            self.api.send_websocket_request("3")
+            return
+        if frame.kind == protocol.PONG:
+            self.api.heartbeat.on_pong()
+            return
+        if frame.kind == protocol.DISCONNECT:
+            logger.info(
+                "Evento de desconexão disparado pela plataforma, fazendo reconexão automática."
+            )
+            self.api.session.check_websocket_if_connect = 0
+            return
+        if frame.kind not in (protocol.EVENT, protocol.BINARY):
+            return
+
+        data = frame.data
+        if data is not None:
+            self.api.wss_message = data
+        handler = self.handlers.get(frame.event)
+        if handler is None:
+            handler = self._route_payload(data)
+        if handler is not None:
+            handler(data)
+
+    def _route_payload(self, data):
+        """Pick a handler from the payload shape for unregistered events."""
+        if isinstance(data, dict):
+            for key, handler in self.payload_handlers:
+                if data.get(key):
+                    return handler
+            if len(data) == 1 and data.get("profit", -1) > -1:
+                return self._on_profit_today
+        elif isinstance(data, list) and data and isinstance(data[0], list):
+            if len(data[0]) == 4:
+                return self._on_quotes
+            if len(data[0]) == 2:
+                return self._on_sentiment
+        return None
+
+    def _on_authorization(self, data):
+        self.api.session.check_accepted_connection = 1
+        self.api.session.check_rejected_connection = 0
+        self.api.pending.resolve(("authorization",), True)
+
+    def _on_authorization_reject(self, data):
+        logger.info("Token rejeitado, fazendo reconexão automática.")
+        self.api.session.check_rejected_connection = 1
+        self.api.pending.resolve(("authorization",), False)
+
+    def _on_instruments(self, data):
+        self.api.session.started_listen_instruments = True
+        self.api.instrument_catalog.update(data)
+        self.api.instruments = data
+        self.api.pending.resolve(("instruments",), data)
+
+    def _on_settings(self, data):
+        self.api.settings_list = data
+
+    def _on_history(self, data):
+        asset = data.get("asset")
+        index = data.get("index")
+        if index and self.api.pending.has(("history_load", index)):
+            self.api.pending.resolve(("history_load", index), data)
+            return
+        load = ("history", asset, index)
+        if (
+            asset != self.api.current_asset
+            and not self.api.pending.has(("history", asset))
+            and not self.api.pending.has(load)
+        ):
+            return
+        if asset == self.api.current_asset:
+            self.api.candles.candles_data = data["history"]
+        self.api.candle_v2_data[asset] = data
+        data["candles"] = [
+            {
+                "time": candle[0],
+                "open": candle[1],
+                "close": candle[2],
+                "high": candle[3],
+                "low": candle[4],
+                "ticks": candle[5],
+            }
+            for candle in data["candles"]
+        ]
+        if not (index and self.api.pending.resolve(load, data)):
+            self.api.pending.resolve(("history", asset), data)
+
+    def _on_quotes(self, data):
+        streams = self.api.streams
+        for quote in data:
+            asset = quote[0]
+            prices = self.api.realtime_price.get(asset)
+            if prices is not None:
+                prices.append(quote[1], quote[2])
+            streams.publish(("ticks", asset), (quote[1], quote[2]))
+            builders = self.api.candle_builders.get(asset)
+            if builders is not None:
+                for period, candle in builders.add_tick(quote[1], quote[2]):
+                    streams.publish(("candles", asset, period), candle)
+        if data:
+            rtt = self.api.heartbeat.last_rtt
+            self.api.timesync.add_sample(data[-1][1], delay=rtt / 2 if rtt else 0.0)
+
+    def _on_sentiment(self, data):
+        for item in data:
+            result = {"sentiment": {"sell": 100 - int(item[1]), "buy": int(item[1])}}
+            self.api.realtime_sentiment[item[0]] = result
+            self.api.streams.publish(("sentiment", item[0]), result)
+
+    def _on_signals(self, data):
+        time_in = data.get("time")
+        for i in data["signals"]:
             try:
-                message = message[1:].decode()
-                logger.debug(message)
-                message = json.loads(message)
-                self.api.wss_message = message
-                if "call" in str(message) or "put" in str(message):
-                    self.api.instruments = message
-                if message.get("signals"):
-                    time_in = message.get("time")
-                    for i in message["signals"]:
-                        try:
-                            self.api.signal_data[i[0]] = {}
-                            self.api.signal_data[i[0]][i[2]] = {}
-                            self.api.signal_data[i[0]][i[2]]["dir"] = i[1][0]["signal"]
-                            self.api.signal_data[i[0]][i[2]]["duration"] = i[1][0][
-                                "timeFrame"
-                            ]
-                        except:
-                            self.api.signal_data[i[0]] = {}
-                            self.api.signal_data[i[0]][time_in] = {}
-                            self.api.signal_data[i[0]][time_in]["dir"] = i[1][0][1]
-                            self.api.signal_data[i[0]][time_in]["duration"] = i[1][0][0]
-                elif message.get("liveBalance") or message.get("demoBalance"):
-                    self.api.account_balance = message
-                elif message.get("position"):
-                    self.api.top_list_leader = message
-                elif len(message) == 1 and message.get("profit") > -1:
-                    self.api.profit_today = message
-                elif message.get("index"):
-                    # self.api.candles.candles_data = message
-                    self.api.candle_close_timestamp = message.get("closeTimestamp")
-                elif message.get("id"):
-                    self.api.buy_successful = message
-                    self.api.buy_id = message["id"]
-                    self.api.candle_close_timestamp = message.get("closeTimestamp")
-                    
-                    if not TradeOrder.objects.filter(id_trade=self.api.buy_id).exists():
-                        create_trade_order_sync(True, message["asset"], message)
-                elif message.get("ticket"):
-                    self.api.sold_options_respond = message
-                elif message.get("deals"):
-                    for get_m in message["deals"]:
-                        self.api.profit_in_operation = get_m["profit"]
-                        get_m["win"] = True if message["profit"] > 0 else False
-                        get_m["game_state"] = 1
-                        self.api.listinfodata.set(
-                            get_m["win"], get_m["game_state"], get_m["id"], get_m["profit"]
-                        )
-                elif message.get("isDemo") and message.get("balance"):
-                    self.api.training_balance_edit_request = message
-                elif message.get("error"):
-                    global_value.websocket_error_reason = message.get("error")
-                    global_value.check_websocket_if_error = True
-                    if global_value.websocket_error_reason == "not_money":
-                        self.api.account_balance = {"liveBalance": 0}
-                elif not message.get("list") == []:
-                    self.api.wss_message = message
-            except:
-                pass
-
-            if str(message) == "41":
-                logger.info(
-                    "Evento de desconexão disparado pela plataforma, fazendo reconexão automática."
-                )
-                global_value.check_websocket_if_connect = 0
-            if "51-" in str(message):
-                self.api._temp_status = str(message)
-            elif (
-                self.api._temp_status
-                == """451-["settings/list",{"_placeholder":true,"num":0}]"""
-            ):
-                self.api.settings_list = message
-                self.api._temp_status = ""
-            elif (
-                self.api._temp_status
-                == """451-["history/list/v2",{"_placeholder":true,"num":0}]"""
-            ):
-                if message.get("asset") == self.api.current_asset:
-                    self.api.candles.candles_data = message["history"]
-
-                    self.api.candle_v2_data[message["asset"]] = message
-                    self.api.candle_v2_data[message["asset"]]["candles"] = [
-                        {
-                            "time": candle[0],
-                            "open": candle[1],
-                            "close": candle[2],
-                            "high": candle[3],
-                            "low": candle[4],
-                            "ticks": candle[5],
-                        }
-                        for candle in message["candles"]
-                    ]
-            elif len(message[0]) == 4:
-                result = {"time": message[0][1], "price": message[0][2]}
-                self.api.realtime_price[message[0][0]].append(result)
-            elif len(message[0]) == 2:
-                for i in message:
-                    result = {"sentiment": {"sell": 100 - int(i[1]), "buy": int(i[1])}}
-                    self.api.realtime_sentiment[i[0]] = result
-        except:
-            pass
-        global_value.ssl_Mutual_exclusion = False
+                self.api.signal_data[i[0]] = {
+                    i[2]: {"dir": i[1][0]["signal"], "duration": i[1][0]["timeFrame"]}
+                }
+            except (KeyError, IndexError, TypeError):
+                self.api.signal_data[i[0]] = {
+                    time_in: {"dir": i[1][0][1], "duration": i[1][0][0]}
+                }
+            self.api.streams.publish(("signals",), {i[0]: self.api.signal_data[i[0]]})
+
+    def _on_balance(self, data):
+        self.api.account_balance = data
+        self.api.pending.resolve(("balance",), data)
+
+    def _on_leader(self, data):
+        self.api.top_list_leader = data
+        self.api.pending.resolve(("leader",), data)
+
+    def _on_profit_today(self, data):
+        self.api.profit_today = data
+        self.api.pending.resolve(("profit_today",), data)
+
+    def _on_candle_close(self, data):
+        self.api.candle_close_timestamp = data.get("closeTimestamp")
+        # Só resolve a janela do backfill com um frame que traga as linhas
+        if data.get("data") or data.get("candles") or data.get("history"):
+            self.api.pending.resolve(("history_load", data["index"]), data)
+
+    def _on_order_opened(self, data):
+        self.api.buy_successful = data
+        self.api.buy_id = data["id"]
+        self.api.candle_close_timestamp = data.get("closeTimestamp")
+        trade_persistence.submit_trade_open(data)
+        key = self._order_key(data)
+        if key is not None:
+            self.api.pending.resolve(key, data)
+
+    def _on_option_sold(self, data):
+        self.api.sold_options_respond = data
+        self.api.pending.resolve(("ticket", data["ticket"]), data)
+
+    def _on_deals(self, data):
+        for deal in data["deals"]:
+            self.api.profit_in_operation = deal["profit"]
+            deal["win"] = True if data["profit"] > 0 else False
+            deal["game_state"] = 1
+            self.api.listinfodata.set(
+                deal["win"], deal["game_state"], deal["id"], deal["profit"]
+            )
+            self.api.pending.resolve(
+                ("deal", deal["id"]),
+                {"win": deal["win"], "game_state": 1, "profit": deal["profit"]},
+            )
+            self.api.streams.publish(("deals",), deal)
+            self.api.subscriptions.release(("deal", deal["id"]))
+
+    def _on_training_balance(self, data):
+        if data.get("balance"):
+            self.api.training_balance_edit_request = data
+            self.api.pending.resolve(("training_balance",), data)
+
+    def _on_error(self, data):
+        self.api.session.websocket_error_reason = data.get("error")
+        self.api.session.check_websocket_if_error = True
+        if self.api.session.websocket_error_reason == "not_money":
+            self.api.account_balance = {"liveBalance": 0}
+        # Só a ordem a que o erro se refere; na dúvida nenhuma
+        key = self._order_key(data)
+        if key is not None:
+            self.api.pending.fail(key, self.api.session.websocket_error_reason)
+
+    def _order_key(self, data):
+        """Chave da ordem pendente a que um ack ou erro se refere.
+
+        Pelo ``requestId``; sem ele, pela ordem pendente de mesmo ativo, valor
+        e direção, e só se houver exatamente uma. Em qualquer outro caso o
+        frame é registrado no log e descartado, em vez de ir para a ordem errada.
+        """
+        request_id = data.get("requestId")
+        if request_id is not None:
+            return ("order", request_id)
+        candidates = [
+            key for key, tag in self.api.pending.tagged("order") if order_matches(tag, data)
+        ]
+        if len(candidates) == 1:
+            return candidates[0]
+        logger.warning(
+            "Frame de ordem sem requestId e sem ordem correspondente (%d candidatas): %s",
+            len(candidates), data,
+        )
+        return None
 
     def on_error(self, wss, error):
         """Method to process websocket errors."""
         logger.error(error)
-        global_value.websocket_error_reason = str(error)
-        global_value.check_websocket_if_error = True
+        self.api.session.websocket_error_reason = str(error)
+        self.api.session.check_websocket_if_error = True
 
     def on_open(self, wss):
         """Method to process websocket open."""
         logger.info("Websocket client connected.")
-        global_value.check_websocket_if_connect = 1
-        asset_name = self.api.current_asset
-        period = self.api.current_period
-        self.wss.send('42["tick"]')
-        self.wss.send('42["indicator/list"]')
-        self.wss.send('42["drawing/load"]')
-        self.wss.send('42["pending/list"]')
-        self.wss.send(
-            '42["instruments/update",{"asset":"%s","period":%d}]' % (asset_name, period)
+        self.api.session.check_websocket_if_connect = 1
+        self.api.session.chart_settings = None
+        subscriptions = self.api.subscriptions
+        subscriptions.forget("chart")
+        subscriptions.subscribe(
+            self.api.current_asset, self.api.current_period, owner="chart", send=False
         )
-        self.wss.send('42["depth/follow","%s"]' % asset_name)
-        self.wss.send('42["chart_notification/get"]')
-        self.wss.send('42["tick"]')
+        for data in ('42["tick"]', '42["indicator/list"]', '42["drawing/load"]', '42["pending/list"]'):
+            self.api.send_websocket_request(data, priority=sender.NORMAL)
+        # Reassina tudo que estava ativo antes da reconexão (inclui o ativo do gráfico)
+        subscriptions.replay()
+        for data in ('42["chart_notification/get"]', '42["tick"]'):
+            self.api.send_websocket_request(data, priority=sender.NORMAL)
+        self.api.heartbeat.start()
 
     def on_close(self, wss, close_status_code, close_msg):
         """Method to process websocket close."""
         logger.info("Websocket connection closed.")
-        global_value.check_websocket_if_connect = 0
+        self.api.session.check_websocket_if_connect = 0
 
     def on_ping(self, wss, ping_msg):
         pass
 
     def on_pong(self, wss, pong_msg):
-        self.wss.send("2")
+        pass
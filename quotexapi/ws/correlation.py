@@ -0,0 +1,125 @@
+"""Module for Quotex request/response correlation."""
+
+import asyncio
+import threading
+from collections import OrderedDict
+
+
+class RequestError(Exception):
+    """Raised on a pending request when the server answers with an error."""
+
+
+class PendingRequests(object):
+    """Registry of :class:`asyncio.Future` objects waiting for a response.
+
+    Futures are keyed by tuples such as ``("order", request_id)``,
+    ``("deal", deal_id)``, ``("ticket", ticket)``, ``("history", asset)``
+    (pushed history) or ``("history", asset, index)`` (one load request).
+    The websocket reader resolves them with :meth:`resolve` from its own
+    thread; the result is delivered with ``call_soon_threadsafe`` on the
+    loop that registered the future.
+
+    A key may carry a tag describing the request (e.g. the asset, amount
+    and direction of an order), so a response that lost its id can still
+    be matched with :meth:`tagged`.
+    """
+
+    def __init__(self):
+        self._futures = OrderedDict()
+        self._tags = {}
+        self._lock = threading.Lock()
+
+    def register(self, key, tag=None):
+        """Register a future for ``key`` on the running event loop.
+
+        :param tuple key: The correlation key.
+        :param dict tag: (optional) What was requested under ``key``.
+        :returns: The instance of :class:`asyncio.Future`.
+        """
+        future = asyncio.get_event_loop().create_future()
+        with self._lock:
+            self._futures.setdefault(key, []).append(future)
+            if tag is not None:
+                self._tags[key] = tag
+        return future
+
+    def discard(self, key, future):
+        with self._lock:
+            futures = self._futures.get(key)
+            if futures and future in futures:
+                futures.remove(future)
+                if not futures:
+                    self._pop(key)
+
+    def has(self, key):
+        return key in self._futures
+
+    async def wait(self, key, future, timeout):
+        """Wait for ``future`` and unregister it afterwards.
+
+        :raises asyncio.TimeoutError: If no response arrives in ``timeout``.
+        """
+        try:
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self.discard(key, future)
+
+    def resolve(self, key, result):
+        """Resolve every future registered under ``key``.
+
+        :returns: ``True`` if at least one future was waiting.
+        """
+        with self._lock:
+            futures = self._pop(key)
+        if not futures:
+            return False
+        for future in futures:
+            _deliver(future, result, None)
+        return True
+
+    def tagged(self, kind):
+        """The pending ``(key, tag)`` pairs whose key starts with ``kind``."""
+        with self._lock:
+            return [(key, tag) for key, tag in self._tags.items() if key[0] == kind]
+
+    def fail(self, key, reason):
+        """Fail every future registered under ``key``.
+
+        :returns: ``True`` if at least one future was waiting.
+        """
+        with self._lock:
+            futures = self._pop(key)
+        if not futures:
+            return False
+        for future in futures:
+            _deliver(future, None, RequestError(reason))
+        return True
+
+    def _pop(self, key):
+        self._tags.pop(key, None)
+        return self._futures.pop(key, None)
+
+    def reject(self, kind, reason):
+        """Fail every pending key whose first item is ``kind``."""
+        with self._lock:
+            keys = [key for key in self._futures if key[0] == kind]
+            futures = [f for key in keys for f in self._pop(key)]
+        for future in futures:
+            _deliver(future, None, RequestError(reason))
+        return bool(futures)
+
+
+def _deliver(future, result, error):
+    loop = future.get_loop()
+    if loop.is_closed():
+        return
+    loop.call_soon_threadsafe(_set_future, future, result, error)
+
+
+def _set_future(future, result, error):
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
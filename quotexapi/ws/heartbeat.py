@@ -0,0 +1,151 @@
+"""Module for Quotex websocket keepalive and latency measurement."""
+
+import time
+import asyncio
+import logging
+import threading
+from collections import deque
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+TICK_FRAME = '42["tick"]'
+PING_FRAME = "2"
+
+
+class Heartbeat(object):
+    """Keepalive scheduler of one session.
+
+    Sends ``42["tick"]`` every ``tick_interval`` seconds and an Engine.IO
+    ping (``"2"``) every ``ping_interval`` seconds. The round-trip time is
+    measured from the moment the ping leaves the sender until the ``"3"``
+    pong is dispatched, and the last ``window`` samples are kept for
+    percentiles. Runs as a thread with the ``"thread"`` transport and as a
+    task on the connection loop with ``"asyncio"``.
+    """
+
+    def __init__(self, api, tick_interval=5.0, ping_interval=None, window=120):
+        """
+        :param api: The instance of :class:`QuotexAPI <quotexapi.api.QuotexAPI>`.
+        :param float tick_interval: Seconds between ``tick`` frames.
+        :param float ping_interval: (optional) Seconds between pings;
+            defaults to the ``pingInterval`` announced by the server.
+        :param int window: RTT samples kept.
+        """
+        self.api = api
+        self.tick_interval = tick_interval
+        self.ping_interval = ping_interval
+        self.samples = deque(maxlen=window)
+        self.lost = 0
+        self._ping_sent = None
+        self._next_tick = 0.0
+        self._next_ping = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+        self._task = None
+
+    @property
+    def interval(self):
+        """Property to get the ping interval in use."""
+        if self.ping_interval:
+            return self.ping_interval
+        client = self.api.websocket_client
+        return client.ping_interval if client is not None else 24
+
+    @property
+    def last_rtt(self):
+        """Property to get the latest RTT in seconds or None."""
+        return self.samples[-1] if self.samples else None
+
+    def start(self):
+        """Start the scheduler; a no-op if it is already running."""
+        self.reset()
+        if self.api.transport == "asyncio":
+            if self._task is None or self._task.done():
+                # Cada execução tem o seu evento: um stop/start rápido não
+                # reaproveita o evento que a execução anterior ainda observa
+                self._stop = threading.Event()
+                self._task = asyncio.ensure_future(self._run_async(self._stop))
+        elif self._thread is None or not self._thread.is_alive():
+            self._stop = threading.Event()
+            self._thread = threading.Thread(
+                target=self._run, args=(self._stop,), name="quotex-heartbeat"
+            )
+            self._thread.daemon = True
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=1.0):
+        """Stop the scheduler and wait up to ``timeout`` seconds for the thread."""
+        self._stop.set()
+        if self._task is not None:
+            self._task.get_loop().call_soon_threadsafe(self._task.cancel)
+            self._task = None
+        thread, self._thread = self._thread, None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+
+    def reset(self):
+        """Forget the outstanding ping; called when a connection opens."""
+        self._ping_sent = None
+        self._next_tick = self._next_ping = time.monotonic()
+
+    def beat(self, now=None):
+        """Send whatever frame is due and return the seconds until the next one."""
+        now = time.monotonic() if now is None else now
+        if now >= self._next_tick:
+            self._next_tick = now + self.tick_interval
+            self.api.send_websocket_request(TICK_FRAME)
+        if now >= self._next_ping:
+            self._next_ping = now + self.interval
+            if self._ping_sent is not None:
+                self.lost += 1
+            self._ping_sent = None
+            future = self.api.send_websocket_request(PING_FRAME)
+            future.add_done_callback(self._on_ping_written)
+        return max(0.0, min(self._next_tick, self._next_ping) - time.monotonic())
+
+    def _on_ping_written(self, future):
+        if not future.cancelled() and future.exception() is None and future.result():
+            self._ping_sent = time.monotonic()
+
+    def on_pong(self):
+        """Record the RTT of the outstanding ping."""
+        sent, self._ping_sent = self._ping_sent, None
+        if sent is not None:
+            self.samples.append(time.monotonic() - sent)
+
+    def percentiles(self, percentiles=(50, 90, 99)):
+        """Rolling RTT percentiles in milliseconds.
+
+        :returns: A dict like ``{"p50": 41.2, "p90": 55.0, "p99": 80.3,
+            "last": 40.9, "samples": 120, "lost": 0}``.
+        """
+        samples = list(self.samples)
+        stats = {"samples": len(samples), "lost": self.lost, "last": None}
+        if samples:
+            values = np.percentile(np.array(samples) * 1000, percentiles)
+            stats.update((f"p{p}", round(float(v), 2)) for p, v in zip(percentiles, values))
+            stats["last"] = round(samples[-1] * 1000, 2)
+        else:
+            stats.update((f"p{p}", None) for p in percentiles)
+        return stats
+
+    def _run(self, stop):
+        while not stop.is_set():
+            try:
+                delay = self.beat()
+            except Exception as e:
+                logger.error("Falha no heartbeat: %s", e)
+                delay = 1.0
+            stop.wait(delay)
+
+    async def _run_async(self, stop):
+        while not stop.is_set():
+            try:
+                delay = self.beat()
+            except Exception as e:
+                logger.error("Falha no heartbeat: %s", e)
+                delay = 1.0
+            await asyncio.sleep(delay)
@@ -0,0 +1,149 @@
+"""Module for Quotex instrument catalog websocket object."""
+
+import threading
+
+from quotexapi.ws.objects.base import Base
+
+
+class Instrument(object):
+    """One row of ``instruments/list`` with its fields already parsed."""
+
+    __slots__ = (
+        "id",
+        "symbol",
+        "name",
+        "type",
+        "payout",
+        "turbo_payout",
+        "is_open",
+        "profit_1m",
+        "profit_5m",
+        "row",
+    )
+
+    def __init__(self, row):
+        """
+        :param list row: The raw row sent by the server.
+        """
+        self.id = row[0]
+        self.symbol = row[1]
+        self.name = row[2].replace("\n", "")
+        self.type = row[3]
+        self.payout = row[5]
+        self.is_open = row[14]
+        self.turbo_payout = row[18]
+        self.profit_1m = row[-9]
+        self.profit_5m = row[-8]
+        self.row = row
+
+    def __repr__(self):
+        state = "open" if self.is_open else "closed"
+        return f"<Instrument {self.symbol} {self.payout}% {state}>"
+
+    def payment(self):
+        """Legacy ``get_payment`` entry of this instrument."""
+        return {
+            "turbo_payment": self.turbo_payout,
+            "payment": self.payout,
+            "profit": {"1M": self.profit_1m, "5M": self.profit_5m},
+            "open": self.is_open,
+        }
+
+
+class InstrumentCatalog(Base):
+    """Instruments indexed by symbol and by display name.
+
+    :meth:`update` applies every ``instruments/list`` frame in place: only
+    rows that changed are parsed again, and :attr:`version` is bumped when
+    anything changed so derived views (payments, names, filtered universes)
+    can be cached per version.
+    """
+
+    def __init__(self):
+        super(InstrumentCatalog, self).__init__()
+        self.__name = "instruments"
+        self.by_symbol = {}
+        self.by_name = {}
+        self.rows = None
+        self.version = 0
+        self._views = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.by_symbol)
+
+    def __contains__(self, symbol):
+        return symbol in self.by_symbol
+
+    def update(self, rows):
+        """Apply a full ``instruments/list`` payload.
+
+        :returns: ``True`` if any instrument was added, changed or removed.
+        """
+        changed = False
+        with self._lock:
+            seen = set()
+            for row in rows:
+                symbol = row[1]
+                seen.add(symbol)
+                current = self.by_symbol.get(symbol)
+                if current is not None and current.row == row:
+                    continue
+                instrument = Instrument(row)
+                if current is not None and current.name != instrument.name:
+                    self.by_name.pop(current.name, None)
+                self.by_symbol[symbol] = instrument
+                self.by_name[instrument.name] = instrument
+                changed = True
+            for symbol in [s for s in self.by_symbol if s not in seen]:
+                self.by_name.pop(self.by_symbol.pop(symbol).name, None)
+                changed = True
+            self.rows = rows
+            if changed:
+                self.version += 1
+                self._views = {}
+        return changed
+
+    def get(self, symbol):
+        """Get an :class:`Instrument` by symbol (e.g. ``EURUSD_otc``)."""
+        return self.by_symbol.get(symbol)
+
+    def get_by_name(self, name):
+        """Get an :class:`Instrument` by display name (e.g. ``EUR/USD (OTC)``)."""
+        return self.by_name.get(name)
+
+    def view(self, key, build):
+        """Cache ``build(self)`` under ``key`` until the next change."""
+        views = self._views
+        value = views.get(key)
+        if value is None:
+            value = views[key] = build(self)
+        return value
+
+    def payments(self):
+        """Legacy ``get_payment`` dict keyed by display name, cached per version."""
+        return self.view(
+            "payments",
+            lambda catalog: {name: i.payment() for name, i in catalog.by_name.items()},
+        )
+
+    def fingerprint(self):
+        """What filtered universes depend on: ``(name, payout, is_open)`` of
+        every instrument, as a frozenset cached per version.
+
+        Equal payloads give equal fingerprints in any session, so it can key
+        caches shared by every catalog of the process.
+        """
+        return self.view(
+            "fingerprint",
+            lambda catalog: frozenset(
+                (i.name, i.payout, bool(i.is_open)) for i in catalog.by_symbol.values()
+            ),
+        )
+
+    def names(self):
+        """``[[symbol, name], ...]`` of every instrument, cached per version."""
+        return self.view(
+            "names",
+            lambda catalog: [[i.symbol, i.name] for i in catalog.by_symbol.values()],
+        )
@@ -137,7 +137,7 @@ class Profile(Base):
     @currency_code.setter
     def currency_code(self, currency_code):
         self.__currency_code = currency_code
-        if self.__currency_code.upper() == "BRL":
+        if self.__currency_code and self.__currency_code.upper() == "BRL":
             self.__minimum_amount = 5
 
     @property
@@ -0,0 +1,80 @@
+"""Module for Quotex realtime tick buffer."""
+
+import numpy as np
+
+from quotexapi.ws.objects.base import Base
+
+
+class TickBuffer(Base):
+    """Fixed-size ring buffer of ``(timestamp, price)`` float64 pairs.
+
+    Each tick is written twice, at ``slot`` and ``slot + capacity``, so the
+    latest ``n`` ticks are always one contiguous slice of the backing array.
+    :meth:`last` and :meth:`since` therefore return views without copying;
+    copy them if they must survive later appends.
+    """
+
+    def __init__(self, capacity=4096):
+        """
+        :param int capacity: Maximum number of ticks kept.
+        """
+        super(TickBuffer, self).__init__()
+        self.__name = "ticks"
+        self.capacity = int(capacity)
+        self._data = np.zeros((2 * self.capacity, 2), dtype=np.float64)
+        self._next = 0
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def append(self, timestamp, price):
+        """Add one tick in O(1), overwriting the oldest when full."""
+        slot = self._next
+        data = self._data
+        data[slot, 0] = data[slot + self.capacity, 0] = timestamp
+        data[slot, 1] = data[slot + self.capacity, 1] = price
+        self._next = slot + 1 if slot + 1 < self.capacity else 0
+        if self._size < self.capacity:
+            self._size += 1
+
+    def clear(self):
+        self._next = 0
+        self._size = 0
+
+    def view(self):
+        """All stored ticks, oldest first, as an ``(n, 2)`` view."""
+        end = self._next + self.capacity
+        return self._data[end - self._size:end]
+
+    def last(self, n):
+        """The latest ``n`` ticks as an ``(n, 2)`` view."""
+        n = min(int(n), self._size)
+        end = self._next + self.capacity
+        return self._data[end - n:end]
+
+    def since(self, timestamp):
+        """Ticks with time ``>= timestamp`` as an ``(n, 2)`` view."""
+        window = self.view()
+        start = np.searchsorted(window[:, 0], timestamp, side="left")
+        return window[start:]
+
+    @property
+    def latest(self):
+        """Property to get the latest ``(timestamp, price)`` pair or None."""
+        if not self._size:
+            return None
+        row = self._data[self._next + self.capacity - 1]
+        return float(row[0]), float(row[1])
+
+    @property
+    def timestamps(self):
+        return self.view()[:, 0]
+
+    @property
+    def prices(self):
+        return self.view()[:, 1]
+
+    def to_list(self):
+        """Legacy output: list of ``{"time": ..., "price": ...}`` dicts."""
+        return [{"time": t, "price": p} for t, p in self.view().tolist()]
@@ -1,31 +1,94 @@
 import time
 import datetime
+import threading
 from quotexapi.ws.objects.base import Base
 
 
 class TimeSync(Base):
-    """Class for Quotex TimeSync websocket object."""
+    """Class for Quotex TimeSync websocket object.
 
-    def __init__(self):
+    Keeps an estimate of ``server_time - local_time``. Local time is a wall
+    clock anchored once and advanced with :func:`time.monotonic`, so NTP
+    steps on the host don't move it. Offset samples come from server
+    timestamps in websocket frames, corrected by the measured RTT, and are
+    smoothed with an EWMA.
+    """
+
+    def __init__(self, alpha=0.1, max_jump=1.0):
+        """
+        :param float alpha: EWMA weight of a new offset sample.
+        :param float max_jump: Seconds a sample may differ from the estimate
+            before it is treated as an outlier.
+        """
         super(TimeSync, self).__init__()
         self.__name = "timeSync"
-        self.__server_timestamp = time.time()
         self.__expiration_time = 1
+        self.alpha = alpha
+        self.max_jump = max_jump
+        self.offset = 0.0
+        self.samples = 0
+        self._rejected = 0
+        self._lock = threading.Lock()
+        self._wall_anchor = time.time()
+        self._monotonic_anchor = time.monotonic()
+
+    def local_time(self):
+        """Local wall-clock time advanced by the monotonic clock."""
+        return self._wall_anchor + (time.monotonic() - self._monotonic_anchor)
+
+    @property
+    def synced(self):
+        """Property to know if at least one offset sample was taken."""
+        return self.samples > 0
+
+    def add_sample(self, server_time, received_at=None, delay=0.0):
+        """Add an offset sample from a server timestamp.
+
+        :param float server_time: The time stamped by the server.
+        :param float received_at: (optional) :meth:`local_time` when the
+            frame arrived; defaults to now.
+        :param float delay: One-way delay between stamping and receipt,
+            usually half of the heartbeat RTT.
+        """
+        if received_at is None:
+            received_at = self.local_time()
+        sample = server_time + delay - received_at
+        with self._lock:
+            if not self.samples:
+                self.offset = sample
+            elif abs(sample - self.offset) > self.max_jump:
+                # Fora da curva; três seguidas indicam que o relógio realmente saltou
+                self._rejected += 1
+                if self._rejected < 3:
+                    return
+                self.offset = sample
+            else:
+                self.offset += self.alpha * (sample - self.offset)
+            self._rejected = 0
+            self.samples += 1
+
+    def add_exchange(self, sent_at, server_time, received_at):
+        """Add a sample from a request/response pair (NTP style).
+
+        :param float sent_at: :meth:`local_time` before the request was sent.
+        :param float server_time: The time the server stamped on the response.
+        :param float received_at: :meth:`local_time` when the response arrived.
+        """
+        midpoint = (sent_at + received_at) / 2
+        self.add_sample(server_time, received_at=midpoint)
 
     @property
     def server_timestamp(self):
         """Property to get server timestamp.
 
-        :returns: The server timestamp.
+        :returns: The server-aligned timestamp.
         """
-        while self.__server_timestamp is None:
-            time.sleep(0.2)
-        return self.__server_timestamp
+        return self.local_time() + self.offset
 
     @server_timestamp.setter
     def server_timestamp(self, timestamp):
-        """Method to set server timestamp."""
-        self.__server_timestamp = timestamp
+        """Method to set server timestamp; taken as an offset sample."""
+        self.add_sample(timestamp)
 
     @property
     def server_datetime(self):
@@ -0,0 +1,112 @@
+"""Module for Quotex Engine.IO/Socket.IO frame decoding."""
+
+import json
+from collections import namedtuple
+
+# Engine.IO v3 packet types.
+EIO_OPEN = "0"
+EIO_CLOSE = "1"
+EIO_PING = "2"
+EIO_PONG = "3"
+EIO_MESSAGE = "4"
+EIO_NOOP = "6"
+
+# Socket.IO v2 packet types (carried inside an Engine.IO message).
+SIO_CONNECT = "0"
+SIO_DISCONNECT = "1"
+SIO_EVENT = "2"
+SIO_ACK = "3"
+SIO_ERROR = "4"
+SIO_BINARY_EVENT = "5"
+SIO_BINARY_ACK = "6"
+
+# Frame kinds returned by :class:`FrameDecoder`.
+OPEN = "open"
+CLOSE = "close"
+PING = "ping"
+PONG = "pong"
+CONNECT = "connect"
+DISCONNECT = "disconnect"
+EVENT = "event"
+PLACEHOLDER = "placeholder"
+BINARY = "binary"
+UNKNOWN = "unknown"
+
+Frame = namedtuple("Frame", ["kind", "event", "data"])
+
+_BINARY_PREFIX = 4  # Engine.IO "message" type sent as a raw byte.
+
+
+class FrameDecoder(object):
+    """Decode raw websocket frames into :class:`Frame` tuples.
+
+    Quotex sends most payloads as Socket.IO binary events: a text frame
+    ``451-["event",{"_placeholder":true,"num":0}]`` followed by a binary
+    frame with the JSON body. The decoder keeps the pending event name so
+    the binary frame is reported under the event that announced it.
+    """
+
+    def __init__(self):
+        self.pending_event = None
+
+    def decode(self, message):
+        """Parse a frame exactly once.
+
+        :param message: The raw frame (``str`` or ``bytes``).
+        :returns: The instance of :class:`Frame`.
+        """
+        if isinstance(message, (bytes, bytearray)):
+            return self._decode_binary(message)
+        if not message:
+            return Frame(UNKNOWN, None, message)
+
+        packet_type = message[0]
+        if packet_type == EIO_MESSAGE:
+            return self._decode_socketio(message)
+        if packet_type == EIO_PING:
+            return Frame(PING, None, message[1:])
+        if packet_type == EIO_PONG:
+            return Frame(PONG, None, message[1:])
+        if packet_type == EIO_OPEN:
+            return Frame(OPEN, None, _loads(message[1:]))
+        if packet_type == EIO_CLOSE:
+            return Frame(CLOSE, None, None)
+        return Frame(UNKNOWN, None, message)
+
+    def _decode_binary(self, message):
+        body = message[1:] if message[0] == _BINARY_PREFIX else message
+        event, self.pending_event = self.pending_event, None
+        return Frame(BINARY, event, _loads(body))
+
+    def _decode_socketio(self, message):
+        if len(message) < 2:
+            return Frame(UNKNOWN, None, message)
+        packet_type = message[1]
+        if packet_type == SIO_EVENT:
+            return _event_frame(EVENT, _loads(message[2:]))
+        if packet_type == SIO_BINARY_EVENT:
+            _, _, body = message.partition("-")
+            frame = _event_frame(PLACEHOLDER, _loads(body))
+            self.pending_event = frame.event
+            return frame
+        if packet_type == SIO_DISCONNECT:
+            return Frame(DISCONNECT, None, None)
+        if packet_type == SIO_CONNECT:
+            return Frame(CONNECT, None, None)
+        return Frame(UNKNOWN, None, message)
+
+
+def _event_frame(kind, packet):
+    if not isinstance(packet, list) or not packet:
+        return Frame(UNKNOWN, None, packet)
+    data = packet[1] if len(packet) > 1 else None
+    return Frame(kind, packet[0], data)
+
+
+def _loads(body):
+    if not body:
+        return None
+    try:
+        return json.loads(body)
+    except ValueError:
+        return None
@@ -0,0 +1,224 @@
+"""Module for Quotex websocket outbound queue."""
+
+import queue
+import asyncio
+import logging
+import itertools
+import threading
+from concurrent.futures import Future
+
+logger = logging.getLogger(__name__)
+
+URGENT = 0
+NORMAL = 1
+LOW = 2
+
+URGENT_EVENTS = ("orders/open", "orders/cancel", "authorization")
+LOW_EVENTS = ("settings/store", "tick")
+
+_STOP = object()
+
+
+def frame_priority(data):
+    """Guess the priority of a Socket.IO frame from its event name.
+
+    :param str data: The websocket frame, e.g. ``42["orders/open",{...}]``.
+    :returns: One of :data:`URGENT`, :data:`NORMAL` or :data:`LOW`.
+    """
+    if not data.startswith('42["'):
+        return NORMAL
+    event = data[4:data.find('"', 4)]
+    if event in URGENT_EVENTS:
+        return URGENT
+    if event in LOW_EVENTS:
+        return LOW
+    return NORMAL
+
+
+class WebsocketSender(object):
+    """Single writer that owns the websocket send path.
+
+    Callers enqueue frames from any thread and get back a
+    :class:`concurrent.futures.Future` that resolves to ``True`` once the
+    frame was written or ``False`` if the socket was not connected.
+    """
+
+    def __init__(self, write, name="quotex-ws-sender"):
+        """
+        :param write: Callable that writes one frame and returns ``True``
+            if it was sent.
+        :param str name: The name of the writer thread.
+        """
+        self.write = write
+        self.name = name
+        self._queue = queue.PriorityQueue()
+        self._sequence = itertools.count()
+        self._thread = None
+
+    @property
+    def pending(self):
+        """Property to get the number of frames waiting to be written."""
+        return self._queue.qsize()
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name=self.name)
+            self._thread.daemon = True
+            self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self._queue.put((URGENT, -1, _STOP, None))
+            self._thread = None
+
+    def send(self, data, priority=None):
+        """Enqueue a frame.
+
+        :param str data: The websocket frame.
+        :param int priority: (optional) Override the priority guessed from
+            the event name.
+        :returns: The instance of :class:`concurrent.futures.Future`.
+        """
+        future = Future()
+        if priority is None:
+            priority = frame_priority(data)
+        self._queue.put((priority, next(self._sequence), data, future))
+        return future
+
+    def send_many(self, frames, priority=None):
+        """Enqueue several frames that are written back to back.
+
+        No other frame is written between them, whatever its priority.
+
+        :param list frames: The websocket frames.
+        :param int priority: (optional) Override the priority guessed from
+            the event name of the first frame.
+        :returns: The instance of :class:`concurrent.futures.Future`;
+            ``True`` only if every frame was written.
+        """
+        frames = tuple(frames)
+        if priority is None:
+            priority = frame_priority(frames[0]) if frames else NORMAL
+        return self.send(frames, priority)
+
+    def _write(self, data):
+        if isinstance(data, tuple):
+            return all([self.write(frame) for frame in data])
+        return self.write(data)
+
+    def _run(self):
+        while True:
+            _, _, data, future = self._queue.get()
+            if data is _STOP:
+                break
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(self._write(data))
+            except Exception as e:
+                logger.error("Falha ao enviar frame %s: %s", data, e)
+                future.set_exception(e)
+        self._drain()
+
+    def _drain(self):
+        while True:
+            try:
+                _, _, data, future = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if future is not None and future.set_running_or_notify_cancel():
+                future.set_result(False)
+
+
+class AsyncWebsocketSender(object):
+    """Writer task that owns the websocket inside an asyncio event loop.
+
+    Same interface as :class:`WebsocketSender`, but frames are written by a
+    task on the loop instead of a dedicated thread, so many sessions can
+    share one loop. :meth:`send` is safe to call from any thread.
+    """
+
+    def __init__(self, write, loop=None):
+        """
+        :param write: Coroutine function that writes one frame and returns
+            ``True`` if it was sent.
+        :param loop: (optional) The event loop that owns the socket.
+        """
+        self.write = write
+        self.loop = loop
+        self._queue = None
+        self._task = None
+        self._sequence = itertools.count()
+
+    @property
+    def pending(self):
+        """Property to get the number of frames waiting to be written."""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def start(self):
+        if self.loop is None:
+            self.loop = asyncio.get_event_loop()
+        if self._task is None or self._task.done():
+            self._queue = asyncio.PriorityQueue()
+            self._task = self.loop.create_task(self._run())
+        return self
+
+    def stop(self):
+        if self._task is not None:
+            self.loop.call_soon_threadsafe(
+                self._queue.put_nowait, (URGENT, -1, _STOP, None)
+            )
+            self._task = None
+
+    def send(self, data, priority=None):
+        """Enqueue a frame.
+
+        :param str data: The websocket frame.
+        :param int priority: (optional) Override the priority guessed from
+            the event name.
+        :returns: The instance of :class:`concurrent.futures.Future`.
+        """
+        future = Future()
+        if priority is None:
+            priority = frame_priority(data)
+        item = (priority, next(self._sequence), data, future)
+        self.loop.call_soon_threadsafe(self._queue.put_nowait, item)
+        return future
+
+    def send_many(self, frames, priority=None):
+        """Enqueue several frames that are written back to back.
+
+        :param list frames: The websocket frames.
+        :param int priority: (optional) Override the priority guessed from
+            the event name of the first frame.
+        :returns: The instance of :class:`concurrent.futures.Future`;
+            ``True`` only if every frame was written.
+        """
+        frames = tuple(frames)
+        if priority is None:
+            priority = frame_priority(frames[0]) if frames else NORMAL
+        return self.send(frames, priority)
+
+    async def _write(self, data):
+        if isinstance(data, tuple):
+            results = [await self.write(frame) for frame in data]
+            return all(results)
+        return await self.write(data)
+
+    async def _run(self):
+        while True:
+            _, _, data, future = await self._queue.get()
+            if data is _STOP:
+                break
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(await self._write(data))
+            except Exception as e:
+                logger.error("Falha ao enviar frame %s: %s", data, e)
+                future.set_exception(e)
+        while not self._queue.empty():
+            _, _, data, future = self._queue.get_nowait()
+            if future is not None and future.set_running_or_notify_cancel():
+                future.set_result(False)
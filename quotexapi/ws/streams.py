@@ -0,0 +1,186 @@
+"""Module for Quotex push streams consumed with ``async for``."""
+
+import asyncio
+import threading
+from collections import deque
+
+DROP_OLDEST = "drop_oldest"
+FAIL_ON_OVERFLOW = "fail_on_overflow"
+
+
+class StreamOverflow(Exception):
+    """Raised on a ``fail_on_overflow`` subscription whose consumer fell too far behind."""
+
+
+class Subscription(object):
+    """Bounded queue of one consumer, iterated with ``async for``.
+
+    Items are pushed by the websocket reader and always land on the
+    consumer's event loop. When the queue is full:
+
+    * ``drop_oldest`` discards the oldest item and counts it in
+      :attr:`dropped`;
+    * ``fail_on_overflow`` keeps every item, but once ``maxsize +
+      max_backlog`` items are waiting the subscription fails: iteration
+      raises :class:`StreamOverflow` and no further item is queued.
+
+    Neither policy applies backpressure: the websocket reader also carries
+    acks and ticks of the whole session, so it never waits for a consumer.
+    A consumer that must not lose items uses ``fail_on_overflow`` and
+    resubscribes (or reconciles) when it fails. Use it as an async context
+    manager, or call :meth:`close`, to release it.
+    """
+
+    def __init__(
+        self, hub, topic, maxsize=1000, overflow=DROP_OLDEST, max_backlog=10000
+    ):
+        """
+        :param hub: The instance of :class:`StreamHub`.
+        :param tuple topic: The topic, e.g. ``("ticks", "EURUSD")``.
+        :param int maxsize: Items kept before the overflow policy applies.
+        :param str overflow: :data:`DROP_OLDEST` or :data:`FAIL_ON_OVERFLOW`.
+        :param int max_backlog: Extra items a ``fail_on_overflow`` consumer may owe.
+        """
+        if overflow not in (DROP_OLDEST, FAIL_ON_OVERFLOW):
+            raise ValueError(f"Política de overflow inválida: {overflow}")
+        self.hub = hub
+        self.topic = topic
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self.max_backlog = max_backlog
+        self.dropped = 0
+        self.on_close = None
+        self.loop = asyncio.get_running_loop()
+        self._thread_id = threading.get_ident()
+        self._items = deque()
+        self._waiter = None
+        self._error = None
+        self._closed = False
+
+    def __len__(self):
+        return len(self._items)
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def deliver(self, item):
+        """Hand an item over from any thread."""
+        if self._closed:
+            return
+        if threading.get_ident() == self._thread_id:
+            self._push(item)
+        else:
+            try:
+                self.loop.call_soon_threadsafe(self._push, item)
+            except RuntimeError:  # loop do consumidor já fechado
+                self.hub.unsubscribe(self)
+
+    def _push(self, item):
+        if self._closed:
+            return
+        items = self._items
+        if len(items) >= self.maxsize:
+            if self.overflow == DROP_OLDEST:
+                items.popleft()
+                self.dropped += 1
+            elif len(items) >= self.maxsize + self.max_backlog:
+                self._fail(StreamOverflow(f"Consumidor de {self.topic} atrasado demais"))
+                return
+        items.append(item)
+        self._wake()
+
+    def _wake(self):
+        waiter = self._waiter
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
+
+    def _fail(self, error):
+        self._error = error
+        self.close()
+
+    def close(self):
+        """Stop receiving items; pending ones can still be read."""
+        if self._closed:
+            return
+        self._closed = True
+        self.hub.unsubscribe(self)
+        if self.on_close is not None:
+            self.on_close()
+        if threading.get_ident() == self._thread_id:
+            self._wake()
+        elif not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self._wake)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        while not self._items:
+            if self._error is not None:
+                raise self._error
+            if self._closed:
+                raise StopAsyncIteration
+            self._waiter = self.loop.create_future()
+            try:
+                await self._waiter
+            finally:
+                self._waiter = None
+        return self._items.popleft()
+
+    async def get(self, timeout=None):
+        """Wait for the next item.
+
+        :raises asyncio.TimeoutError: If nothing arrives in ``timeout``.
+        :raises StopAsyncIteration: If the subscription was closed.
+        """
+        return await asyncio.wait_for(self.__anext__(), timeout)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.close()
+
+
+class StreamHub(object):
+    """Fan-out of websocket events to :class:`Subscription` consumers.
+
+    Topics are tuples: ``("ticks", asset)``, ``("candles", asset, period)``,
+    ``("sentiment", asset)``, ``("deals",)`` and ``("signals",)``.
+    Publishing to a topic without consumers costs one dict lookup.
+    """
+
+    def __init__(self):
+        self._subscriptions = {}
+        self._lock = threading.Lock()
+
+    def has(self, topic):
+        return topic in self._subscriptions
+
+    def subscribe(self, topic, maxsize=1000, overflow=DROP_OLDEST, max_backlog=10000):
+        """Create a consumer of ``topic`` on the running event loop.
+
+        :returns: The instance of :class:`Subscription`.
+        """
+        subscription = Subscription(self, topic, maxsize, overflow, max_backlog)
+        with self._lock:
+            consumers = self._subscriptions.get(topic, ())
+            self._subscriptions[topic] = consumers + (subscription,)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            consumers = self._subscriptions.get(subscription.topic, ())
+            consumers = tuple(s for s in consumers if s is not subscription)
+            if consumers:
+                self._subscriptions[subscription.topic] = consumers
+            else:
+                self._subscriptions.pop(subscription.topic, None)
+
+    def publish(self, topic, item):
+        """Deliver ``item`` to every consumer of ``topic``."""
+        consumers = self._subscriptions.get(topic)
+        if consumers:
+            for subscription in consumers:
+                subscription.deliver(item)
@@ -0,0 +1,178 @@
+"""Module for Quotex reference-counted stream subscriptions."""
+
+import threading
+from contextlib import contextmanager
+
+
+class SubscriptionRegistry(object):
+    """Reference counts the consumers of each asset stream.
+
+    The server streams one period per asset: ``instruments/update`` sets it
+    and the unsubscribe frames drop the whole asset. Consumers are therefore
+    counted per asset, each holding the period it asked for, and the server
+    streams the period of the oldest consumer. A consumer of another period
+    joins without moving the stream; if a :meth:`refresh` switched it, the
+    oldest consumer's period is sent again when that consumer leaves.
+
+    A consumer is identified by an owner token: calling :meth:`subscribe`
+    twice with the same owner and period is a no-op, so polling helpers can
+    subscribe on every call. ``instruments/update`` and ``depth/follow`` are
+    sent only when an asset gets its first consumer, and the unsubscribe
+    frames only when its last consumer leaves.
+    """
+
+    def __init__(self, api):
+        """
+        :param api: The instance of :class:`QuotexAPI <quotexapi.api.QuotexAPI>`.
+        """
+        self.api = api
+        self._owners = {}  # ativo -> {(owner, period): None}, em ordem de chegada
+        self._streamed = {}  # ativo -> período enviado por último ao servidor
+        self._lock = threading.Lock()
+
+    def __contains__(self, key):
+        asset, period = key
+        return any(p == period for _, p in self._owners.get(asset, ()))
+
+    def active(self):
+        """The subscribed ``(asset, period)`` keys."""
+        with self._lock:
+            return list(dict.fromkeys(
+                (asset, period) for asset, holders in self._owners.items() for _, period in holders
+            ))
+
+    def consumers(self, asset, period):
+        return sum(1 for _, p in self._owners.get(asset, ()) if p == period)
+
+    def streamed_period(self, asset):
+        """The period the server is streaming for ``asset``, or ``None``."""
+        return self._streamed.get(asset)
+
+    def subscribe(self, asset, period, owner="default", send=True):
+        """Add ``owner`` as a consumer of ``asset``/``period``.
+
+        :param str asset: The asset name.
+        :param int period: The candle period the consumer wants.
+        :param owner: (optional) The consumer token.
+        :param bool send: (optional) ``False`` only registers the consumer;
+            used on connect, right before :meth:`replay` sends the frames.
+        :returns: ``True`` if subscribe frames were sent.
+        """
+        with self._lock:
+            holders = self._owners.setdefault(asset, {})
+            first = not holders
+            holders[(owner, period)] = None
+            if first:
+                self._streamed[asset] = period
+        if not first or not send:
+            return False
+        self.api.subscribe_realtime_candle(asset, period)
+        self.api.follow_candle(asset)
+        return True
+
+    def unsubscribe(self, asset, period=None, owner="default"):
+        """Remove ``owner`` from ``asset``/``period``.
+
+        :param int period: (optional) ``None`` drops every consumer of the
+            asset, whatever the period.
+        :returns: ``True`` if unsubscribe frames were sent.
+        """
+        with self._lock:
+            holders = self._owners.get(asset)
+            if not holders:
+                return False
+            if period is not None:
+                if (owner, period) not in holders:
+                    return False
+                del holders[(owner, period)]
+            if period is None or not holders:
+                del self._owners[asset]
+                self._streamed.pop(asset, None)
+                last = True
+            else:
+                last = False
+                restore = self._restore(asset)
+        if last:
+            self.api.unsubscribe_realtime_candle(asset)
+            self.api.unfollow_candle(asset)
+            return True
+        if restore is not None:
+            self.api.subscribe_realtime_candle(asset, restore)
+        return False
+
+    def _restore(self, asset):
+        # Volta o stream para o período do consumidor mais antigo
+        primary = next(iter(self._owners[asset]))[1]
+        if self._streamed.get(asset) == primary:
+            return None
+        self._streamed[asset] = primary
+        return primary
+
+    def release(self, owner):
+        """Unsubscribe ``owner`` from every stream it still consumes.
+
+        :returns: ``True`` if unsubscribe frames were sent.
+        """
+        with self._lock:
+            keys = [
+                (asset, period)
+                for asset, holders in self._owners.items()
+                for holder, period in holders
+                if holder == owner
+            ]
+        sent = False
+        for asset, period in keys:
+            sent = self.unsubscribe(asset, period, owner) or sent
+        return sent
+
+    def forget(self, owner):
+        """Drop ``owner`` from every stream without sending frames.
+
+        Used on a fresh connection, where the server holds no subscription.
+        """
+        with self._lock:
+            for asset in list(self._owners):
+                holders = self._owners[asset]
+                for key in [key for key in holders if key[0] == owner]:
+                    del holders[key]
+                if not holders:
+                    del self._owners[asset]
+                    self._streamed.pop(asset, None)
+
+    def refresh(self, asset, period):
+        """Resend ``instruments/update`` so the server pushes a fresh history.
+
+        The stream switches to ``period`` until the consumer that asked for
+        it leaves; see :meth:`unsubscribe`.
+        """
+        with self._lock:
+            if asset in self._owners:
+                self._streamed[asset] = period
+        self.api.subscribe_realtime_candle(asset, period)
+
+    @contextmanager
+    def hold(self, asset, period, refresh=False):
+        """Keep ``asset``/``period`` subscribed for the duration of a block.
+
+        :param bool refresh: (optional) Resend ``instruments/update`` even if
+            the stream was already subscribed.
+        """
+        owner = object()
+        if not self.subscribe(asset, period, owner) and refresh:
+            self.refresh(asset, period)
+        try:
+            yield
+        finally:
+            self.unsubscribe(asset, period, owner)
+
+    def replay(self):
+        """Resend the subscribe frames of every active stream after a reconnect."""
+        with self._lock:
+            streams = []
+            for asset, holders in self._owners.items():
+                period = next(iter(holders))[1]
+                self._streamed[asset] = period
+                streams.append((asset, period))
+        for asset, period in streams:
+            self.api.subscribe_realtime_candle(asset, period)
+            self.api.follow_candle(asset)